@@ -0,0 +1,120 @@
+"""initial schema
+
+Tables as created by Base.metadata.create_all before migrations were
+introduced. Databases created that way are adopted with
+`alembic stamp 0001` and then upgraded normally.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 02:30:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("role", sa.Enum("CUSTOMER", "TECHNICIAN", "ADMIN", name="userrole"), nullable=False),
+        sa.Column("is_active", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "services",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("base_price", sa.Float(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name")
+    )
+    op.create_index("ix_services_id", "services", ["id"])
+
+    op.create_table(
+        "technicians",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("specialization", sa.String(), nullable=False),
+        sa.Column("experience_years", sa.Integer(), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("rating", sa.Float(), nullable=True),
+        sa.Column("total_jobs", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id")
+    )
+    op.create_index("ix_technicians_id", "technicians", ["id"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("customer_id", sa.Integer(), nullable=False),
+        sa.Column("service_id", sa.Integer(), nullable=False),
+        sa.Column("technician_id", sa.Integer(), nullable=True),
+        sa.Column("problem_description", sa.Text(), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("preferred_date", sa.DateTime(), nullable=False),
+        sa.Column("preferred_time", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "ACCEPTED", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="bookingstatus"),
+            nullable=False
+        ),
+        sa.Column("final_price", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["customer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["service_id"], ["services.id"]),
+        sa.ForeignKeyConstraint(["technician_id"], ["technicians.id"]),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_bookings_id", "bookings", ["id"])
+
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("to_email", sa.String(), nullable=False),
+        sa.Column("to_name", sa.String(), nullable=True),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("html_content", sa.Text(), nullable=False),
+        sa.Column("status", sa.Enum("PENDING", "SENT", "FAILED", name="outboxstatus"), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_email_outbox_id", "email_outbox", ["id"])
+    op.create_index("ix_email_outbox_status", "email_outbox", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("email_outbox")
+    op.drop_table("bookings")
+    op.drop_table("technicians")
+    op.drop_table("services")
+    op.drop_table("users")
+    sa.Enum(name="outboxstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="bookingstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
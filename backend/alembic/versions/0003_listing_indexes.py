@@ -0,0 +1,43 @@
+"""composite indexes for the listing filters
+
+Each booking index is a listing filter followed by the (created_at, id)
+keyset order, so filtered pages are read straight from the index without
+a sort. On PostgreSQL they are built CONCURRENTLY to avoid locking writes
+on a large bookings table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 02:32:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKING_INDEXES = {
+    "ix_bookings_created_at_id": ["created_at", "id"],
+    "ix_bookings_status_created_at_id": ["status", "created_at", "id"],
+    "ix_bookings_customer_id_created_at_id": ["customer_id", "created_at", "id"],
+    "ix_bookings_technician_id_status_created_at_id": ["technician_id", "status", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in BOOKING_INDEXES.items():
+            op.create_index(name, "bookings", columns, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            "ix_services_category", "services", ["category"], postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_services_category", "services", postgresql_concurrently=True, if_exists=True)
+        for name in reversed(list(BOOKING_INDEXES)):
+            op.drop_index(name, "bookings", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,43 @@
+"""booking_stats summary table for the admin analytics
+
+One counter per (technician, status), 0 standing for unassigned bookings.
+The application moves counts between rows as bookings change; the upgrade
+backfills it with a GROUP BY over the existing bookings.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 02:33:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reuses the bookingstatus type created with the bookings table
+    booking_status = postgresql.ENUM(
+        "PENDING", "ACCEPTED", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="bookingstatus", create_type=False
+    )
+    op.create_table(
+        "booking_stats",
+        sa.Column("technician_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("status", booking_status, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("technician_id", "status"),
+    )
+    op.execute(
+        "INSERT INTO booking_stats (technician_id, status, count) "
+        "SELECT COALESCE(technician_id, 0), status, COUNT(*) FROM bookings "
+        "GROUP BY COALESCE(technician_id, 0), status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("booking_stats")
@@ -0,0 +1,51 @@
+"""booking_stats counters split into slots
+
+Every new booking adds one to the unassigned PENDING counter, so with a
+single row concurrent inserts waited for each other's row lock. The slot
+column joins the primary key and the application spreads unassigned counts
+over BOOKING_STATS_SLOTS rows, which readers sum. The table only holds
+derived counts, so it is rebuilt from bookings in both directions.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 04:10:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_booking_stats(*slot_columns: sa.Column) -> None:
+    # Reuses the bookingstatus type created with the bookings table
+    booking_status = postgresql.ENUM(
+        "PENDING", "ACCEPTED", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="bookingstatus", create_type=False
+    )
+    op.drop_table("booking_stats")
+    op.create_table(
+        "booking_stats",
+        sa.Column("technician_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("status", booking_status, nullable=False),
+        *slot_columns,
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("technician_id", "status", *(column.name for column in slot_columns)),
+    )
+    op.execute(
+        "INSERT INTO booking_stats (technician_id, status, count) "
+        "SELECT COALESCE(technician_id, 0), status, COUNT(*) FROM bookings "
+        "GROUP BY COALESCE(technician_id, 0), status"
+    )
+
+
+def upgrade() -> None:
+    _create_booking_stats(sa.Column("slot", sa.Integer(), autoincrement=False, nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    _create_booking_stats()
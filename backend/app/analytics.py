@@ -0,0 +1,205 @@
+import random
+from collections import Counter
+from typing import Iterable, Mapping, Optional, Tuple
+from sqlalchemy import delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .config import settings
+from .models.booking import Booking, BookingStatus
+from .models.booking_stats import BookingStats, UNASSIGNED_TECHNICIAN_ID
+from .models.technician import Technician
+from .models.user import User
+
+StatsKey = Tuple[int, BookingStatus]
+
+# Statuses a technician is currently working on
+ACTIVE_STATUSES = (BookingStatus.ACCEPTED, BookingStatus.IN_PROGRESS)
+
+
+def stats_key(technician_id: Optional[int], booking_status: Optional[BookingStatus]) -> StatsKey:
+    """booking_stats row a booking is counted in"""
+    return (technician_id or UNASSIGNED_TECHNICIAN_ID, booking_status or BookingStatus.PENDING)
+
+
+def _stats_slot(technician_id: int) -> int:
+    """booking_stats slot a delta is added to"""
+    # Every new booking counts in the unassigned pending row; one row would serialize concurrent inserts
+    if technician_id == UNASSIGNED_TECHNICIAN_ID and settings.BOOKING_STATS_SLOTS > 1:
+        return random.randrange(settings.BOOKING_STATS_SLOTS)
+    return 0
+
+
+def apply_booking_stats(connection: Connection, deltas: Mapping[StatsKey, int]) -> None:
+    """
+    Add deltas to the booking_stats counters, in the caller's transaction
+
+    Unassigned counts go to a random one of BOOKING_STATS_SLOTS rows, so
+    concurrent bookings mostly lock different rows. Rows are upserted in key
+    order so concurrent transactions lock them in the same order and cannot
+    deadlock on each other.
+    """
+    rows = sorted(
+        (
+            {
+                "technician_id": technician_id, "status": booking_status,
+                "slot": _stats_slot(technician_id), "count": delta
+            }
+            for (technician_id, booking_status), delta in deltas.items()
+            if delta
+        ),
+        key=lambda row: (row["technician_id"], row["status"], row["slot"])
+    )
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(BookingStats)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[BookingStats.technician_id, BookingStats.status, BookingStats.slot],
+            set_={"count": BookingStats.count + upsert.excluded.count}
+        )
+        connection.execute(upsert, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(BookingStats).where(
+                BookingStats.technician_id == row["technician_id"],
+                BookingStats.status == row["status"],
+                BookingStats.slot == row["slot"]
+            ).values(count=BookingStats.count + row["count"])
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(BookingStats).values(**row))
+
+
+def booking_counts_query():
+    """GROUP BY over bookings producing the same rows as booking_stats"""
+    technician_id = func.coalesce(Booking.technician_id, UNASSIGNED_TECHNICIAN_ID)
+    return select(technician_id, Booking.status, func.count(Booking.id)).group_by(technician_id, Booking.status)
+
+
+def booking_stats_query():
+    """booking_stats counters with their slots added up, the same rows as booking_counts_query"""
+    count = func.sum(BookingStats.count)
+    return select(BookingStats.technician_id, BookingStats.status, count).group_by(
+        BookingStats.technician_id, BookingStats.status
+    ).having(count != 0)
+
+
+def rebuild_booking_stats(connection: Connection) -> None:
+    """Recompute booking_stats from the bookings table, e.g. after bookings were changed with raw SQL"""
+    if connection.dialect.name == "postgresql":
+        # Writers wait for the rebuild and then apply their deltas on top of it
+        connection.exec_driver_sql("LOCK TABLE booking_stats IN EXCLUSIVE MODE")
+
+    connection.execute(delete(BookingStats))
+    counts = booking_counts_query().add_columns(literal(0))
+    connection.execute(
+        insert(BookingStats).from_select(["technician_id", "status", "count", "slot"], counts)
+    )
+
+
+def _committed_value(instance, attribute: str):
+    """Value of a column before the pending changes of this flush"""
+    history = inspect(instance).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(instance, attribute)
+
+
+# Maintenance hook: every flushed booking insert, delete, status change or
+# (re)assignment moves one count between booking_stats rows in the same
+# transaction, so the counters commit or roll back together with the bookings.
+# Bulk UPDATE statements bypass it and must call apply_booking_stats themselves.
+@event.listens_for(Session, "after_flush")
+def _count_booking_changes(session: Session, flush_context) -> None:
+    deltas = Counter()
+    for instance in session.new:
+        if isinstance(instance, Booking):
+            deltas[stats_key(instance.technician_id, instance.status)] += 1
+
+    for instance in session.dirty:
+        if isinstance(instance, Booking):
+            old = stats_key(_committed_value(instance, "technician_id"), _committed_value(instance, "status"))
+            new = stats_key(instance.technician_id, instance.status)
+            if old != new:
+                deltas[old] -= 1
+                deltas[new] += 1
+
+    for instance in session.deleted:
+        if isinstance(instance, Booking):
+            deltas[stats_key(_committed_value(instance, "technician_id"), _committed_value(instance, "status"))] -= 1
+
+    apply_booking_stats(session.connection(), deltas)
+
+
+# Load the previous value when these are assigned on an expired booking, so the hook above can move its count
+@event.listens_for(Booking.status, "set", active_history=True)
+@event.listens_for(Booking.technician_id, "set", active_history=True)
+def _keep_counted_history(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+def build_analytics(rows: Iterable[tuple], technicians: Mapping[int, tuple], source: str) -> dict:
+    """Dashboard payload from (technician_id, status, count) rows"""
+    by_status = {booking_status: 0 for booking_status in BookingStatus}
+    load = {}
+    for technician_id, booking_status, count in rows:
+        by_status[booking_status] += count
+        if technician_id == UNASSIGNED_TECHNICIAN_ID:
+            continue
+
+        technician = load.setdefault(technician_id, {"active_jobs": 0, "completed_jobs": 0, "total_jobs": 0})
+        technician["total_jobs"] += count
+        if booking_status in ACTIVE_STATUSES:
+            technician["active_jobs"] += count
+        elif booking_status == BookingStatus.COMPLETED:
+            technician["completed_jobs"] += count
+
+    technician_load = []
+    for technician_id, counts in load.items():
+        name, specialization = technicians.get(technician_id, (None, None))
+        technician_load.append(
+            {"technician_id": technician_id, "name": name, "specialization": specialization, **counts}
+        )
+    technician_load.sort(key=lambda technician: (-technician["active_jobs"], technician["technician_id"]))
+
+    total = sum(by_status.values())
+    return {
+        "source": source,
+        "total_bookings": total,
+        "bookings_by_status": by_status,
+        "pending_jobs": by_status[BookingStatus.PENDING],
+        "active_jobs": sum(by_status[booking_status] for booking_status in ACTIVE_STATUSES),
+        "unassigned_jobs": sum(
+            count for technician_id, booking_status, count in rows
+            if technician_id == UNASSIGNED_TECHNICIAN_ID
+            and booking_status not in (BookingStatus.COMPLETED, BookingStatus.CANCELLED)
+        ),
+        "completion_rate": round(by_status[BookingStatus.COMPLETED] / total, 4) if total else 0.0,
+        "technicians": technician_load
+    }
+
+
+async def get_booking_analytics(db: AsyncSession, live: bool = False) -> dict:
+    """Dashboard counters from booking_stats (summed per technician and status), or straight from bookings"""
+    query = booking_counts_query() if live else booking_stats_query()
+    rows = (await db.execute(query)).all()
+
+    technician_ids = {row[0] for row in rows if row[0] != UNASSIGNED_TECHNICIAN_ID}
+    technicians = {}
+    if technician_ids:
+        result = await db.execute(
+            select(Technician.id, User.full_name, Technician.specialization).join(
+                User, Technician.user_id == User.id
+            ).where(Technician.id.in_(technician_ids))
+        )
+        technicians = {technician_id: (name, specialization) for technician_id, name, specialization in result}
+
+    return build_analytics(rows, technicians, "bookings" if live else "summary")
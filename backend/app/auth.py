@@ -1,16 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
 from .database import get_db
-from .models.user import User
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .models.user import User, UserRole
+from .models.technician import Technician
+from .password_hashing import PasswordHasherBusy, check_password, hash_password, password_hasher
+from .principal_cache import Principal, TokenState, principal_cache, token_state_cache
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -18,12 +18,36 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return check_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return hash_password(password)
+
+
+def _hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool, answering 429 when it is saturated"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hashing_busy_exception()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool, answering 429 when it is saturated"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hashing_busy_exception()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -52,30 +76,132 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from token"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def build_token_claims(user: User, technician_id: Optional[int] = None) -> dict:
+    """Access token claims for a user, including the stateless principal profile when enabled"""
+    claims = {"sub": user.email, "role": user.role.value}
+    if settings.JWT_EMBED_PRINCIPAL:
+        claims.update({"uid": user.id, "tid": technician_id, "ver": user.token_version or 0})
+    return claims
+
+
+def revoke_tokens(user: User) -> None:
+    """Invalidate every token issued to the user so far (takes effect on commit)"""
+    # Incremented in SQL so a stale cached copy of the user cannot lose a revocation
+    user.token_version = User.token_version + 1
+
+
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Decoded access token, shared by the auth dependencies of a request"""
     try:
         payload = decode_access_token(token)
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
 
-    return user
+
+def _matches_token(payload: dict, user_id: int, token_version: int) -> bool:
+    """Tokens without the claims profile predate it and are accepted as they are"""
+    if "uid" in payload and payload["uid"] != user_id:
+        return False
+    return payload.get("ver", token_version) == token_version
+
+
+async def _load_principal(db: AsyncSession, email: str) -> Principal:
+    """Full principal for a token subject, from the cache when possible"""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    # User and technician id in a single query
+    result = await db.execute(
+        select(User, Technician.id)
+        .outerjoin(Technician, Technician.user_id == User.id)
+        .where(User.email == email)
+    )
+    row = result.first()
+    if row is None:
+        raise _credentials_exception()
+
+    principal = Principal.from_user(row[0], technician_id=row[1])
+    principal_cache.set(email, principal)
+    token_state_cache.set(
+        principal.user_id,
+        TokenState(principal.token_version, principal.is_active, principal.role, principal.technician_id)
+    )
+    return principal
+
+
+async def _load_token_state(db: AsyncSession, user_id: int) -> Optional[TokenState]:
+    state = token_state_cache.get(user_id)
+    if state is not None:
+        return state
+
+    # Technician profiles are created and deleted after tokens are issued, so the id is looked up, not taken from "tid"
+    result = await db.execute(
+        select(User.token_version, User.is_active, User.role, Technician.id.label("technician_id"))
+        .outerjoin(Technician, Technician.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    state = TokenState(row.token_version or 0, bool(row.is_active), row.role, row.technician_id)
+    token_state_cache.set(user_id, state)
+    return state
+
+
+async def get_current_principal(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Authenticated principal for handlers that do not need the users row
+
+    Tokens carrying the claims profile are only checked against the cached
+    token version (role, active flag and technician profile come from the
+    same lookup), so the users row is never loaded; older tokens fall back
+    to the principal cache.
+    """
+    if "uid" not in payload or "ver" not in payload:
+        return await _load_principal(db, payload["sub"])
+
+    state = await _load_token_state(db, payload["uid"])
+    if state is None or state.token_version != payload["ver"]:
+        raise _credentials_exception()
+
+    return Principal(
+        user_id=payload["uid"],
+        email=payload["sub"],
+        role=state.role,
+        is_active=state.is_active,
+        technician_id=state.technician_id,
+        token_version=state.token_version
+    )
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get the current authenticated user from token"""
+    principal = await _load_principal(db, payload["sub"])
+    if not _matches_token(payload, principal.user_id, principal.token_version):
+        raise _credentials_exception()
+
+    # Attach the cached columns to the session as a persistent User without querying it again
+    return await db.merge(principal.to_user(), load=False)
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -85,13 +211,32 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+async def get_current_active_principal(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Get current active principal"""
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+def _check_role(role: UserRole, allowed_roles: list) -> None:
+    if role not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"User role {role} is not authorized for this operation"
+        )
+
+
 def require_role(allowed_roles: list):
     """Dependency to check if user has required role"""
     async def role_checker(current_user: User = Depends(get_current_active_user)):
-        if current_user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"User role {current_user.role} is not authorized for this operation"
-            )
+        _check_role(current_user.role, allowed_roles)
         return current_user
     return role_checker
+
+
+def require_principal_role(allowed_roles: list):
+    """Like require_role, but returns the principal so the users row is not needed"""
+    async def role_checker(principal: Principal = Depends(get_current_active_principal)):
+        _check_role(principal.role, allowed_roles)
+        return principal
+    return role_checker
@@ -0,0 +1,377 @@
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, contains_eager
+
+from .config import settings
+from .database import SessionLocal
+from .models.booking import Booking, BookingStatus
+from .models.technician import Technician
+from .models.user import User, UserRole
+
+# Schedules are kept at half-hour resolution, one bit per unit of the day
+SLOT_MINUTES = 30
+# Assumed length of a job booked with a start time only ("14:00")
+DEFAULT_JOB_MINUTES = 120
+# Window blocked by a booking whose time cannot be parsed, so it never looks free
+WORKDAY = (8 * 60, 18 * 60)
+NAMED_PERIODS = {
+    "morning": (8 * 60, 12 * 60),
+    "afternoon": (12 * 60, 16 * 60),
+    "evening": (16 * 60, 20 * 60),
+}
+
+# Bookings holding a technician's time
+OPEN_STATUSES = (BookingStatus.PENDING, BookingStatus.ACCEPTED, BookingStatus.IN_PROGRESS)
+
+# Trade suffixes stripped so "Electrician" matches "Electrical" and "Plumber" matches "Plumbing"
+SKILL_SUFFIXES = ("icians", "ician", "ical", "ing", "ers", "er", "ry", "al", "s")
+
+_CLOCK = r"(\d{1,2})(?::(\d{2}))?"
+_RANGE_RE = re.compile(rf"^{_CLOCK}\s*(?:-|–|to)\s*{_CLOCK}$")
+_START_RE = re.compile(rf"^{_CLOCK}$")
+
+
+def skill_key(text: Optional[str]) -> str:
+    """Normalized trade of a technician specialization or a service category"""
+    words = (text or "").lower().split()
+    if not words:
+        return ""
+
+    word = words[0]
+    for suffix in SKILL_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+# Technicians registered without a trade
+GENERAL_SKILL = skill_key("General")
+
+
+class TimeSlot(NamedTuple):
+    """Day plus a bitmask of the half-hour units a booking occupies"""
+    day: date
+    mask: int
+
+
+def _minutes(hours: str, minutes: Optional[str]) -> int:
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def parse_time_window(text: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(start, end) minutes of a preferred_time such as "14:00-16:00", "9:30" or "afternoon"; None if unrecognized"""
+    text = (text or "").strip().lower()
+    if text in NAMED_PERIODS:
+        return NAMED_PERIODS[text]
+
+    match = _RANGE_RE.match(text)
+    if match:
+        start, end = _minutes(*match.group(1, 2)), _minutes(*match.group(3, 4))
+    else:
+        match = _START_RE.match(text)
+        if not match:
+            return None
+        start = _minutes(*match.group(1, 2))
+        end = start + DEFAULT_JOB_MINUTES
+
+    end = min(end, 24 * 60)
+    if not 0 <= start < end:
+        return None
+    return start, end
+
+
+def window_mask(start: int, end: int) -> int:
+    """Bitmask of the half-hour units touched by [start, end) minutes"""
+    first = start // SLOT_MINUTES
+    last = -(-end // SLOT_MINUTES)
+    return ((1 << (last - first)) - 1) << first
+
+
+def booking_slot(preferred_date: datetime, preferred_time: Optional[str]) -> TimeSlot:
+    """Normalized slot of a booking; unparseable times block the whole working day"""
+    window = parse_time_window(preferred_time) or WORKDAY
+    return TimeSlot(preferred_date.date(), window_mask(*window))
+
+
+class BookingState(NamedTuple):
+    """Columns of a booking that decide which technician time it holds"""
+    id: int
+    technician_id: Optional[int]
+    status: Optional[BookingStatus]
+    preferred_date: Optional[datetime]
+    preferred_time: Optional[str]
+
+    @classmethod
+    def from_booking(cls, booking: Booking) -> "BookingState":
+        return cls(booking.id, booking.technician_id, booking.status, booking.preferred_date, booking.preferred_time)
+
+
+class AvailabilityIndex:
+    """
+    In-process schedule of every technician, as day -> bitmask of busy half hours
+
+    Built from the open assigned bookings, then kept current by the session
+    hooks below as this worker commits booking changes. Changes committed by
+    other workers show up after the next rebuild, at most refresh_seconds
+    later. Profile edits made by this worker only reload the technicians and
+    keep the schedule. Checking a technician against a slot is a dict lookup
+    and an AND, so availability queries never touch the bookings table.
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_seconds: float = settings.AVAILABILITY_REFRESH_SECONDS):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        self._bookings: Dict[int, Tuple[int, TimeSlot]] = {}
+        self._days: Dict[Tuple[int, date], Dict[int, int]] = {}
+        self._busy: Dict[Tuple[int, date], int] = {}
+        self._technicians: Dict[int, dict] = {}
+        self._skills: Dict[str, Set[int]] = {}
+        self._technicians_stale = True
+        self._built_at: Optional[float] = None
+        # Changes committed while a rebuild reads the database, replayed on top of it
+        self._replay: Optional[List[BookingState]] = None
+
+    def _expired(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at >= self.refresh_seconds
+
+    def needs_refresh(self) -> bool:
+        return self._technicians_stale or self._expired()
+
+    def refresh(self) -> None:
+        """Rebuild from the database if stale; concurrent callers wait for a single rebuild"""
+        with self._refresh_lock:
+            if not self.needs_refresh():
+                return
+            if not self._expired():
+                # Only profiles changed: the schedule is kept
+                self._refresh_technicians()
+                return
+
+            with self._lock:
+                self._replay = []
+                self._technicians_stale = False
+            try:
+                technicians, bookings = self._load()
+            except Exception:
+                with self._lock:
+                    self._replay = None
+                    self._technicians_stale = True
+                raise
+
+            with self._lock:
+                replay, self._replay = self._replay, None
+                self._set_technicians(technicians)
+                self._bookings, self._days, self._busy = {}, {}, {}
+                for state in (*bookings, *replay):
+                    self._apply(state)
+                self._built_at = time.monotonic()
+
+    def _refresh_technicians(self) -> None:
+        """Reload technician profiles only; caller holds the refresh lock"""
+        with self._lock:
+            self._technicians_stale = False
+        db: Session = self.session_factory()
+        try:
+            technicians = self._load_technicians(db)
+        except Exception:
+            with self._lock:
+                self._technicians_stale = True
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._set_technicians(technicians)
+
+    def _set_technicians(self, technicians: Dict[int, dict]) -> None:
+        """Swap in loaded technician profiles; caller holds the lock"""
+        self._technicians = technicians
+        self._skills = {}
+        for technician in technicians.values():
+            self._skills.setdefault(technician["skill"], set()).add(technician["id"])
+
+    def _load(self) -> Tuple[Dict[int, dict], List[BookingState]]:
+        db: Session = self.session_factory()
+        try:
+            technicians = self._load_technicians(db)
+            today = datetime.combine(date.today(), datetime.min.time())
+            bookings = [
+                BookingState(*row)
+                for row in db.execute(
+                    select(
+                        Booking.id, Booking.technician_id, Booking.status, Booking.preferred_date, Booking.preferred_time
+                    ).where(
+                        Booking.status.in_(OPEN_STATUSES),
+                        Booking.technician_id.is_not(None),
+                        Booking.preferred_date >= today
+                    )
+                )
+            ]
+            return technicians, bookings
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load_technicians(db: Session) -> Dict[int, dict]:
+        technicians = {}
+        for technician in db.execute(
+            select(Technician).join(Technician.user).options(contains_eager(Technician.user)).where(
+                User.is_active == 1
+            )
+        ).scalars():
+            user = technician.user
+            technicians[technician.id] = {
+                "id": technician.id,
+                "user_id": technician.user_id,
+                "user_name": user.full_name,
+                "user_email": user.email,
+                "user_phone": user.phone,
+                "specialization": technician.specialization,
+                "experience_years": technician.experience_years,
+                "bio": technician.bio,
+                "rating": technician.rating,
+                "total_jobs": technician.total_jobs,
+                "skill": skill_key(technician.specialization)
+            }
+        return technicians
+
+    def _apply(self, state: BookingState) -> None:
+        """Move one booking to its current slot (or off the schedule); caller holds the lock"""
+        previous = self._bookings.pop(state.id, None)
+        if previous is not None:
+            technician_id, slot = previous
+            key = (technician_id, slot.day)
+            day = self._days.get(key, {})
+            day.pop(state.id, None)
+            if day:
+                self._busy[key] = self._or_masks(day.values())
+            else:
+                self._days.pop(key, None)
+                self._busy.pop(key, None)
+
+        if state.technician_id is None or state.status not in OPEN_STATUSES or state.preferred_date is None:
+            return
+
+        slot = booking_slot(state.preferred_date, state.preferred_time)
+        if slot.day < date.today():
+            # Past days are not loaded by rebuilds either
+            return
+        key = (state.technician_id, slot.day)
+        self._bookings[state.id] = (state.technician_id, slot)
+        self._days.setdefault(key, {})[state.id] = slot.mask
+        self._busy[key] = self._busy.get(key, 0) | slot.mask
+
+    @staticmethod
+    def _or_masks(masks: Iterable[int]) -> int:
+        combined = 0
+        for mask in masks:
+            combined |= mask
+        return combined
+
+    def apply_changes(self, states: Iterable[BookingState]) -> None:
+        """Record committed booking changes"""
+        with self._lock:
+            for state in states:
+                self._apply(state)
+                if self._replay is not None:
+                    self._replay.append(state)
+
+    def mark_technicians_stale(self) -> None:
+        """Reload technician profiles on the next query"""
+        self._technicians_stale = True
+
+    def invalidate(self) -> None:
+        """Rebuild profiles and schedule on the next query, e.g. after bookings were changed with raw SQL"""
+        with self._lock:
+            self._built_at = None
+
+    def is_free(self, technician_id: int, slot: TimeSlot) -> bool:
+        return not self._busy.get((technician_id, slot.day), 0) & slot.mask
+
+    def available(self, slot: TimeSlot, skill: Optional[str] = None) -> List[dict]:
+        """Active technicians (of a trade, if given) with nothing booked overlapping slot, best rated first"""
+        with self._lock:
+            candidates = self._skills.get(skill, set()) if skill is not None else self._technicians.keys()
+            free = [
+                self._technicians[technician_id]
+                for technician_id in candidates
+                if not self._busy.get((technician_id, slot.day), 0) & slot.mask
+            ]
+        return sorted(free, key=lambda technician: (-(technician["rating"] or 0.0), technician["id"]))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "technicians": len(self._technicians),
+                "bookings": len(self._bookings),
+                "age_seconds": round(time.monotonic() - self._built_at, 3) if self._built_at is not None else None
+            }
+
+
+availability_index = AvailabilityIndex()
+
+
+# Columns copied into the technician entries. Other changes, such as total_jobs on every
+# completed job or token_version on logout, leave the index alone; total_jobs is refreshed
+# with the schedule, at most refresh_seconds later.
+TECHNICIAN_COLUMNS = ("user_id", "specialization", "experience_years", "bio", "rating")
+TECHNICIAN_USER_COLUMNS = ("full_name", "email", "phone", "is_active")
+
+
+def _changed(instance, columns: Iterable[str]) -> bool:
+    attrs = inspect(instance).attrs
+    return any(attrs[column].history.has_changes() for column in columns)
+
+
+def _affects_technicians(instance, deleted: bool = False) -> bool:
+    """Whether a flushed technician or user changes what the index lists (inserts count as changes)"""
+    if isinstance(instance, Technician):
+        return deleted or _changed(instance, TECHNICIAN_COLUMNS)
+    if isinstance(instance, User):
+        if deleted:
+            return instance.role == UserRole.TECHNICIAN
+        # A role change can take a profile in or out of the listing
+        return _changed(instance, ("role",)) or (
+            instance.role == UserRole.TECHNICIAN and _changed(instance, TECHNICIAN_USER_COLUMNS)
+        )
+    return False
+
+
+# Maintenance hooks: booking changes are collected at flush and applied once the
+# transaction commits, like the principal cache invalidation; a rollback drops them.
+@event.listens_for(Session, "after_flush")
+def _collect_booking_changes(session: Session, flush_context) -> None:
+    changes = session.info.setdefault("availability_changes", {})
+    for instance in (*session.new, *session.dirty):
+        if isinstance(instance, Booking):
+            changes[instance.id] = BookingState.from_booking(instance)
+        elif _affects_technicians(instance):
+            session.info["availability_technicians_dirty"] = True
+
+    for instance in session.deleted:
+        if isinstance(instance, Booking):
+            changes[instance.id] = BookingState(instance.id, None, None, None, None)
+        elif _affects_technicians(instance, deleted=True):
+            session.info["availability_technicians_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_booking_changes(session: Session) -> None:
+    changes = session.info.pop("availability_changes", None)
+    if changes:
+        availability_index.apply_changes(changes.values())
+    if session.info.pop("availability_technicians_dirty", False):
+        availability_index.mark_technicians_stale()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_booking_changes(session: Session) -> None:
+    session.info.pop("availability_changes", None)
+    session.info.pop("availability_technicians_dirty", None)
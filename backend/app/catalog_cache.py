@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Hashable, NamedTuple
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .config import settings
+from .models.service import Service
+from .principal_cache import TTLCache
+from .responses import ORJSONResponse
+
+
+class CachedBody(NamedTuple):
+    """Serialized JSON response and its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    # Derived from the content, so every worker gives the same catalog the same ETag
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class CatalogCache:
+    """
+    In-process cache of the service catalog responses, keyed by endpoint and query
+
+    Entries are the serialized bodies, so a hit skips the database, the
+    response model and JSON encoding. Any committed change to a Service
+    clears the cache through the session hooks below; other workers pick the
+    change up within ttl_seconds. The generation counter keeps a request
+    that read the catalog before a commit from storing the old body after it.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self._entries = TTLCache(ttl_seconds, max_entries)
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable):
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: CachedBody, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._entries.set(key, value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        stats.update({"generation": self.generation, "not_modified": self.not_modified})
+        return stats
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS, settings.CATALOG_CACHE_MAX_ENTRIES)
+
+
+async def cached_json_response(request: Request, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Answer a catalog GET from the cache, building and storing the body on a miss
+
+    build returns the response payload (already shaped by the response
+    model); exceptions such as a 404 propagate and nothing is cached.
+    Conditional requests whose If-None-Match matches get a 304.
+    """
+    cached = catalog_cache.get(key)
+    if cached is None:
+        generation = catalog_cache.generation
+        body = ORJSONResponse(jsonable_encoder(await build())).body
+        cached = CachedBody(body, make_etag(body))
+        catalog_cache.set(key, cached, generation)
+
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_CACHE_MAX_AGE_SECONDS}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, cached.etag):
+        catalog_cache.record_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+# Invalidation hooks: flushed service changes clear the catalog once the transaction
+# commits, like the principal cache; a rollback leaves it untouched.
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_changes(session: Session, flush_context) -> None:
+    if any(isinstance(instance, Service) for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_catalog(session: Session) -> None:
+    if session.info.pop("catalog_changed", False):
+        catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_changes(session: Session) -> None:
+    session.info.pop("catalog_changed", None)
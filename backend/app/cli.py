@@ -0,0 +1,113 @@
+"""
+Schema management commands, run outside the API workers
+
+    python -m app.cli migrate [revision]   # alembic upgrade (default: head)
+    python -m app.cli create-schema        # create_all + stamp head, for fresh dev/test databases
+    python -m app.cli check-schema         # exit 1 unless the database is at the head revision
+    python -m app.cli rebuild-analytics    # recount booking_stats from the bookings table
+    python -m app.cli dispatch [--dry-run] # assign technicians to pending bookings (for cron)
+"""
+import argparse
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def alembic_config() -> Config:
+    """Alembic config usable from any working directory"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> Optional[str]:
+    """Revision the code expects the database to be at"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection) -> Optional[str]:
+    """Revision the database is at (None when it was never migrated)"""
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def migrate(revision: str = "head") -> None:
+    command.upgrade(alembic_config(), revision)
+
+
+def create_schema() -> None:
+    from .database import engine, Base
+    from . import models  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    command.stamp(alembic_config(), "head")
+
+
+def check_schema() -> bool:
+    from .database import engine
+
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    print(f"database: {current or 'not migrated'}, code: {head_revision()}")
+    return current == head_revision()
+
+
+def rebuild_analytics() -> None:
+    from .database import engine
+    from .analytics import rebuild_booking_stats
+
+    with engine.begin() as connection:
+        rebuild_booking_stats(connection)
+
+
+def dispatch(dry_run: bool = False) -> bool:
+    from .dispatch import DispatchBusy, dispatch_engine
+
+    try:
+        result = dispatch_engine.run_once(dry_run=dry_run)
+    except DispatchBusy:
+        print("another dispatch run is in progress")
+        return False
+
+    print(
+        f"{'planned' if dry_run else 'assigned'} {result['assigned']} of {result['pending']} "
+        f"pending bookings in {result['seconds']}s"
+    )
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="QuickFix schema management")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="apply migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    subparsers.add_parser("create-schema", help="create all tables and mark them as migrated")
+    subparsers.add_parser("check-schema", help="exit 1 unless the database is at the head revision")
+    subparsers.add_parser("rebuild-analytics", help="recount the booking_stats summary from the bookings table")
+    dispatch_parser = subparsers.add_parser("dispatch", help="assign technicians to pending bookings")
+    dispatch_parser.add_argument("--dry-run", action="store_true", help="plan without assigning")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        migrate(args.revision)
+    elif args.command == "create-schema":
+        create_schema()
+    elif args.command == "check-schema":
+        return 0 if check_schema() else 1
+    elif args.command == "rebuild-analytics":
+        rebuild_analytics()
+    elif args.command == "dispatch":
+        return 0 if dispatch(args.dry_run) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
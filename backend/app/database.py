@@ -1,18 +1,293 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, AsyncIterator
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from .config import settings
+from .metrics import record_pool_wait, record_statement
 
-engine = create_engine(settings.DATABASE_URL)
+
+class PoolMetrics:
+    """Thread-safe counters for connection pool checkouts and the time spent waiting for them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+        record_pool_wait(seconds)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedPoolMixin:
+    """Measures how long each checkout waits on the pool queue (including opening new connections)"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _connect_args(async_mode: bool) -> dict:
+    """
+    PostgreSQL driver arguments: the statement timeout and, behind PgBouncer, no prepared statements
+
+    The timeout is a startup parameter of each connection rather than a SET
+    run after connecting, which could be rolled back with the transaction
+    psycopg2 opens for it, and under PgBouncer would stick to whichever
+    server connection ran it.
+    """
+    connect_args = {}
+    timeout_ms = int(settings.DB_STATEMENT_TIMEOUT_MS)
+    if async_mode:
+        if timeout_ms:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+        if settings.DB_PGBOUNCER_MODE:
+            # Transaction pooling breaks server-side prepared statements
+            connect_args["statement_cache_size"] = 0
+    elif timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+    return connect_args
+
+
+def _engine_options(url: URL, async_mode: bool = False) -> dict:
+    """Pool and driver options for an engine, built from the DB_* settings"""
+    if url.get_backend_name() != "postgresql":
+        return {}
+
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer owns pooling
+        return {"poolclass": NullPool, "connect_args": _connect_args(async_mode)}
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if async_mode else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": _connect_args(async_mode),
+    }
+
+
+def _instrument_engine(sync_engine: Engine) -> None:
+    """Attach pool and statement metrics to an engine"""
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.increment("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.increment("checkouts")
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_metrics.increment("checkins")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.increment("invalidations")
+
+    if not settings.METRICS_ENABLED:
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        record_statement(time.perf_counter() - context._metrics_start, statement, parameters, executemany)
+
+
+database_url = make_url(settings.DATABASE_URL)
+engine = create_engine(database_url, **_engine_options(database_url))
+_instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def get_db():
+def get_async_database_url() -> URL:
+    """Async driver URL, derived from DATABASE_URL unless ASYNC_DATABASE_URL is set"""
+    if settings.ASYNC_DATABASE_URL:
+        url = make_url(settings.ASYNC_DATABASE_URL)
+    elif database_url.get_backend_name() == "postgresql":
+        url = database_url.set(drivername="postgresql+asyncpg")
+    elif database_url.get_backend_name() == "sqlite":
+        url = database_url.set(drivername="sqlite+aiosqlite")
+    else:
+        url = database_url
+
+    if settings.DB_PGBOUNCER_MODE and url.get_backend_name() == "postgresql":
+        # Disable SQLAlchemy's asyncpg prepared statement cache as well
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+    return url
+
+
+def _create_async_engine():
+    url = get_async_database_url()
+    async_engine = create_async_engine(url, **_engine_options(url, async_mode=True))
+    _instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# Only created in async mode so the sync deployment does not need an async driver
+async_engine = _create_async_engine() if settings.DATABASE_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+) if settings.DATABASE_ASYNC else None
+
+
+def get_pool_status() -> dict:
+    """Current pool occupancy of the engine serving requests, plus checkout metrics"""
+    pool = (async_engine.sync_engine if async_engine is not None else engine).pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            # Share of the connections the pool may open that are in use; 1.0 means new checkouts wait
+            "saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0
+        })
+    status["metrics"] = pool_metrics.snapshot()
+    return status
+
+
+async def warm_up_pool() -> None:
+    """Open a first pooled connection so the first request does not pay for connecting"""
+    if async_engine is not None:
+        async with async_engine.connect():
+            pass
+        return
+
+    def _connect():
+        with engine.connect():
+            pass
+
+    await run_in_threadpool(_connect)
+
+
+class ThreadpoolSession:
+    """
+    Sync Session exposed through the subset of the AsyncSession API used by the routers
+
+    Used when DATABASE_ASYNC is off: each database call runs on the
+    threadpool with the psycopg2 engine, so the same async handlers can
+    be A/B tested against the AsyncEngine mode.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs) -> Any:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def merge(self, instance: Any, load: bool = True) -> Any:
+        return await run_in_threadpool(self.sync_session.merge, instance, load=load)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Dependency for getting database session"""
-    db = SessionLocal()
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = ThreadpoolSession(SessionLocal(expire_on_commit=False))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
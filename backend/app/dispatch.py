@@ -0,0 +1,322 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+from .analytics import ACTIVE_STATUSES
+from .availability import GENERAL_SKILL, OPEN_STATUSES, TimeSlot, booking_slot, skill_key
+from .config import settings
+from .database import SessionLocal
+from .email import send_booking_status_update_email, send_technician_assignment_email
+from .models.booking import Booking, BookingStatus
+from .models.booking_stats import BookingStats
+from .models.service import Service
+from .models.technician import Technician
+from .models.user import User
+from .serializers import booking_select
+
+# Transaction-scoped PostgreSQL advisory lock held while a dispatch run plans and assigns
+DISPATCH_LOCK_ID = 0x51F1D15
+# Bookings are locked, assigned and flushed this many at a time
+APPLY_CHUNK_SIZE = 500
+
+
+class PendingBooking(NamedTuple):
+    id: int
+    skill: str
+    slot: TimeSlot
+
+
+class TechnicianCapacity(NamedTuple):
+    id: int
+    skill: str
+    rating: float
+    open_jobs: int
+
+
+class DispatchBusy(Exception):
+    """Raised when another dispatch run holds the dispatch lock"""
+
+
+def plan_dispatch(
+    bookings: Iterable[PendingBooking],
+    technicians: Iterable[TechnicianCapacity],
+    busy_slots: Iterable[Tuple[int, TimeSlot]],
+    max_open_jobs: int = settings.DISPATCH_MAX_OPEN_JOBS
+) -> List[Tuple[int, int]]:
+    """
+    Greedy batch assignment of pending bookings to technicians
+
+    Bookings are taken in the given order (most urgent first). Each goes
+    to the technician of its trade with the fewest open jobs, then the
+    highest rating, whose schedule has nothing overlapping the slot,
+    falling back to general technicians. Nobody goes past max_open_jobs.
+    Each trade keeps a heap, so a run costs O(bookings * log technicians)
+    instead of scoring every pair as a min-cost assignment would.
+    """
+    pools: Dict[str, list] = defaultdict(list)
+    for technician in technicians:
+        if technician.open_jobs < max_open_jobs:
+            pools[technician.skill].append((technician.open_jobs, -(technician.rating or 0.0), technician.id))
+    for pool in pools.values():
+        heapq.heapify(pool)
+
+    # (technician, day) -> busy half hours, as in the availability index
+    busy: Dict[Tuple[int, date], int] = defaultdict(int)
+    for technician_id, slot in busy_slots:
+        busy[technician_id, slot.day] |= slot.mask
+    # (skill, slot) pairs where every remaining technician is booked; load only grows within a run
+    exhausted: Set[Tuple[str, TimeSlot]] = set()
+
+    assignments = []
+    for booking in bookings:
+        for skill in (booking.skill, GENERAL_SKILL):
+            pool = pools.get(skill)
+            if not pool or (skill, booking.slot) in exhausted:
+                continue
+
+            skipped = []
+            chosen = None
+            while pool:
+                entry = heapq.heappop(pool)
+                if busy.get((entry[2], booking.slot.day), 0) & booking.slot.mask:
+                    skipped.append(entry)
+                    continue
+                chosen = entry
+                break
+            for entry in skipped:
+                heapq.heappush(pool, entry)
+
+            if chosen is None:
+                exhausted.add((skill, booking.slot))
+                continue
+
+            open_jobs, negative_rating, technician_id = chosen
+            busy[technician_id, booking.slot.day] |= booking.slot.mask
+            if open_jobs + 1 < max_open_jobs:
+                heapq.heappush(pool, (open_jobs + 1, negative_rating, technician_id))
+            assignments.append((booking.id, technician_id))
+            break
+
+    return assignments
+
+
+def notify_assignment(
+    db, booking: Booking, customer: Optional[User], tech_user: Optional[User], notify_customer: bool = True
+) -> None:
+    """Queue the customer (unless notify_customer is off) and technician emails for a booking that was just assigned"""
+    if not (customer and tech_user):
+        return
+
+    # Email to customer about technician assignment
+    if notify_customer:
+        send_booking_status_update_email(
+            customer_email=customer.email,
+            customer_name=customer.full_name,
+            booking_id=booking.id,
+            new_status=booking.status.value,
+            technician_name=tech_user.full_name,
+            technician_phone=tech_user.phone,
+            db=db
+        )
+
+    # Email to technician about new assignment
+    send_technician_assignment_email(
+        technician_email=tech_user.email,
+        technician_name=tech_user.full_name,
+        booking_id=booking.id,
+        customer_name=customer.full_name,
+        customer_phone=customer.phone,
+        service_name=f"Service #{booking.service_id}",
+        preferred_date=str(booking.preferred_date),
+        preferred_time=booking.preferred_time,
+        address=booking.address,
+        problem_description=booking.problem_description,
+        db=db
+    )
+
+
+class DispatchEngine:
+    """
+    Matches pending unassigned bookings to technicians in batches
+
+    A run reads the oldest DISPATCH_BATCH_SIZE pending bookings, the active
+    technicians with their open job counts (from booking_stats) and the
+    slots they are already booked in, plans every assignment at once with
+    plan_dispatch, then assigns and notifies in a single transaction. On
+    PostgreSQL an advisory lock keeps runs from different workers apart.
+    Runs on an interval when AUTO_DISPATCH_ENABLED, or on demand.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = settings.AUTO_DISPATCH_INTERVAL_SECONDS,
+        batch_size: int = settings.DISPATCH_BATCH_SIZE,
+        max_open_jobs: int = settings.DISPATCH_MAX_OPEN_JOBS
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_open_jobs = max_open_jobs
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, initial_delay: Optional[float] = None) -> None:
+        """Start the scheduled dispatch thread (first run after one interval unless initial_delay is given)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        delay = self.interval if initial_delay is None else initial_delay
+        self._thread = threading.Thread(target=self._run, args=(delay,), name="technician-dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the dispatch thread, waiting for the current run to finish"""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, initial_delay: float) -> None:
+        if self._stopped.wait(initial_delay):
+            return
+
+        while not self._stopped.is_set():
+            try:
+                result = self.run_once()
+                if result["assigned"]:
+                    print(f"Dispatched {result['assigned']} of {result['pending']} pending bookings")
+            except DispatchBusy:
+                pass
+            except Exception as e:
+                print(f"Technician dispatch failed: {str(e)}")
+            self._stopped.wait(self.interval)
+
+    def run_once(self, dry_run: bool = False) -> dict:
+        """Plan (and unless dry_run, apply) one batch; raises DispatchBusy if another run holds the lock"""
+        start = time.perf_counter()
+        db: Session = self.session_factory()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                if not db.execute(select(func.pg_try_advisory_xact_lock(DISPATCH_LOCK_ID))).scalar():
+                    raise DispatchBusy()
+
+            pending = self._load_pending(db)
+            assignments = []
+            if pending:
+                technicians, busy_slots = self._load_capacity(db, min(b.slot[0] for b in pending))
+                assignments = plan_dispatch(pending, technicians, busy_slots, self.max_open_jobs)
+
+            if dry_run:
+                db.rollback()
+            else:
+                assignments = self._apply(db, assignments)
+                db.commit()
+
+            return {
+                "dry_run": dry_run,
+                "pending": len(pending),
+                "assigned": len(assignments),
+                "unassigned": len(pending) - len(assignments),
+                "seconds": round(time.perf_counter() - start, 3),
+                "assignments": [
+                    {"booking_id": booking_id, "technician_id": technician_id}
+                    for booking_id, technician_id in assignments
+                ]
+            }
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load_pending(self, db: Session) -> List[PendingBooking]:
+        rows = db.execute(
+            select(Booking.id, Service.category, Booking.preferred_date, Booking.preferred_time).join(
+                Service, Booking.service_id == Service.id
+            ).where(
+                Booking.status == BookingStatus.PENDING,
+                Booking.technician_id.is_(None)
+            ).order_by(Booking.preferred_date, Booking.created_at, Booking.id).limit(self.batch_size)
+        ).all()
+        return [
+            PendingBooking(booking_id, skill_key(category), booking_slot(preferred_date, preferred_time))
+            for booking_id, category, preferred_date, preferred_time in rows
+        ]
+
+    def _load_capacity(
+        self, db: Session, earliest: date
+    ) -> Tuple[List[TechnicianCapacity], List[Tuple[int, TimeSlot]]]:
+        open_jobs = dict(db.execute(
+            select(BookingStats.technician_id, func.sum(BookingStats.count)).where(
+                BookingStats.status.in_(ACTIVE_STATUSES)
+            ).group_by(BookingStats.technician_id)
+        ).all())
+
+        technicians = [
+            TechnicianCapacity(technician_id, skill_key(specialization), rating or 0.0, open_jobs.get(technician_id, 0))
+            for technician_id, specialization, rating in db.execute(
+                select(Technician.id, Technician.specialization, Technician.rating).join(
+                    User, Technician.user_id == User.id
+                ).where(User.is_active == 1)
+            ).all()
+        ]
+
+        # Read from the database rather than the availability index, which may lag other workers
+        busy_slots = [
+            (technician_id, booking_slot(preferred_date, preferred_time))
+            for technician_id, preferred_date, preferred_time in db.execute(
+                select(Booking.technician_id, Booking.preferred_date, Booking.preferred_time).where(
+                    Booking.status.in_(OPEN_STATUSES),
+                    Booking.technician_id.is_not(None),
+                    Booking.preferred_date >= datetime.combine(earliest, datetime.min.time())
+                )
+            ).all()
+        ]
+        return technicians, busy_slots
+
+    def _apply(self, db: Session, assignments: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Assign the planned bookings that are still pending and unassigned, and queue their emails"""
+        technicians = {
+            technician.id: technician
+            for technician in db.execute(
+                select(Technician).options(joinedload(Technician.user)).where(
+                    Technician.id.in_({technician_id for _, technician_id in assignments})
+                )
+            ).scalars()
+        } if assignments else {}
+
+        applied = []
+        for offset in range(0, len(assignments), APPLY_CHUNK_SIZE):
+            chunk = dict(assignments[offset:offset + APPLY_CHUNK_SIZE])
+            # Bookings assigned or cancelled since planning, or locked by another transaction, are skipped
+            bookings = db.execute(
+                booking_select().where(
+                    Booking.id.in_(chunk),
+                    Booking.status == BookingStatus.PENDING,
+                    Booking.technician_id.is_(None)
+                ).with_for_update(of=Booking, skip_locked=True)
+            ).unique().scalars().all()
+
+            for booking in bookings:
+                technician = technicians[chunk[booking.id]]
+                booking.technician_id = technician.id
+                booking.status = BookingStatus.ACCEPTED
+                notify_assignment(db, booking, booking.customer, technician.user)
+                applied.append((booking.id, technician.id))
+            db.flush()
+
+        return applied
+
+
+dispatch_engine = DispatchEngine()
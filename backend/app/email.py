@@ -1,15 +1,272 @@
+import base64
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from email.header import Header
+from email.utils import formataddr
+from typing import Iterator, List, NamedTuple, Optional
+from sqlalchemy.orm import Session
 from .config import settings
+from .email_templates import render_template
+from .metrics import record_smtp_send
+from .models.email_outbox import EmailOutbox
 
 
-def send_email(
+def is_email_configured() -> bool:
+    """Check whether SMTP credentials are configured"""
+    return bool(settings.MAIL_USERNAME and settings.MAIL_PASSWORD)
+
+
+class OutgoingMessage(NamedTuple):
+    """A fully serialized email, ready to be handed to SMTP"""
+    to_email: str
+    data: bytes
+
+
+# The body is base64 encoded, so a boundary containing "_" can never collide with it
+_BOUNDARY = "=_QuickFix_Alternative_Part"
+
+# Headers and MIME structure shared by every message, built once
+_MESSAGE_PREFIX = (
+    f"From: {formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))}\r\n"
+    "MIME-Version: 1.0\r\n"
+    f'Content-Type: multipart/alternative; boundary="{_BOUNDARY}"\r\n'
+).encode("utf-8")
+_HTML_PART_HEADER = (
+    f"\r\n--{_BOUNDARY}\r\n"
+    'Content-Type: text/html; charset="utf-8"\r\n'
+    "MIME-Version: 1.0\r\n"
+    "Content-Transfer-Encoding: base64\r\n\r\n"
+).encode("ascii")
+_MESSAGE_SUFFIX = f"--{_BOUNDARY}--\r\n".encode("ascii")
+
+
+def _encode_header(value: str) -> str:
+    return value if value.isascii() else Header(value, "utf-8").encode()
+
+
+def build_message(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    to_name: Optional[str] = None
+) -> OutgoingMessage:
+    """Build an HTML email on top of the prebuilt MIME structure, only adding recipient headers and body"""
+    headers = f"To: {to_email}\r\nSubject: {_encode_header(subject)}\r\n".encode("utf-8")
+    body = base64.encodebytes(html_content.encode("utf-8")).replace(b"\n", b"\r\n")
+
+    return OutgoingMessage(
+        to_email=to_email,
+        data=b"".join((_MESSAGE_PREFIX, headers, _HTML_PART_HEADER, body, _MESSAGE_SUFFIX))
+    )
+
+
+class _PooledConnection:
+    """An SMTP session owned by the pool, connected lazily and reconnected on failure"""
+
+    def __init__(self):
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def connect(self) -> smtplib.SMTP:
+        if settings.MAIL_SSL_TLS:
+            server = smtplib.SMTP_SSL(settings.MAIL_SERVER, settings.MAIL_PORT, timeout=settings.MAIL_TIMEOUT_SECONDS)
+        else:
+            server = smtplib.SMTP(settings.MAIL_SERVER, settings.MAIL_PORT, timeout=settings.MAIL_TIMEOUT_SECONDS)
+
+        try:
+            if settings.MAIL_STARTTLS and not settings.MAIL_SSL_TLS:
+                server.starttls()
+
+            if settings.USE_CREDENTIALS:
+                server.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+
+        self.server = server
+        self.sent = 0
+        return server
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+        self.server = None
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of authenticated SMTP sessions
+
+    Sessions are kept open between sends so the TCP, STARTTLS and login
+    handshake is paid once per connection instead of once per message.
+    Idle sessions are health-checked with NOOP before reuse and recycled
+    after MAIL_POOL_MAX_MESSAGES_PER_CONNECTION messages.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.MAIL_POOL_SIZE,
+        idle_timeout: float = settings.MAIL_POOL_IDLE_TIMEOUT_SECONDS,
+        healthcheck_after: float = settings.MAIL_POOL_HEALTHCHECK_AFTER_SECONDS,
+        max_messages_per_connection: int = settings.MAIL_POOL_MAX_MESSAGES_PER_CONNECTION
+    ):
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self.max_messages_per_connection = max_messages_per_connection
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        idle_for = time.monotonic() - conn.last_used
+        if conn.server is None or idle_for > self.idle_timeout:
+            return False
+
+        if idle_for > self.healthcheck_after:
+            try:
+                return conn.server.noop()[0] == 250
+            except Exception:
+                return False
+
+        return True
+
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        """Check out a session for the duration of the block"""
+        self._slots.acquire()
+        conn = None
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else _PooledConnection()
+
+            # Stale or dead sessions are dropped and reconnected on first send
+            if conn.server is not None and not self._is_usable(conn):
+                conn.close()
+
+            yield conn
+        finally:
+            if conn is not None:
+                conn.last_used = time.monotonic()
+                if conn.server is not None:
+                    with self._lock:
+                        self._idle.append(conn)
+            self._slots.release()
+
+    def _send_one(self, conn: _PooledConnection, message: OutgoingMessage) -> Optional[Exception]:
+        # Retry once on a fresh session if the server dropped the connection
+        for attempt in range(2):
+            try:
+                if conn.server is not None and conn.sent >= self.max_messages_per_connection:
+                    conn.close()
+                if conn.server is None:
+                    conn.connect()
+
+                conn.server.sendmail(settings.MAIL_FROM, [message.to_email], message.data)
+                conn.sent += 1
+                return None
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                # Rejected message: reset the session and keep it for the next one
+                try:
+                    conn.server.rset()
+                except Exception:
+                    conn.close()
+                return e
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                conn.close()
+                if attempt == 1:
+                    return e
+            except Exception as e:
+                conn.close()
+                return e
+
+    def probe(self) -> None:
+        """Check that the server answers NOOP on a pooled session, raising otherwise"""
+        with self.connection() as conn:
+            if conn.server is None:
+                conn.connect()
+            code, message = conn.server.noop()
+            if code != 250:
+                conn.close()
+                raise smtplib.SMTPResponseException(code, message)
+
+    def send_many(self, messages: List[OutgoingMessage]) -> List[Optional[Exception]]:
+        """Send messages over one session and return the error for each message, or None"""
+        with self.connection() as conn:
+            return [self._timed_send(conn, message) for message in messages]
+
+    def _timed_send(self, conn: _PooledConnection, message: OutgoingMessage) -> Optional[Exception]:
+        start = time.perf_counter()
+        error = self._send_one(conn, message)
+        record_smtp_send(time.perf_counter() - start, error is None)
+        return error
+
+    def close(self) -> None:
+        """Close all idle sessions"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+def deliver_message(message: OutgoingMessage) -> None:
+    """Send a message over a pooled SMTP session, raising on failure"""
+    error = smtp_pool.send_many([message])[0]
+    if error is not None:
+        raise error
+
+
+def deliver_many(messages: List[OutgoingMessage]) -> List[Optional[Exception]]:
+    """Send messages over one pooled SMTP session, returning the error for each message"""
+    return smtp_pool.send_many(messages)
+
+
+def queue_email(
+    db: Session,
     to_email: str,
     subject: str,
     html_content: str,
     to_name: Optional[str] = None
+) -> Optional[EmailOutbox]:
+    """
+    Write an email to the outbox as part of the caller's transaction
+
+    Nothing is sent here. The message becomes visible to the outbox
+    dispatcher once the caller commits, and is discarded on rollback.
+    Without SMTP credentials nothing is queued (the dispatcher would never
+    send it) and None is returned.
+    """
+    if not is_email_configured():
+        print("Email not configured. Skipping email send.")
+        return None
+
+    outbox_entry = EmailOutbox(
+        to_email=to_email,
+        to_name=to_name,
+        subject=subject,
+        html_content=html_content
+    )
+    db.add(outbox_entry)
+    db.info["email_outbox_dirty"] = True
+    return outbox_entry
+
+
+def send_email(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    to_name: Optional[str] = None,
+    db: Optional[Session] = None
 ) -> bool:
     """
     Send an email using SMTP
@@ -19,35 +276,22 @@ def send_email(
         subject: Email subject
         html_content: HTML content of the email
         to_name: Optional recipient name
+        db: Optional session; when given the email is queued in the outbox
+            instead of being sent inline
 
     Returns:
-        bool: True if email sent successfully, False otherwise
+        bool: True if email sent (or queued) successfully, False otherwise
     """
+    if db is not None:
+        return queue_email(db, to_email, subject, html_content, to_name) is not None
+
     # Skip if email not configured
-    if not settings.MAIL_USERNAME or not settings.MAIL_PASSWORD:
+    if not is_email_configured():
         print("Email not configured. Skipping email send.")
         return False
 
     try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = f"{settings.MAIL_FROM_NAME} <{settings.MAIL_FROM}>"
-        message["To"] = to_email
-
-        # Add HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
-
-        # Connect to SMTP server and send email
-        with smtplib.SMTP(settings.MAIL_SERVER, settings.MAIL_PORT) as server:
-            if settings.MAIL_STARTTLS:
-                server.starttls()
-
-            if settings.USE_CREDENTIALS:
-                server.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
-
-            server.send_message(message)
+        deliver_message(build_message(to_email, subject, html_content, to_name))
 
         print(f"Email sent successfully to {to_email}")
         return True
@@ -57,6 +301,77 @@ def send_email(
         return False
 
 
+def send_many(emails: List[dict]) -> List[bool]:
+    """
+    Send a batch of emails over a single authenticated SMTP session
+
+    Args:
+        emails: List of dicts with to_email, subject, html_content and
+            optional to_name keys, as accepted by send_email
+
+    Returns:
+        List[bool]: Per-email result, True if sent successfully
+    """
+    if not emails:
+        return []
+
+    # Skip if email not configured
+    if not is_email_configured():
+        print("Email not configured. Skipping email send.")
+        return [False] * len(emails)
+
+    messages = [
+        build_message(email["to_email"], email["subject"], email["html_content"], email.get("to_name"))
+        for email in emails
+    ]
+    errors = deliver_many(messages)
+
+    results = []
+    for email, error in zip(emails, errors):
+        if error is None:
+            print(f"Email sent successfully to {email['to_email']}")
+        else:
+            print(f"Failed to send email to {email['to_email']}: {str(error)}")
+        results.append(error is None)
+
+    return results
+
+
+# Status content shared by every status update email
+STATUS_MESSAGES = {
+    "pending": {
+        "title": "Booking Pending",
+        "message": "Your booking is currently pending review.",
+        "color": "#ffc107",
+        "icon": "⏳"
+    },
+    "accepted": {
+        "title": "Booking Accepted",
+        "message": "Great news! Your booking has been accepted by a technician.",
+        "color": "#17a2b8",
+        "icon": "✅"
+    },
+    "in_progress": {
+        "title": "Work In Progress",
+        "message": "The technician is currently working on your service request.",
+        "color": "#007bff",
+        "icon": "🔧"
+    },
+    "completed": {
+        "title": "Service Completed",
+        "message": "Your service request has been completed successfully!",
+        "color": "#28a745",
+        "icon": "🎉"
+    },
+    "cancelled": {
+        "title": "Booking Cancelled",
+        "message": "Your booking has been cancelled.",
+        "color": "#dc3545",
+        "icon": "❌"
+    }
+}
+
+
 def send_booking_confirmation_email(
     customer_email: str,
     customer_name: str,
@@ -65,128 +380,25 @@ def send_booking_confirmation_email(
     preferred_date: str,
     preferred_time: str,
     address: str,
-    problem_description: str
+    problem_description: str,
+    db: Optional[Session] = None
 ) -> bool:
-    """Send booking confirmation email to customer"""
+    """Send booking confirmation email to customer (queued in the outbox when db is given)"""
 
     subject = f"Booking Confirmation - QuickFix #{booking_id}"
 
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-                border-radius: 10px 10px 0 0;
-            }}
-            .content {{
-                background: #f9f9f9;
-                padding: 30px;
-                border: 1px solid #ddd;
-            }}
-            .booking-details {{
-                background: white;
-                padding: 20px;
-                border-radius: 8px;
-                margin: 20px 0;
-            }}
-            .detail-row {{
-                padding: 10px 0;
-                border-bottom: 1px solid #eee;
-            }}
-            .detail-label {{
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .footer {{
-                text-align: center;
-                padding: 20px;
-                color: #666;
-                font-size: 12px;
-            }}
-            .status-badge {{
-                display: inline-block;
-                background: #ffc107;
-                color: #000;
-                padding: 5px 15px;
-                border-radius: 20px;
-                font-weight: bold;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔧 QuickFix</h1>
-                <h2>Booking Confirmation</h2>
-            </div>
-            <div class="content">
-                <p>Hi {customer_name},</p>
-                <p>Thank you for choosing QuickFix! Your service request has been received successfully.</p>
-
-                <div class="booking-details">
-                    <h3>Booking Details</h3>
-                    <div class="detail-row">
-                        <span class="detail-label">Booking ID:</span> #{booking_id}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Service:</span> {service_name}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Status:</span> <span class="status-badge">PENDING</span>
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Preferred Date:</span> {preferred_date}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Preferred Time:</span> {preferred_time}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Address:</span> {address}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Problem Description:</span><br>
-                        {problem_description}
-                    </div>
-                </div>
-
-                <p><strong>What happens next?</strong></p>
-                <ul>
-                    <li>Our team will review your request</li>
-                    <li>A technician will be assigned to your booking</li>
-                    <li>You'll receive an email notification when a technician is assigned</li>
-                    <li>The technician will contact you to confirm the appointment</li>
-                </ul>
-
-                <p>If you have any questions, feel free to contact us.</p>
-
-                <p>Best regards,<br>
-                <strong>QuickFix Team</strong></p>
-            </div>
-            <div class="footer">
-                <p>© 2025 QuickFix - Technician Booking & Dispatch Portal</p>
-                <p>This is an automated email. Please do not reply.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    html_content = render_template(
+        "booking_confirmation",
+        customer_name=customer_name,
+        booking_id=booking_id,
+        service_name=service_name,
+        preferred_date=preferred_date,
+        preferred_time=preferred_time,
+        address=address,
+        problem_description=problem_description
+    )
 
-    return send_email(customer_email, subject, html_content, customer_name)
+    return send_email(customer_email, subject, html_content, customer_name, db=db)
 
 
 def send_booking_status_update_email(
@@ -195,158 +407,43 @@ def send_booking_status_update_email(
     booking_id: int,
     new_status: str,
     technician_name: Optional[str] = None,
-    technician_phone: Optional[str] = None
+    technician_phone: Optional[str] = None,
+    db: Optional[Session] = None
 ) -> bool:
-    """Send booking status update email to customer"""
-
-    status_messages = {
-        "pending": {
-            "title": "Booking Pending",
-            "message": "Your booking is currently pending review.",
-            "color": "#ffc107",
-            "icon": "⏳"
-        },
-        "accepted": {
-            "title": "Booking Accepted",
-            "message": "Great news! Your booking has been accepted by a technician.",
-            "color": "#17a2b8",
-            "icon": "✅"
-        },
-        "in_progress": {
-            "title": "Work In Progress",
-            "message": "The technician is currently working on your service request.",
-            "color": "#007bff",
-            "icon": "🔧"
-        },
-        "completed": {
-            "title": "Service Completed",
-            "message": "Your service request has been completed successfully!",
-            "color": "#28a745",
-            "icon": "🎉"
-        },
-        "cancelled": {
-            "title": "Booking Cancelled",
-            "message": "Your booking has been cancelled.",
-            "color": "#dc3545",
-            "icon": "❌"
-        }
-    }
+    """Send booking status update email to customer (queued in the outbox when db is given)"""
 
-    status_info = status_messages.get(new_status, status_messages["pending"])
+    status_info = STATUS_MESSAGES.get(new_status, STATUS_MESSAGES["pending"])
 
     subject = f"Booking Update - QuickFix #{booking_id} - {status_info['title']}"
 
     technician_info = ""
     if technician_name:
-        technician_info = f"""
-        <div class="technician-info">
-            <h3>👨‍🔧 Assigned Technician</h3>
-            <p><strong>Name:</strong> {technician_name}</p>
-            {f'<p><strong>Phone:</strong> {technician_phone}</p>' if technician_phone else ''}
-        </div>
-        """
-
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-                border-radius: 10px 10px 0 0;
-            }}
-            .content {{
-                background: #f9f9f9;
-                padding: 30px;
-                border: 1px solid #ddd;
-            }}
-            .status-box {{
-                background: white;
-                padding: 30px;
-                border-radius: 8px;
-                text-align: center;
-                margin: 20px 0;
-                border-left: 5px solid {status_info['color']};
-            }}
-            .status-icon {{
-                font-size: 48px;
-                margin-bottom: 10px;
-            }}
-            .technician-info {{
-                background: white;
-                padding: 20px;
-                border-radius: 8px;
-                margin: 20px 0;
-            }}
-            .footer {{
-                text-align: center;
-                padding: 20px;
-                color: #666;
-                font-size: 12px;
-            }}
-            .status-badge {{
-                display: inline-block;
-                background: {status_info['color']};
-                color: white;
-                padding: 8px 20px;
-                border-radius: 20px;
-                font-weight: bold;
-                font-size: 16px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔧 QuickFix</h1>
-                <h2>Booking Status Update</h2>
-            </div>
-            <div class="content">
-                <p>Hi {customer_name},</p>
-
-                <div class="status-box">
-                    <div class="status-icon">{status_info['icon']}</div>
-                    <h2>{status_info['title']}</h2>
-                    <p>{status_info['message']}</p>
-                    <div style="margin-top: 15px;">
-                        <span class="status-badge">{new_status.replace('_', ' ').upper()}</span>
-                    </div>
-                </div>
-
-                <p><strong>Booking ID:</strong> #{booking_id}</p>
-
-                {technician_info}
-
-                <p>You can track your booking status anytime by logging into your QuickFix account.</p>
-
-                <p>Thank you for choosing QuickFix!</p>
-
-                <p>Best regards,<br>
-                <strong>QuickFix Team</strong></p>
-            </div>
-            <div class="footer">
-                <p>© 2025 QuickFix - Technician Booking & Dispatch Portal</p>
-                <p>This is an automated email. Please do not reply.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    return send_email(customer_email, subject, html_content, customer_name)
+        technician_phone_row = ""
+        if technician_phone:
+            technician_phone_row = render_template(
+                "partials/technician_phone_row",
+                technician_phone=technician_phone
+            )
+
+        technician_info = render_template(
+            "partials/technician_info",
+            technician_name=technician_name,
+            technician_phone_row=technician_phone_row
+        )
+
+    html_content = render_template(
+        "booking_status_update",
+        customer_name=customer_name,
+        booking_id=booking_id,
+        status_color=status_info["color"],
+        status_icon=status_info["icon"],
+        status_title=status_info["title"],
+        status_message=status_info["message"],
+        status_label=new_status.replace("_", " ").upper(),
+        technician_info=technician_info
+    )
+
+    return send_email(customer_email, subject, html_content, customer_name, db=db)
 
 
 def send_technician_assignment_email(
@@ -359,115 +456,31 @@ def send_technician_assignment_email(
     preferred_date: str,
     preferred_time: str,
     address: str,
-    problem_description: str
+    problem_description: str,
+    db: Optional[Session] = None
 ) -> bool:
-    """Send assignment notification email to technician"""
+    """Send assignment notification email to technician (queued in the outbox when db is given)"""
 
     subject = f"New Job Assignment - QuickFix #{booking_id}"
 
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-                border-radius: 10px 10px 0 0;
-            }}
-            .content {{
-                background: #f9f9f9;
-                padding: 30px;
-                border: 1px solid #ddd;
-            }}
-            .job-details {{
-                background: white;
-                padding: 20px;
-                border-radius: 8px;
-                margin: 20px 0;
-            }}
-            .detail-row {{
-                padding: 10px 0;
-                border-bottom: 1px solid #eee;
-            }}
-            .detail-label {{
-                font-weight: bold;
-                color: #11998e;
-            }}
-            .footer {{
-                text-align: center;
-                padding: 20px;
-                color: #666;
-                font-size: 12px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔧 QuickFix</h1>
-                <h2>New Job Assignment</h2>
-            </div>
-            <div class="content">
-                <p>Hi {technician_name},</p>
-                <p>You have been assigned to a new service request. Please review the details below:</p>
-
-                <div class="job-details">
-                    <h3>Job Details</h3>
-                    <div class="detail-row">
-                        <span class="detail-label">Booking ID:</span> #{booking_id}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Service:</span> {service_name}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Customer:</span> {customer_name}
-                    </div>
-                    {f'<div class="detail-row"><span class="detail-label">Customer Phone:</span> {customer_phone}</div>' if customer_phone else ''}
-                    <div class="detail-row">
-                        <span class="detail-label">Scheduled Date:</span> {preferred_date}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Scheduled Time:</span> {preferred_time}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Address:</span> {address}
-                    </div>
-                    <div class="detail-row">
-                        <span class="detail-label">Problem Description:</span><br>
-                        {problem_description}
-                    </div>
-                </div>
-
-                <p><strong>Next Steps:</strong></p>
-                <ul>
-                    <li>Log in to your QuickFix portal to accept or review the assignment</li>
-                    <li>Contact the customer to confirm the appointment</li>
-                    <li>Update the job status as you progress</li>
-                </ul>
-
-                <p>Best regards,<br>
-                <strong>QuickFix Team</strong></p>
-            </div>
-            <div class="footer">
-                <p>© 2025 QuickFix - Technician Booking & Dispatch Portal</p>
-                <p>This is an automated email. Please do not reply.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    return send_email(technician_email, subject, html_content, technician_name)
+    customer_phone_row = ""
+    if customer_phone:
+        customer_phone_row = render_template(
+            "partials/customer_phone_row",
+            customer_phone=customer_phone
+        )
+
+    html_content = render_template(
+        "technician_assignment",
+        technician_name=technician_name,
+        booking_id=booking_id,
+        service_name=service_name,
+        customer_name=customer_name,
+        customer_phone_row=customer_phone_row,
+        preferred_date=preferred_date,
+        preferred_time=preferred_time,
+        address=address,
+        problem_description=problem_description
+    )
+
+    return send_email(technician_email, subject, html_content, technician_name, db=db)
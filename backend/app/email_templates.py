@@ -0,0 +1,51 @@
+import re
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+TEMPLATE_DIR = Path(__file__).parent / "templates" / "email"
+
+# {{ name }} escapes the value, {{ name | safe }} inserts pre-rendered HTML as is
+_SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*(\|\s*safe\s*)?\}\}")
+
+
+class EmailTemplate:
+    """
+    HTML template compiled once into literal chunks and named slots
+
+    Rendering only joins the precompiled literals with the escaped slot
+    values, so the kilobytes of static markup and CSS are never rebuilt.
+    """
+
+    def __init__(self, source: str):
+        parts = _SLOT_PATTERN.split(source)
+        self._literals: List[str] = parts[0::3]
+        self._slots: List[Tuple[str, bool]] = [
+            (name, bool(safe)) for name, safe in zip(parts[1::3], parts[2::3])
+        ]
+
+    def render(self, **context) -> str:
+        """Render the template, HTML-escaping every value not marked safe"""
+        chunks = [self._literals[0]]
+        for (name, safe), literal in zip(self._slots, self._literals[1:]):
+            value = str(context[name])
+            chunks.append(value if safe else escape(value))
+            chunks.append(literal)
+        return "".join(chunks)
+
+
+def _load_templates() -> Dict[str, EmailTemplate]:
+    """Load and compile every template under TEMPLATE_DIR, keyed by relative path without extension"""
+    return {
+        path.relative_to(TEMPLATE_DIR).with_suffix("").as_posix(): EmailTemplate(path.read_text(encoding="utf-8").rstrip("\n"))
+        for path in sorted(TEMPLATE_DIR.rglob("*.html"))
+    }
+
+
+# Compiled once at import time
+TEMPLATES = _load_templates()
+
+
+def render_template(name: str, **context) -> str:
+    """Render a cached email template by name (e.g. booking_confirmation, partials/technician_info)"""
+    return TEMPLATES[name].render(**context)
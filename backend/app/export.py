@@ -0,0 +1,163 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Iterator, Optional, Sequence
+from sqlalchemy import Select, select
+from sqlalchemy.orm import aliased
+
+from .config import settings
+from .database import async_engine, engine
+from .models.booking import Booking, BookingStatus
+from .models.service import Service
+from .models.technician import Technician
+from .models.user import User
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+_Customer = aliased(User, name="customer")
+_TechnicianUser = aliased(User, name="technician_user")
+
+# Flat export row: (column name, expression), in output order
+EXPORT_COLUMNS = (
+    ("booking_id", Booking.id),
+    ("status", Booking.status),
+    ("created_at", Booking.created_at),
+    ("updated_at", Booking.updated_at),
+    ("completed_at", Booking.completed_at),
+    ("preferred_date", Booking.preferred_date),
+    ("preferred_time", Booking.preferred_time),
+    ("final_price", Booking.final_price),
+    ("address", Booking.address),
+    ("problem_description", Booking.problem_description),
+    ("customer_id", Booking.customer_id),
+    ("customer_name", _Customer.full_name),
+    ("customer_email", _Customer.email),
+    ("customer_phone", _Customer.phone),
+    ("service_id", Booking.service_id),
+    ("service_name", Service.name),
+    ("service_category", Service.category),
+    ("service_base_price", Service.base_price),
+    ("technician_id", Booking.technician_id),
+    ("technician_name", _TechnicianUser.full_name),
+    ("technician_email", _TechnicianUser.email),
+    ("technician_phone", _TechnicianUser.phone),
+    ("technician_specialization", Technician.specialization),
+)
+EXPORT_FIELDS = [name for name, _ in EXPORT_COLUMNS]
+
+
+def export_query(
+    booking_status: Optional[BookingStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Select:
+    """
+    Bookings joined with customer, service and technician as plain columns
+
+    Rows come back in the listing order (created_at, id), so the date range
+    is served by the ix_bookings_*created_at_id indexes. date_to is inclusive.
+    """
+    query = select(*(column for _, column in EXPORT_COLUMNS)).select_from(Booking).join(
+        _Customer, Booking.customer_id == _Customer.id
+    ).join(
+        Service, Booking.service_id == Service.id
+    ).outerjoin(
+        Technician, Booking.technician_id == Technician.id
+    ).outerjoin(
+        _TechnicianUser, Technician.user_id == _TechnicianUser.id
+    )
+
+    if booking_status:
+        query = query.where(Booking.status == booking_status)
+    if date_from:
+        query = query.where(Booking.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        query = query.where(Booking.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    return query.order_by(Booking.created_at, Booking.id)
+
+
+def _value_converter(column):
+    python_type = column.type.python_type
+    if issubclass(python_type, enum.Enum):
+        return lambda value: value.value
+    if issubclass(python_type, (datetime, date)):
+        return lambda value: value.isoformat()
+    return None
+
+
+# (position, converter) of the columns that are not plain JSON/CSV values, so the
+# hot loop below only touches those instead of checking every value of every row
+_CONVERSIONS = [
+    (position, converter)
+    for position, converter in enumerate(_value_converter(column) for _, column in EXPORT_COLUMNS)
+    if converter is not None
+]
+_encode_json = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+
+def _plain_rows(rows: Sequence[Sequence]) -> Iterator[list]:
+    for row in rows:
+        values = list(row)
+        for position, converter in _CONVERSIONS:
+            value = values[position]
+            if value is not None:
+                values[position] = converter(value)
+        yield values
+
+
+def encode_rows(rows: Sequence[Sequence], export_format: ExportFormat, header: bool = False) -> str:
+    """One chunk of the export body for a batch of rows"""
+    if export_format == ExportFormat.NDJSON:
+        return "".join(_encode_json(dict(zip(EXPORT_FIELDS, values))) + "\n" for values in _plain_rows(rows))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(_plain_rows(rows))
+    return buffer.getvalue()
+
+
+def _batches(query: Select) -> Select:
+    # Server-side cursor, fetched EXPORT_BATCH_SIZE rows at a time
+    return query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+
+def iter_export(query: Select, export_format: ExportFormat) -> Iterator[str]:
+    """Stream an export with the sync engine (iterated on the threadpool by StreamingResponse)"""
+    if export_format == ExportFormat.CSV:
+        yield encode_rows([], export_format, header=True)
+
+    with engine.connect() as connection:
+        for rows in connection.execute(_batches(query)).partitions():
+            yield encode_rows(rows, export_format)
+
+
+async def aiter_export(query: Select, export_format: ExportFormat) -> AsyncIterator[str]:
+    """Stream an export with the async engine"""
+    if export_format == ExportFormat.CSV:
+        yield encode_rows([], export_format, header=True)
+
+    async with async_engine.connect() as connection:
+        result = await connection.stream(_batches(query))
+        async for rows in result.partitions():
+            yield encode_rows(rows, export_format)
+
+
+def stream_export(query: Select, export_format: ExportFormat):
+    """Export body iterator for the engine serving requests"""
+    if async_engine is not None:
+        return aiter_export(query, export_format)
+    return iter_export(query, export_format)
@@ -0,0 +1,98 @@
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class ListView(str, Enum):
+    FULL = "full"
+    COMPACT = "compact"
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma separated response fields to return, e.g. id,status,address. "
+                "Only the columns (and joins) those fields need are queried."
+)
+VIEW_QUERY = Query(ListView.FULL, description="compact returns a short summary of each item; ignored when fields is given")
+
+
+class Field(NamedTuple):
+    """Labeled columns a response field is read from, how to build it from a row, and the join it needs"""
+    columns: Tuple[Any, ...]
+    build: Callable[[Any], Any]
+    join: Optional[Callable[[Select], Select]] = None
+
+
+def column_field(
+    column: InstrumentedAttribute,
+    name: Optional[str] = None,
+    join: Optional[Callable[[Select], Select]] = None
+) -> Field:
+    """Field holding one column as is"""
+    name = name or column.key
+    return Field((column.label(name),), lambda row: getattr(row, name), join)
+
+
+def nested_field(prefix: str, columns: Dict[str, Any], join: Callable[[Select], Select], present: str = "id") -> Field:
+    """Field holding an object built from joined columns; None when the outer join found no row"""
+    labels = {key: f"{prefix}__{key}" for key in columns}
+
+    def build(row) -> Optional[dict]:
+        if getattr(row, labels[present]) is None:
+            return None
+        return {key: getattr(row, label) for key, label in labels.items()}
+
+    return Field(tuple(column.label(labels[key]) for key, column in columns.items()), build, join)
+
+
+class FieldSet:
+    """
+    Response fields of a listing that can be loaded column by column
+
+    Backs the fields= and view=compact listing parameters: instead of
+    loading whole ORM objects with their relationships, the SELECT lists only
+    the columns of the requested fields and joins only the tables they need.
+    Fields are kept in the order of the full response model.
+    """
+
+    def __init__(self, entity: Any, fields: Dict[str, Field], compact: Sequence[str]):
+        self.entity = entity
+        self.fields = fields
+        self.compact = tuple(compact)
+
+    def resolve(self, fields: Optional[str], view: ListView) -> Optional[Tuple[str, ...]]:
+        """Requested field names in response order, or None for the full response"""
+        if fields:
+            requested = {name.strip() for name in fields.split(",") if name.strip()}
+            unknown = requested - self.fields.keys()
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}"
+                )
+            if requested:
+                return tuple(name for name in self.fields if name in requested)
+
+        if view == ListView.COMPACT:
+            return self.compact
+        return None
+
+    def select(self, names: Sequence[str], keys: Sequence[InstrumentedAttribute]) -> Select:
+        """SELECT of the columns behind names, plus the sort keys the pagination cursor is built from"""
+        selected = list(names) + [key.key for key in keys if key.key not in names]
+        query = select(*[column for name in selected for column in self.fields[name].columns]).select_from(self.entity)
+
+        joins = []
+        for name in selected:
+            join = self.fields[name].join
+            if join is not None and join not in joins:
+                joins.append(join)
+        for join in joins:
+            query = join(query)
+        return query
+
+    def serialize(self, rows: Sequence[Any], names: Sequence[str]) -> List[dict]:
+        builders = [(name, self.fields[name].build) for name in names]
+        return [{name: build(row) for name, build in builders} for row in rows]
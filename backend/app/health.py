@@ -0,0 +1,131 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import func, select, text
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+from .database import async_engine, engine, get_pool_status
+from .email import is_email_configured, smtp_pool
+from .models.email_outbox import EmailOutbox, OutboxStatus
+from .outbox import dispatcher
+
+
+class MemoizedProbe:
+    """
+    Caches the result of an async probe for ttl_seconds
+
+    Concurrent callers that find the result stale wait for a single
+    refresh instead of each running the probe, so a burst of health
+    checks costs at most one round of dependency queries per TTL.
+    """
+
+    def __init__(self, probe: Callable[[], Awaitable[dict]], ttl_seconds: float):
+        self.probe = probe
+        self.ttl_seconds = ttl_seconds
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.ttl_seconds
+
+    async def get(self) -> dict:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    self._result = await self.probe()
+                    self._checked_at = time.monotonic()
+        return {**self._result, "age_seconds": round(time.monotonic() - self._checked_at, 3)}
+
+
+def _database_checks(connection) -> dict:
+    from .cli import current_revision
+
+    connection.execute(text("SELECT 1"))
+    return {"revision": current_revision(connection)}
+
+
+def _outbox_backlog(connection) -> dict:
+    due, oldest = connection.execute(
+        select(func.count(EmailOutbox.id), func.min(EmailOutbox.next_attempt_at)).where(
+            EmailOutbox.status == OutboxStatus.PENDING,
+            EmailOutbox.next_attempt_at <= datetime.utcnow()
+        )
+    ).one()
+    return {
+        "due": due,
+        "oldest_due_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0.0
+    }
+
+
+async def _run_on_connection(*checks: Callable) -> list:
+    """Run sync checks over one pooled connection, on whichever engine serves requests"""
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            return [await connection.run_sync(check) for check in checks]
+
+    def _run():
+        with engine.connect() as connection:
+            return [check(connection) for check in checks]
+
+    return await run_in_threadpool(_run)
+
+
+async def _timed(awaitable: Awaitable) -> tuple:
+    start = time.perf_counter()
+    result = await asyncio.wait_for(awaitable, settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def _failure(e: Exception) -> dict:
+    # Only the exception type: driver messages include hosts and ports
+    return {"ok": False, "error": type(e).__name__}
+
+
+async def _probe_dependencies() -> dict:
+    """Run every readiness probe once; the database and schema are required, email is reported as degraded"""
+    # Alembic is only imported on the first probe, keeping it off the worker import path
+    from .cli import head_revision
+
+    checks = {}
+    email_enabled = settings.HEALTH_CHECK_EMAIL and is_email_configured()
+    connection_checks = (_database_checks, _outbox_backlog) if email_enabled else (_database_checks,)
+
+    try:
+        results, latency_ms = await _timed(_run_on_connection(*connection_checks))
+        checks["database"] = {"ok": True, "latency_ms": latency_ms}
+        head = head_revision()
+        current = results[0]["revision"]
+        checks["schema"] = {"ok": current == head, "current": current, "head": head}
+    except Exception as e:
+        results = None
+        checks["database"] = _failure(e)
+
+    if email_enabled:
+        outbox = {"dispatcher_running": dispatcher.is_running() or not settings.OUTBOX_DISPATCHER_ENABLED}
+        if results is not None:
+            outbox.update(results[1])
+        checks["outbox"] = {"ok": outbox["dispatcher_running"] and results is not None, **outbox}
+
+        try:
+            _, latency_ms = await _timed(run_in_threadpool(smtp_pool.probe))
+            checks["smtp"] = {"ok": True, "latency_ms": latency_ms}
+        except Exception as e:
+            checks["smtp"] = _failure(e)
+
+    ready = checks["database"]["ok"] and checks.get("schema", {}).get("ok", False)
+    return {
+        "status": "ready" if ready else "not_ready",
+        "degraded": not all(check["ok"] for check in checks.values()),
+        "checks": checks
+    }
+
+
+readiness_probe = MemoizedProbe(_probe_dependencies, settings.HEALTH_CHECK_CACHE_SECONDS)
+
+
+async def check_readiness() -> dict:
+    """Memoized dependency probes plus the live connection pool occupancy"""
+    readiness = await readiness_probe.get()
+    return {**readiness, "pool": get_pool_status()}
@@ -1,18 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from .config import settings
-from .database import engine, Base
+from .responses import ORJSONResponse
+from .database import async_engine, get_pool_status, warm_up_pool
+from .health import check_readiness
+from .email import smtp_pool
+from .outbox import dispatcher
+from .dispatch import dispatch_engine
+from .availability import availability_index
+from .password_hashing import password_hasher
+from .principal_cache import principal_cache, token_state_cache
+from .catalog_cache import catalog_cache
+from .metrics import MetricsMiddleware, render_metrics
 
-# Import models to register them with SQLAlchemy
-from .models import user, technician, service, booking
+# Import models to register them with SQLAlchemy (the schema itself is managed by Alembic)
+from .models import user, technician, service, booking, booking_stats, email_outbox
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not settings.LAZY_STARTUP:
+        # Warm the pools so the first requests do not pay for connecting or spawning
+        await password_hasher.start()
+        try:
+            await asyncio.wait_for(warm_up_pool(), settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+            # Technician schedules, otherwise built by the first availability query
+            await run_in_threadpool(availability_index.refresh)
+        except Exception as e:
+            # A database outage must not keep the worker from starting, /health/ready reports it
+            print(f"Database warm-up failed: {str(e) or type(e).__name__}")
+
+    # Deliver queued emails in the background (lazy workers wait one poll interval before touching the DB)
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        dispatcher.start(initial_delay=settings.OUTBOX_POLL_INTERVAL_SECONDS if settings.LAZY_STARTUP else 0.0)
+    # Assign technicians to pending bookings on a schedule
+    if settings.AUTO_DISPATCH_ENABLED:
+        dispatch_engine.start()
+    yield
+    dispatch_engine.stop()
+    dispatcher.stop()
+    password_hasher.shutdown()
+    smtp_pool.close()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="QuickFix API",
     description="Technician Booking & Dispatch Portal API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Responses are encoded with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -24,6 +67,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and SQL metrics (outermost, so CORS handling is timed too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 def read_root():
@@ -35,10 +82,62 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/live")
+def liveness_check():
+    """Liveness: the process is serving requests (no dependency is touched)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: database reachable and schema at the migration head (503 otherwise), memoized for a few seconds"""
+    readiness = await check_readiness()
+    return ORJSONResponse(readiness, status_code=200 if readiness["status"] == "ready" else 503)
+
+
+@app.get("/health/pool")
+def pool_status():
+    """Database pool occupancy and checkout wait metrics, for sizing the pool"""
+    return get_pool_status()
+
+
+@app.get("/health/auth")
+def auth_status():
+    """Password hashing queue and authentication cache metrics"""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_state_cache": token_state_cache.stats()
+    }
+
+
+@app.get("/health/cache")
+def cache_status():
+    """Service catalog cache hit, miss and 304 counters"""
+    return {"catalog_cache": catalog_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request, SQL, SMTP and pool metrics in the Prometheus text format"""
+    pool = get_pool_status()
+    counters = pool["metrics"]
+    samples = [
+        ("quickfix_db_pool_size", "gauge", "Configured pool size", pool.get("size", 0)),
+        ("quickfix_db_pool_checked_out", "gauge", "Connections currently checked out", pool.get("checked_out", 0)),
+        ("quickfix_db_pool_overflow", "gauge", "Connections open beyond the pool size", pool.get("overflow", 0)),
+        ("quickfix_db_pool_connects_total", "counter", "New database connections opened", counters["connects"]),
+        ("quickfix_db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection", counters["timeouts"]),
+        ("quickfix_db_pool_invalidations_total", "counter", "Connections invalidated after errors", counters["invalidations"])
+    ]
+    return PlainTextResponse(render_metrics(samples), media_type="text/plain; version=0.0.4")
+
+
 # Import and include routers
-from .routers import auth, technicians, services, bookings
+from .routers import auth, technicians, services, bookings, analytics
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(technicians.router, prefix="/api/technicians", tags=["Technicians"])
 app.include_router(services.router, prefix="/api/services", tags=["Services"])
 app.include_router(bookings.router, prefix="/api/bookings", tags=["Bookings"])
+app.include_router(analytics.router, prefix="/api/admin/analytics", tags=["Admin"])
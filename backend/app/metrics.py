@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .query_log import call_site, log_repeated_statements, log_slow_statement
+
+# Bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Label of requests that matched no route, so scanners cannot blow up the series count
+UNMATCHED_ROUTE = "unmatched"
+
+# Slow query log thresholds (0 disables either check)
+SLOW_QUERY_SECONDS = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+REPEAT_THRESHOLD = settings.SLOW_QUERY_REPEAT_THRESHOLD
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with fixed buckets, one series per label values"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in sorted(self._series.items())]
+
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                bucket_labels = _format_labels((*self.labelnames, "le"), (*labels, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Thread-safe Prometheus counter, one series per label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        lines.extend(
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in series
+        )
+        return lines
+
+
+request_duration = Histogram(
+    "quickfix_http_request_duration_seconds", "Time from request start to the end of the response body",
+    LATENCY_BUCKETS, ("method", "route", "status")
+)
+request_statements = Histogram(
+    "quickfix_http_request_db_statements", "SQL statements executed per request",
+    STATEMENT_BUCKETS, ("method", "route")
+)
+request_db_time = Histogram(
+    "quickfix_http_request_db_seconds", "Time spent executing SQL per request",
+    DB_TIME_BUCKETS, ("method", "route")
+)
+request_pool_wait = Histogram(
+    "quickfix_http_request_pool_wait_seconds", "Time waiting for pooled database connections per request",
+    WAIT_BUCKETS, ("method", "route")
+)
+request_smtp_time = Histogram(
+    "quickfix_http_request_smtp_seconds", "Time sending email inline per request (the outbox sends most mail)",
+    LATENCY_BUCKETS, ("method", "route")
+)
+db_statements = Counter(
+    "quickfix_db_statements_total", "SQL statements executed, in requests and background jobs", ("context",)
+)
+db_time = Counter(
+    "quickfix_db_statement_seconds_total", "Time spent executing SQL, in requests and background jobs", ("context",)
+)
+pool_wait = Histogram(
+    "quickfix_db_pool_checkout_wait_seconds", "Time waiting for a pooled database connection (including connecting)",
+    WAIT_BUCKETS
+)
+smtp_send = Histogram(
+    "quickfix_smtp_send_seconds", "Time to send one email over SMTP (including connecting)",
+    LATENCY_BUCKETS, ("outcome",)
+)
+
+
+class RequestMetrics:
+    """Costs accumulated by the request being served, see current_request"""
+    __slots__ = ("scope", "task", "statements", "db_seconds", "pool_wait_seconds", "smtp_seconds", "executions")
+
+    def __init__(self, scope: Optional[Scope] = None, task: Optional[asyncio.Task] = None):
+        self.scope = scope
+        self.task = task
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.smtp_seconds = 0.0
+        # SQL string -> [executions, seconds, call site, handler], for the repeated statement rollup
+        self.executions: Dict[str, list] = {}
+
+    def repeated_statements(self) -> List[tuple]:
+        """Statements run at least REPEAT_THRESHOLD times, most executed first"""
+        if not REPEAT_THRESHOLD:
+            return []
+        repeated = [(statement, *entry) for statement, entry in self.executions.items() if entry[0] >= REPEAT_THRESHOLD]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+# Set by MetricsMiddleware; threadpool calls run in a copy of the request context
+# and share this object, so sync sessions are attributed to their request too
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+
+def record_statement(seconds: float, statement: str, parameters, executemany: bool) -> None:
+    request = current_request.get()
+    context = "request" if request is not None else "background"
+    executions = 1
+    if request is not None:
+        request.statements += 1
+        request.db_seconds += seconds
+        entry = request.executions.get(statement)
+        if entry is None:
+            entry = request.executions[statement] = [0, 0.0, None, None]
+        entry[0] += 1
+        entry[1] += seconds
+        executions = entry[0]
+        if executions == REPEAT_THRESHOLD:
+            # Only the call site of statements that end up in the rollup is looked up
+            entry[2], entry[3] = call_site(request.task)
+    db_statements.inc(1, context)
+    db_time.inc(seconds, context)
+
+    if SLOW_QUERY_SECONDS and seconds >= SLOW_QUERY_SECONDS:
+        log_slow_statement(
+            statement, parameters, executemany, seconds,
+            request.scope if request is not None else None, request.task if request is not None else None, executions
+        )
+
+
+def record_pool_wait(seconds: float) -> None:
+    request = current_request.get()
+    if request is not None:
+        request.pool_wait_seconds += seconds
+    pool_wait.observe(seconds)
+
+
+def record_smtp_send(seconds: float, ok: bool) -> None:
+    request = current_request.get()
+    if request is not None:
+        request.smtp_seconds += seconds
+    smtp_send.observe(seconds, "sent" if ok else "failed")
+
+
+def server_timing(request: RequestMetrics, total_seconds: float) -> str:
+    """Server-Timing header value (durations in milliseconds)"""
+    parts = [
+        f"total;dur={total_seconds * 1000:.1f}",
+        f'db;dur={request.db_seconds * 1000:.1f};desc="{request.statements} queries"'
+    ]
+    if request.pool_wait_seconds:
+        parts.append(f"pool;dur={request.pool_wait_seconds * 1000:.1f}")
+    if request.smtp_seconds:
+        parts.append(f"smtp;dur={request.smtp_seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL statements, SQL time, pool wait and SMTP time per route template
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses pass
+    through untouched and their duration covers the whole body. The
+    Server-Timing header is added when the response starts, so for streamed
+    bodies it only covers the work done before the first byte.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing_header: bool = settings.SERVER_TIMING_HEADER):
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics(scope, asyncio.current_task())
+        token = current_request.set(request)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(request, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - start, method, route_path, str(status_code))
+            request_statements.observe(request.statements, method, route_path)
+            request_db_time.observe(request.db_seconds, method, route_path)
+            request_pool_wait.observe(request.pool_wait_seconds, method, route_path)
+            request_smtp_time.observe(request.smtp_seconds, method, route_path)
+            repeated = request.repeated_statements()
+            if repeated:
+                log_repeated_statements(scope, repeated, request.statements)
+
+
+def render_metrics(samples: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+    """Prometheus text exposition of every metric, plus (name, type, help, value) samples taken by the caller"""
+    lines = []
+    metrics = (
+        request_duration, request_statements, request_db_time, request_pool_wait, request_smtp_time,
+        db_statements, db_time, pool_wait, smtp_send
+    )
+    for metric in metrics:
+        lines.extend(metric.render())
+    for name, kind, documentation, value in samples:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"])
+    return "\n".join(lines) + "\n"
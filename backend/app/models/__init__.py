@@ -2,6 +2,8 @@ from .user import User, UserRole
 from .technician import Technician
 from .service import Service
 from .booking import Booking, BookingStatus
+from .booking_stats import BookingStats
+from .email_outbox import EmailOutbox, OutboxStatus
 
 __all__ = [
     "User",
@@ -9,5 +11,8 @@ __all__ = [
     "Technician",
     "Service",
     "Booking",
-    "BookingStatus"
+    "BookingStatus",
+    "BookingStats",
+    "EmailOutbox",
+    "OutboxStatus"
 ]
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Enum
+from ..database import Base
+from .booking import BookingStatus
+
+# technician_id of the row counting bookings that have no technician yet
+UNASSIGNED_TECHNICIAN_ID = 0
+
+
+class BookingStats(Base):
+    """
+    Number of bookings per technician and status, kept up to date by app.analytics
+
+    A (technician, status) count may be split over several slots, which
+    readers add up; each slot can be negative on its own.
+    """
+    __tablename__ = "booking_stats"
+
+    # Part of the primary key, so unassigned bookings use UNASSIGNED_TECHNICIAN_ID instead of NULL
+    technician_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(Enum(BookingStatus), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False, default=0, server_default="0")
+    count = Column(Integer, default=0, nullable=False)
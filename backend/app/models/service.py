@@ -8,6 +8,6 @@ class Service(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True)  # e.g., "Electrical Repair"
     description = Column(Text, nullable=True)
-    category = Column(String, nullable=False)  # e.g., "Electrical", "Plumbing", "Appliance"
+    category = Column(String, nullable=False, index=True)  # e.g., "Electrical", "Plumbing", "Appliance"
     base_price = Column(Float, default=0.0)
     is_active = Column(Boolean, default=True)
@@ -20,5 +20,6 @@ class User(Base):
     phone = Column(String, nullable=True)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.CUSTOMER)
     is_active = Column(Integer, default=1)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke issued tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,176 @@
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+from .email import build_message, deliver_many, is_email_configured
+from .models.email_outbox import EmailOutbox, OutboxStatus
+
+
+class OutboxDispatcher:
+    """
+    Background worker that delivers queued emails from the email_outbox table
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased by
+    moving next_attempt_at ahead, so several workers can run a dispatcher
+    against the same database. The claim is committed before each batch is
+    sent over one pooled SMTP session, and results are recorded afterwards,
+    so no connection or row lock is held during SMTP. Failed sends are
+    retried with exponential backoff until OUTBOX_MAX_ATTEMPTS.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        retry_backoff: int = settings.OUTBOX_RETRY_BACKOFF_SECONDS,
+        lease_seconds: int = settings.OUTBOX_LEASE_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, initial_delay: float = 0.0) -> None:
+        """Start the dispatcher thread, optionally waiting before the first poll"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(initial_delay,), name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the dispatcher thread, waiting for the current batch to finish"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def notify(self) -> None:
+        """Wake the dispatcher so newly committed emails go out without waiting for the next poll"""
+        self._wakeup.set()
+
+    def _run(self, initial_delay: float = 0.0) -> None:
+        # A commit notification still wakes it early
+        if initial_delay and self._wakeup.wait(initial_delay):
+            self._wakeup.clear()
+
+        while not self._stopped.is_set():
+            processed = 0
+            try:
+                processed = self.dispatch_pending()
+            except Exception as e:
+                print(f"Email outbox dispatch failed: {str(e)}")
+
+            # Keep draining while full batches come back, otherwise wait
+            if processed < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def dispatch_pending(self) -> int:
+        """Deliver one batch of due emails and return how many were processed"""
+        if not is_email_configured():
+            return 0
+
+        claimed = self._claim_batch()
+        if not claimed:
+            return 0
+
+        # Send the whole batch over one pooled SMTP session, with no transaction or row lock held
+        messages = [
+            build_message(to_email, subject, html_content, to_name)
+            for _, to_email, to_name, subject, html_content in claimed
+        ]
+        self._record_results([entry_id for entry_id, *_ in claimed], deliver_many(messages))
+        return len(claimed)
+
+    def _claim_batch(self) -> List[tuple]:
+        """
+        Lease a batch of due emails and return (id, to_email, to_name, subject, html_content) for each
+
+        The claimed rows get next_attempt_at pushed lease_seconds ahead and
+        the claim is committed right away, so other dispatchers skip them
+        while this one sends. If the worker dies mid-batch, the rows become
+        due again when the lease runs out.
+        """
+        db: Session = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            entries = db.query(EmailOutbox).filter(
+                EmailOutbox.status == OutboxStatus.PENDING,
+                EmailOutbox.next_attempt_at <= now
+            ).order_by(EmailOutbox.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            claimed = []
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            for entry in entries:
+                entry.next_attempt_at = lease_until
+                claimed.append((entry.id, entry.to_email, entry.to_name, entry.subject, entry.html_content))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _record_results(self, entry_ids: List[int], errors: List[Optional[Exception]]) -> None:
+        """Store the outcome of each send in a second short transaction"""
+        db: Session = self.session_factory()
+        try:
+            entries = {
+                entry.id: entry
+                for entry in db.query(EmailOutbox).filter(EmailOutbox.id.in_(entry_ids))
+            }
+            for entry_id, error in zip(entry_ids, errors):
+                entry = entries.get(entry_id)
+                if entry is not None:
+                    self._record_attempt(entry, error)
+            db.commit()
+        finally:
+            db.close()
+
+    def _record_attempt(self, entry: EmailOutbox, error: Optional[Exception]) -> None:
+        entry.attempts += 1
+
+        if error is None:
+            entry.status = OutboxStatus.SENT
+            entry.sent_at = datetime.utcnow()
+            entry.last_error = None
+            return
+
+        entry.last_error = str(error)
+        if entry.attempts >= self.max_attempts:
+            entry.status = OutboxStatus.FAILED
+            print(f"Giving up on email {entry.id} to {entry.to_email}: {str(error)}")
+        else:
+            delay = self.retry_backoff * 2 ** (entry.attempts - 1)
+            entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+dispatcher = OutboxDispatcher()
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_dispatcher(session: Session) -> None:
+    """Wake the dispatcher when a committed transaction queued emails"""
+    if session.info.pop("email_outbox_dirty", False):
+        dispatcher.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_outbox_flag(session: Session) -> None:
+    session.info.pop("email_outbox_dirty", None)
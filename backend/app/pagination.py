@@ -0,0 +1,103 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+# Listing endpoints answer with a Page envelope when a cursor is passed
+CURSOR_QUERY = Query(
+    None,
+    description="Keyset pagination cursor: empty for the first page, then the previous page's next_cursor. "
+                "Without it the endpoint keeps the legacy skip/limit list response."
+)
+
+
+class KeysetPage(NamedTuple):
+    """A page of ORM objects and the cursor of the page after it (None on the last page)"""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque, URL safe cursor for the sort key values of the last row of a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> list:
+    """Parse a cursor back into sort key values typed like the key columns"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else key.type.python_type(value)
+            for key, value in zip(keys, payload)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: str,
+    limit: int,
+    rows: bool = False
+) -> KeysetPage:
+    """
+    Fetch the page of query that follows cursor ("" for the first page)
+
+    Rows are ordered by keys, which must be unique together (end them with
+    the primary key), and the page starts strictly after the cursor row, so
+    deep pages cost the same as the first one as long as keys are indexed.
+    Pass rows=True for column SELECTs (see FieldSet); the keys must then be
+    selected under their own names.
+    """
+    limit = max(limit, 1)
+    if cursor:
+        # Bind with the column types so values are rendered the way the columns store them
+        values = [literal(value, key.type) for key, value in zip(keys, decode_cursor(cursor, keys))]
+        query = query.where(tuple_(*keys) > tuple_(*values))
+
+    # One extra row tells whether there is a next page
+    result = await db.execute(query.order_by(*keys).limit(limit + 1))
+    items = list(result.all() if rows else result.scalars().all())
+    if len(items) <= limit:
+        return KeysetPage(items, None)
+
+    items = items[:limit]
+    return KeysetPage(items, encode_cursor([getattr(items[-1], key.key) for key in keys]))
+
+
+async def fetch_listing(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    rows: bool = False
+) -> KeysetPage:
+    """Keyset page when a cursor is given, otherwise the legacy skip/limit page (in the same stable order)"""
+    if cursor is not None:
+        return await fetch_keyset_page(db, query, keys, cursor, limit, rows)
+
+    result = await db.execute(query.order_by(*keys).offset(skip).limit(limit))
+    return KeysetPage(list(result.all() if rows else result.scalars().all()), None)
+
+
+def listing_response(items: list, page: KeysetPage, cursor: Optional[str]):
+    """Plain list for offset callers (backward compatible), Page envelope for cursor callers"""
+    if cursor is None:
+        return items
+    return {"items": items, "next_cursor": page.next_cursor}
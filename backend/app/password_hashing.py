@@ -0,0 +1,157 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    """Hash a password"""
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _warm_up() -> None:
+    """Runs once per worker so the first login does not pay for process start and imports"""
+    pwd_context.hash("warm-up")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be retried later"""
+
+
+class PasswordHasherPool:
+    """
+    Size-limited process pool for bcrypt, with a bounded queue in front of it
+
+    bcrypt burns ~250ms of CPU per call. The pinned bcrypt 4 releases the GIL
+    while hashing, so the processes are not about the GIL. On the threadpool
+    a login storm would hold the shared threads that sync handlers and
+    database sessions need, and take CPU from the web worker's own cores;
+    a process pool keeps the cost off both and caps it at `workers` cores.
+    At most workers + max_queue calls are admitted; past that, callers get
+    PasswordHasherBusy right away instead of queueing behind a login storm.
+    With workers=0 calls run on the threadpool, still behind the same bound.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.seconds_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.max_queue
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking would copy the engine, SMTP sessions and dispatcher thread state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self) -> None:
+        """Start the worker processes ahead of the first request"""
+        if self.workers <= 0:
+            return
+
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _execute(self, func: Callable, *args) -> Any:
+        if self.workers <= 0:
+            return await run_in_threadpool(func, *args)
+
+        executor = self._get_executor()
+        try:
+            return await asyncio.wrap_future(executor.submit(func, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM killed); replace the pool and retry once
+            self._reset_executor(executor)
+            return await asyncio.wrap_future(self._get_executor().submit(func, *args))
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run func in the pool, or raise PasswordHasherBusy when the queue is full"""
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.in_flight += 1
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.in_flight - max(self.workers, 1))
+
+        start = time.perf_counter()
+        try:
+            return await self._execute(func, *args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.seconds_total += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(check_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.submitted - self.in_flight
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": max(self.in_flight - max(self.workers, 1), 0),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "seconds_avg": round(self.seconds_total / completed, 6) if completed else 0.0
+            }
+
+
+password_hasher = PasswordHasherPool()
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, NamedTuple, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from .config import settings
+from .models.user import User, UserRole
+from .models.technician import Technician
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Authenticated user as seen by authorization checks, cheap to cache between requests
+
+    Principals built from token claims only carry the identity columns;
+    full_name and phone are set when the users row was loaded.
+    """
+    user_id: int
+    email: str
+    role: UserRole
+    is_active: bool
+    technician_id: Optional[int] = None
+    token_version: int = 0
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User, technician_id: Optional[int] = None) -> "Principal":
+        return cls(
+            user_id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+            technician_id=technician_id,
+            token_version=user.token_version or 0,
+            full_name=user.full_name,
+            phone=user.phone
+        )
+
+    def to_user(self) -> User:
+        """
+        Detached User carrying the cached columns, ready to be merged without a SELECT
+
+        hashed_password, created_at and updated_at are not set. Touching them
+        on the merged User lazy-loads the row, which raises MissingGreenlet
+        under DATABASE_ASYNC=True; handlers that need them must query the user.
+        """
+        user = User(
+            id=self.user_id,
+            email=self.email,
+            full_name=self.full_name,
+            phone=self.phone,
+            role=self.role,
+            is_active=int(self.is_active),
+            token_version=self.token_version
+        )
+        make_transient_to_detached(user)
+        return user
+
+
+class TokenState(NamedTuple):
+    """Per-user columns a claims-based token is checked against, plus the user's current technician profile"""
+    token_version: int
+    is_active: bool
+    role: UserRole
+    technician_id: Optional[int] = None
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries expire ttl_seconds after they were stored"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        with self._lock:
+            for key in [k for k, (_, value) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Full principals keyed by token subject (email)
+principal_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+# TokenState keyed by user id, checked against the claims of stateless tokens
+token_state_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    """Drop everything cached for these users"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    principal_cache.invalidate_where(lambda principal: principal.user_id in user_ids)
+    for user_id in user_ids:
+        token_state_cache.invalidate(user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached principal of a user, e.g. after deactivating it or changing its technician profile"""
+    invalidate_users([user_id])
+
+
+# Invalidation hooks: any flushed change to a user or a technician profile evicts the
+# affected principals once the transaction commits, so a request racing the commit
+# cannot put the old row back in the cache. Other workers rely on the TTL.
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session: Session, flush_context) -> None:
+    user_ids = session.info.setdefault("principal_cache_user_ids", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User) and instance.id is not None and instance not in session.new:
+            user_ids.add(instance.id)
+        elif isinstance(instance, Technician):
+            # A profile moved to another user affects both the old and the new owner
+            history = inspect(instance).attrs.user_id.history
+            user_ids.update(uid for uid in (instance.user_id, *history.deleted) if uid is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session: Session) -> None:
+    user_ids = session.info.pop("principal_cache_user_ids", None)
+    if user_ids:
+        invalidate_users(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session: Session) -> None:
+    session.info.pop("principal_cache_user_ids", None)
@@ -0,0 +1,181 @@
+"""
+Slow query log with call-site attribution
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged as one JSON line
+on the "quickfix.slow_queries" logger, with the normalized SQL, redacted
+parameters, the route and the app code that ran it. Statements repeated
+SLOW_QUERY_REPEAT_THRESHOLD times in one request (the N+1 pattern) are
+reported when the request ends. Counting happens in app.metrics; this
+module only runs when something is logged.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+
+try:
+    import greenlet
+except ImportError:  # only installed with the async database drivers
+    greenlet = None
+
+logger = logging.getLogger("quickfix.slow_queries")
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# Instrumentation frames, never reported as the call site
+_SKIPPED_FILES = {os.path.join(APP_DIR, name) for name in ("database.py", "metrics.py", "query_log.py")}
+
+MAX_SQL_LENGTH = 2000
+MAX_PARAMETERS = 20
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+# IN lists expanded per call ("IN (?, ?, ?)", "IN ($1, $2)", "IN (%(id_1_1)s, ...)")
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement on one line with literals and expanded IN lists replaced by placeholders"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return sql if len(sql) <= MAX_SQL_LENGTH else sql[:MAX_SQL_LENGTH] + "..."
+
+
+def _redact_value(value: Any) -> Any:
+    # Keys, counts, flags and dates help reproduce a query; text may be personal data or secrets
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value if not isinstance(value, Decimal) else str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _redact_row(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in list(parameters.items())[:MAX_PARAMETERS]}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters[:MAX_PARAMETERS]]
+    return _redact_value(parameters)
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Bound parameters with text and binary values replaced by their type and length"""
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "first": _redact_row(rows[0]) if rows else None}
+    return _redact_row(parameters)
+
+
+def _stack_frames() -> List[Any]:
+    """Frames of the current thread, innermost first, continued into the parent greenlet"""
+    frames = []
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent() if greenlet is not None else None
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+        # AsyncSession runs the sync ORM in a child greenlet; the handler is suspended in its parent
+        if frame is None and current is not None and current.parent is not None:
+            current = current.parent
+            frame = current.gr_frame
+    return frames
+
+
+def _task_frames(task: Optional[asyncio.Task]) -> List[Any]:
+    """Frames of a suspended task's coroutine chain, innermost first"""
+    frames = []
+    awaitable = task.get_coro() if task is not None else None
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    frames.reverse()
+    return frames
+
+
+def _is_app_frame(frame) -> bool:
+    filename = frame.f_code.co_filename
+    return filename.startswith(APP_DIR) and filename not in _SKIPPED_FILES
+
+
+def _describe(frame) -> str:
+    return f"app/{frame.f_code.co_filename[len(APP_DIR):]}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+def call_site(task: Optional[asyncio.Task] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (innermost, outermost) app frames that led to the current statement
+
+    The innermost frame is the line that ran the query (a router, serializer
+    or service helper); the outermost is the route handler or dependency
+    that called it. With the sync engine the statement runs on a threadpool
+    worker whose stack has no handler in it, so the suspended request task
+    is walked as well.
+    """
+    frames = _stack_frames()
+    app_frames = [frame for frame in frames if _is_app_frame(frame)]
+    if task is not None and not any("routers" + os.sep in frame.f_code.co_filename for frame in app_frames):
+        app_frames.extend(frame for frame in _task_frames(task) if _is_app_frame(frame))
+    if not app_frames:
+        return None, None
+    return _describe(app_frames[0]), _describe(app_frames[-1])
+
+
+def _route_of(scope: Optional[dict]) -> Tuple[Optional[str], Optional[str]]:
+    if scope is None:
+        return None, None
+    route = scope.get("route")
+    return scope.get("method"), getattr(route, "path", None)
+
+
+def log_slow_statement(
+    statement: str, parameters: Any, executemany: bool, seconds: float,
+    scope: Optional[dict] = None, task: Optional[asyncio.Task] = None, executions: int = 1
+) -> None:
+    """Log one statement over the threshold; scope and task are those of the request running it, if any"""
+    method, route = _route_of(scope)
+    site, handler = call_site(task)
+    logger.warning(json.dumps({
+        "event": "slow_query",
+        "duration_ms": round(seconds * 1000, 2),
+        "method": method,
+        "route": route or ("background" if scope is None else None),
+        "handler": handler,
+        "call_site": site,
+        "executions_in_request": executions,
+        "sql": normalize_sql(statement),
+        "parameters": redact_parameters(parameters, executemany)
+    }, default=str))
+
+
+def log_repeated_statements(scope: dict, repeated: List[tuple], total_statements: int) -> None:
+    """Per-request rollup of statements run at least SLOW_QUERY_REPEAT_THRESHOLD times (likely N+1)"""
+    method, route = _route_of(scope)
+    logger.warning(json.dumps({
+        "event": "repeated_queries",
+        "method": method,
+        "route": route,
+        "statements_in_request": total_statements,
+        "repeated": [
+            {
+                "sql": normalize_sql(statement), "executions": count, "total_ms": round(seconds * 1000, 2),
+                "handler": handler, "call_site": site
+            }
+            for statement, count, seconds, site, handler in repeated
+        ]
+    }))
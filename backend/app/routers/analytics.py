@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..models.user import UserRole
+from ..schemas.analytics import BookingAnalytics
+from ..auth import require_principal_role
+from ..principal_cache import Principal
+from ..analytics import get_booking_analytics
+
+router = APIRouter()
+
+
+@router.get("/", response_model=BookingAnalytics)
+async def get_analytics(
+    live: bool = False,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
+):
+    """Booking counts, completion rate and job load per technician (Admin only, live=true recounts the bookings table)"""
+    return await get_booking_analytics(db, live=live)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from ..database import get_db
@@ -8,9 +9,11 @@ from ..models.user import User, UserRole
 from ..models.technician import Technician
 from ..schemas.auth import UserRegister, UserLogin, Token, UserResponse
 from ..auth import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
+    build_token_claims,
+    revoke_tokens,
     get_current_active_user
 )
 from ..config import settings
@@ -19,18 +22,19 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user (bcrypt runs on the hashing process pool)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -40,8 +44,8 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # If registering as technician, automatically create technician profile
     if new_user.role == UserRole.TECHNICIAN:
@@ -53,19 +57,24 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
             rating=0.0
         )
         db.add(technician_profile)
-        db.commit()
+        await db.commit()
 
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user and return access token"""
     # Find user by email
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    result = await db.execute(
+        select(User, Technician.id)
+        .outerjoin(Technician, Technician.user_id == User.id)
+        .where(User.email == user_credentials.email)
+    )
+    user, technician_id = result.first() or (None, None)
 
     # Verify credentials
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -82,7 +91,7 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role.value},
+        data=build_token_claims(user, technician_id),
         expires_delta=access_token_expires
     )
 
@@ -90,16 +99,21 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """OAuth2 compatible token login (for Swagger UI)"""
     # Find user by email (username field in OAuth2 form)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(
+        select(User, Technician.id)
+        .outerjoin(Technician, Technician.user_id == User.id)
+        .where(User.email == form_data.username)
+    )
+    user, technician_id = result.first() or (None, None)
 
     # Verify credentials
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -109,7 +123,7 @@ def login_for_access_token(
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role.value},
+        data=build_token_claims(user, technician_id),
         expires_delta=access_token_expires
     )
 
@@ -120,3 +134,15 @@ def login_for_access_token(
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current logged in user information"""
     return current_user
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Revoke every access token issued to the current user"""
+    revoke_tokens(current_user)
+    await db.commit()
+
+    return None
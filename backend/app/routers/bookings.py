@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Any, List, Optional, Tuple, Type, Union
+from datetime import date, datetime
 
 from ..database import get_db
 from ..models.user import User, UserRole
@@ -13,23 +18,42 @@ from ..schemas.booking import (
     BookingUpdate,
     BookingResponse,
     BookingStatusUpdate,
-    BookingAssignment
+    BookingAssignment,
+    BookingImportItem,
+    BookingBulkUpdateItem,
+    BulkRequest,
+    BulkResult,
+    DispatchResult
 )
-from ..auth import get_current_active_user, require_role
-from ..email import send_booking_confirmation_email, send_booking_status_update_email, send_technician_assignment_email
+from ..auth import get_current_active_principal, require_principal_role, require_role
+from ..principal_cache import Principal
+from ..schemas.pagination import Page
+from ..pagination import CURSOR_QUERY, fetch_listing, listing_response
+from ..fieldsets import FIELDS_QUERY, VIEW_QUERY, ListView
+from ..serializers import (
+    BOOKING_FIELDS, booking_json_response, booking_select, get_booking_with_details, serialize_booking
+)
+from ..config import settings
+from ..analytics import apply_booking_stats, stats_key
+from ..export import MEDIA_TYPES, ExportFormat, export_query, stream_export
+from ..email import send_booking_confirmation_email, send_booking_status_update_email
+from ..dispatch import DispatchBusy, dispatch_engine, notify_assignment
 
 router = APIRouter()
 
+# Listing order, and the keyset cursors are built from it
+BOOKING_PAGE_KEYS = (Booking.created_at, Booking.id)
+
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_booking(
+async def create_booking(
     booking_data: BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.CUSTOMER]))
 ):
     """Create a new booking (Customer only)"""
     # Verify service exists
-    service = db.query(Service).filter(Service.id == booking_data.service_id).first()
+    service = await db.get(Service, booking_data.service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,253 +67,320 @@ def create_booking(
     )
 
     db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+    await db.flush()
+
+    # Queue confirmation email to customer, committed together with the booking
+    send_booking_confirmation_email(
+        customer_email=current_user.email,
+        customer_name=current_user.full_name,
+        booking_id=new_booking.id,
+        service_name=f"Service #{service.id}",
+        preferred_date=str(new_booking.preferred_date),
+        preferred_time=new_booking.preferred_time,
+        address=new_booking.address,
+        problem_description=new_booking.problem_description,
+        db=db
+    )
 
-    # Send confirmation email to customer
-    try:
-        send_booking_confirmation_email(
-            customer_email=current_user.email,
-            customer_name=current_user.full_name,
-            booking_id=new_booking.id,
-            service_name=f"Service #{service.id}",
-            preferred_date=str(new_booking.preferred_date),
-            preferred_time=new_booking.preferred_time,
-            address=new_booking.address,
-            problem_description=new_booking.problem_description
+    await db.commit()
+
+    # Reload the booking together with the customer in one query
+    new_booking = await get_booking_with_details(db, new_booking.id)
+
+    return booking_json_response(serialize_booking(new_booking, include_technician=False), status.HTTP_201_CREATED)
+
+
+def _validate_bulk_items(bulk: BulkRequest, model: Type[BaseModel]) -> Tuple[List[Tuple[int, Any]], List[dict]]:
+    """Validate bulk items one by one, returning (index, item) pairs and the per-item errors"""
+    if len(bulk.items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request"
+        )
+
+    items, errors = [], []
+    for index, item in enumerate(bulk.items):
+        try:
+            items.append((index, model.model_validate(item)))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+    return items, errors
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def import_bookings(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.CUSTOMER, UserRole.ADMIN]))
+):
+    """Create many bookings in one transaction (Customer own bookings, or Admin with a customer_id per item)"""
+    items, errors = _validate_bulk_items(bulk, BookingImportItem)
+    is_admin = current_user.role == UserRole.ADMIN
+
+    # Look up every referenced service and customer with one query each
+    service_ids = {item.service_id for _, item in items}
+    services = set((await db.execute(select(Service.id).where(Service.id.in_(service_ids)))).scalars())
+
+    customers = {current_user.id: current_user}
+    if is_admin:
+        customer_ids = {item.customer_id for _, item in items if item.customer_id is not None}
+        result = await db.execute(
+            select(User).where(User.id.in_(customer_ids), User.role == UserRole.CUSTOMER)
         )
-    except Exception as e:
-        print(f"Failed to send booking confirmation email: {str(e)}")
-
-    # Build response with customer details
-    booking_dict = {
-        "id": new_booking.id,
-        "customer_id": new_booking.customer_id,
-        "service_id": new_booking.service_id,
-        "technician_id": new_booking.technician_id,
-        "problem_description": new_booking.problem_description,
-        "address": new_booking.address,
-        "preferred_date": new_booking.preferred_date,
-        "preferred_time": new_booking.preferred_time,
-        "status": new_booking.status,
-        "final_price": new_booking.final_price,
-        "created_at": new_booking.created_at,
-        "updated_at": new_booking.updated_at,
-        "completed_at": new_booking.completed_at,
-    }
-
-    # Add customer details
-    booking_dict["customer"] = {
-        "id": current_user.id,
-        "name": current_user.full_name,
-        "email": current_user.email,
-        "phone": current_user.phone
-    }
-
-    return booking_dict
-
-
-@router.get("/", response_model=List[BookingResponse])
-def get_all_bookings(
+        customers = {customer.id: customer for customer in result.scalars()}
+
+    rows, accepted = [], []
+    for index, item in items:
+        if is_admin:
+            customer = customers.get(item.customer_id)
+            if customer is None:
+                detail = "Customer not found" if item.customer_id is not None else "customer_id is required"
+                errors.append({"index": index, "detail": detail})
+                continue
+        elif item.customer_id not in (None, current_user.id):
+            errors.append({"index": index, "detail": "Not authorized to create bookings for another customer"})
+            continue
+        else:
+            customer = current_user
+
+        if item.service_id not in services:
+            errors.append({"index": index, "detail": "Service not found"})
+            continue
+
+        rows.append({
+            "customer_id": customer.id,
+            "status": BookingStatus.PENDING,
+            **item.model_dump(exclude={"customer_id"})
+        })
+        accepted.append((index, customer))
+
+    succeeded = []
+    if rows:
+        # One multi-row INSERT ... RETURNING per batch of rows instead of a flush per booking
+        result = await db.execute(insert(Booking).returning(Booking.id, sort_by_parameter_order=True), rows)
+        booking_ids = result.scalars().all()
+
+        # Bulk inserts skip the flush hooks: count the new bookings in booking_stats here (they
+        # have no technician yet, so technician schedules are unaffected)
+        deltas = {stats_key(None, BookingStatus.PENDING): len(rows)}
+        await db.run_sync(lambda session: apply_booking_stats(session.connection(), deltas))
+
+        # Queue the confirmation emails, written to the outbox in one flush at commit
+        for (index, customer), row, booking_id in zip(accepted, rows, booking_ids):
+            send_booking_confirmation_email(
+                customer_email=customer.email,
+                customer_name=customer.full_name,
+                booking_id=booking_id,
+                service_name=f"Service #{row['service_id']}",
+                preferred_date=str(row["preferred_date"]),
+                preferred_time=row["preferred_time"],
+                address=row["address"],
+                problem_description=row["problem_description"],
+                db=db
+            )
+            succeeded.append({"index": index, "booking_id": booking_id})
+
+    await db.commit()
+
+    return {"succeeded": succeeded, "errors": sorted(errors, key=lambda error: error["index"])}
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_bookings(
+    bulk: BulkRequest,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
+):
+    """Change the status and/or technician of many bookings in one transaction (Admin only)"""
+    items, errors = _validate_bulk_items(bulk, BookingBulkUpdateItem)
+
+    # Load all bookings (with customer and technician) and all new technicians with one query each
+    booking_ids = {item.booking_id for _, item in items}
+    result = await db.execute(booking_select().where(Booking.id.in_(booking_ids)))
+    bookings = {booking.id: booking for booking in result.unique().scalars()}
+
+    technician_ids = {item.technician_id for _, item in items if item.technician_id is not None}
+    result = await db.execute(
+        select(Technician).options(joinedload(Technician.user)).where(Technician.id.in_(technician_ids))
+    )
+    technicians = {technician.id: technician for technician in result.scalars()}
+
+    succeeded = []
+    for index, item in items:
+        booking = bookings.get(item.booking_id)
+        if booking is None:
+            errors.append({"index": index, "detail": "Booking not found"})
+            continue
+
+        if item.status is None and item.technician_id is None:
+            errors.append({"index": index, "detail": "Give a status and/or a technician_id"})
+            continue
+
+        technician = booking.technician
+        if item.technician_id is not None:
+            technician = technicians.get(item.technician_id)
+            if technician is None:
+                errors.append({"index": index, "detail": "Technician not found"})
+                continue
+
+            # Same rules as assign_technician
+            booking.technician_id = technician.id
+            if item.status is None and booking.status == BookingStatus.PENDING:
+                booking.status = BookingStatus.ACCEPTED
+
+        # Same rules as update_booking_status
+        if item.status is not None:
+            booking.status = item.status
+            if item.status == BookingStatus.COMPLETED:
+                booking.completed_at = datetime.utcnow()
+                if technician:
+                    technician.total_jobs += 1
+
+        # Queue the same emails as the single-booking endpoints: the assignment email whenever a
+        # technician is set and the status update whenever a status is, the customer getting one email
+        tech_user = technician.user if technician else None
+        if item.technician_id is not None:
+            notify_assignment(db, booking, booking.customer, tech_user, notify_customer=item.status is None)
+        if item.status is not None and booking.customer:
+            send_booking_status_update_email(
+                customer_email=booking.customer.email,
+                customer_name=booking.customer.full_name,
+                booking_id=booking.id,
+                new_status=booking.status.value,
+                technician_name=tech_user.full_name if tech_user else None,
+                technician_phone=tech_user.phone if tech_user else None,
+                db=db
+            )
+
+        succeeded.append({"index": index, "booking_id": booking.id})
+
+    # The flush hooks update booking_stats and technician schedules for every changed booking
+    await db.commit()
+
+    return {"succeeded": succeeded, "errors": sorted(errors, key=lambda error: error["index"])}
+
+
+def _booking_items(items: list, selection: Optional[Tuple[str, ...]], include_customer: bool = True) -> List[dict]:
+    """Listing payload: full bookings from ORM objects, or the selected fields from column rows"""
+    if selection is None:
+        return [serialize_booking(booking, include_customer=include_customer) for booking in items]
+    return BOOKING_FIELDS.serialize(items, selection)
+
+
+@router.get("/", response_model=Union[List[BookingResponse], Page[BookingResponse]])
+async def get_all_bookings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = CURSOR_QUERY,
     booking_status: Optional[BookingStatus] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    fields: Optional[str] = FIELDS_QUERY,
+    view: ListView = VIEW_QUERY,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Get all bookings (Admin only, optionally filter by status)"""
-    query = db.query(Booking)
+    selection = BOOKING_FIELDS.resolve(fields, view)
+    # Load customer, technician and technician user alongside the page, or only the selected columns
+    query = booking_select() if selection is None else BOOKING_FIELDS.select(selection, BOOKING_PAGE_KEYS)
 
     if booking_status:
-        query = query.filter(Booking.status == booking_status)
-
-    bookings = query.offset(skip).limit(limit).all()
-
-    # Manually populate technician and customer details
-    result = []
-    for booking in bookings:
-        booking_dict = {
-            "id": booking.id,
-            "customer_id": booking.customer_id,
-            "service_id": booking.service_id,
-            "technician_id": booking.technician_id,
-            "problem_description": booking.problem_description,
-            "address": booking.address,
-            "preferred_date": booking.preferred_date,
-            "preferred_time": booking.preferred_time,
-            "status": booking.status,
-            "final_price": booking.final_price,
-            "created_at": booking.created_at,
-            "updated_at": booking.updated_at,
-            "completed_at": booking.completed_at,
-        }
-
-        # Add customer details
-        customer = db.query(User).filter(User.id == booking.customer_id).first()
-        if customer:
-            booking_dict["customer"] = {
-                "id": customer.id,
-                "name": customer.full_name,
-                "email": customer.email,
-                "phone": customer.phone
-            }
-
-        # Add technician details if assigned
-        if booking.technician_id:
-            technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-            if technician:
-                user = db.query(User).filter(User.id == technician.user_id).first()
-                if user:
-                    booking_dict["technician"] = {
-                        "id": technician.id,
-                        "user_id": technician.user_id,
-                        "name": user.full_name,
-                        "email": user.email,
-                        "phone": user.phone,
-                        "specialization": technician.specialization,
-                        "experience_years": technician.experience_years,
-                        "rating": technician.rating,
-                        "total_jobs": technician.total_jobs
-                    }
-
-        result.append(booking_dict)
-
-    return result
-
-
-@router.get("/my-bookings", response_model=List[BookingResponse])
-def get_my_bookings(
+        query = query.where(Booking.status == booking_status)
+
+    page = await fetch_listing(db, query, BOOKING_PAGE_KEYS, cursor, skip, limit, rows=selection is not None)
+
+    return booking_json_response(listing_response(_booking_items(page.items, selection), page, cursor))
+
+
+@router.get("/my-bookings", response_model=Union[List[BookingResponse], Page[BookingResponse]])
+async def get_my_bookings(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.CUSTOMER]))
+    cursor: Optional[str] = CURSOR_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    view: ListView = VIEW_QUERY,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.CUSTOMER]))
 ):
     """Get current customer's bookings"""
-    bookings = db.query(Booking).filter(
-        Booking.customer_id == current_user.id
-    ).offset(skip).limit(limit).all()
-
-    # Manually populate technician details
-    result = []
-    for booking in bookings:
-        booking_dict = {
-            "id": booking.id,
-            "customer_id": booking.customer_id,
-            "service_id": booking.service_id,
-            "technician_id": booking.technician_id,
-            "problem_description": booking.problem_description,
-            "address": booking.address,
-            "preferred_date": booking.preferred_date,
-            "preferred_time": booking.preferred_time,
-            "status": booking.status,
-            "final_price": booking.final_price,
-            "created_at": booking.created_at,
-            "updated_at": booking.updated_at,
-            "completed_at": booking.completed_at,
-        }
-
-        # Add technician details if assigned
-        if booking.technician_id:
-            technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-            if technician:
-                user = db.query(User).filter(User.id == technician.user_id).first()
-                if user:
-                    booking_dict["technician"] = {
-                        "id": technician.id,
-                        "user_id": technician.user_id,
-                        "name": user.full_name,
-                        "email": user.email,
-                        "phone": user.phone,
-                        "specialization": technician.specialization,
-                        "experience_years": technician.experience_years,
-                        "rating": technician.rating,
-                        "total_jobs": technician.total_jobs
-                    }
-
-        result.append(booking_dict)
-
-    return result
-
-
-@router.get("/technician/assigned", response_model=List[BookingResponse])
-def get_assigned_bookings(
+    selection = BOOKING_FIELDS.resolve(fields, view)
+    if selection is None:
+        query = select(Booking).options(
+            joinedload(Booking.technician).joinedload(Technician.user)
+        )
+    else:
+        query = BOOKING_FIELDS.select(selection, BOOKING_PAGE_KEYS)
+
+    query = query.where(Booking.customer_id == principal.user_id)
+
+    page = await fetch_listing(db, query, BOOKING_PAGE_KEYS, cursor, skip, limit, rows=selection is not None)
+
+    return booking_json_response(listing_response(
+        _booking_items(page.items, selection, include_customer=False), page, cursor
+    ))
+
+
+@router.get("/technician/assigned", response_model=Union[List[BookingResponse], Page[BookingResponse]])
+async def get_assigned_bookings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = CURSOR_QUERY,
     booking_status: Optional[BookingStatus] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.TECHNICIAN]))
+    fields: Optional[str] = FIELDS_QUERY,
+    view: ListView = VIEW_QUERY,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.TECHNICIAN]))
 ):
     """Get bookings assigned to current technician"""
-    # Get technician profile
-    technician = db.query(Technician).filter(Technician.user_id == current_user.id).first()
-    if not technician:
+    # Technician profile id comes with the authenticated principal
+    if principal.technician_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Technician profile not found"
         )
 
-    query = db.query(Booking).filter(Booking.technician_id == technician.id)
+    selection = BOOKING_FIELDS.resolve(fields, view)
+    query = booking_select() if selection is None else BOOKING_FIELDS.select(selection, BOOKING_PAGE_KEYS)
+    query = query.where(Booking.technician_id == principal.technician_id)
 
     if booking_status:
-        query = query.filter(Booking.status == booking_status)
-
-    bookings = query.offset(skip).limit(limit).all()
-
-    # Manually populate technician and customer details
-    result = []
-    for booking in bookings:
-        booking_dict = {
-            "id": booking.id,
-            "customer_id": booking.customer_id,
-            "service_id": booking.service_id,
-            "technician_id": booking.technician_id,
-            "problem_description": booking.problem_description,
-            "address": booking.address,
-            "preferred_date": booking.preferred_date,
-            "preferred_time": booking.preferred_time,
-            "status": booking.status,
-            "final_price": booking.final_price,
-            "created_at": booking.created_at,
-            "updated_at": booking.updated_at,
-            "completed_at": booking.completed_at,
-        }
-
-        # Add technician details
-        booking_dict["technician"] = {
-            "id": technician.id,
-            "user_id": technician.user_id,
-            "name": current_user.full_name,
-            "email": current_user.email,
-            "phone": current_user.phone,
-            "specialization": technician.specialization,
-            "experience_years": technician.experience_years,
-            "rating": technician.rating,
-            "total_jobs": technician.total_jobs
-        }
-
-        # Add customer details
-        customer = db.query(User).filter(User.id == booking.customer_id).first()
-        if customer:
-            booking_dict["customer"] = {
-                "id": customer.id,
-                "name": customer.full_name,
-                "email": customer.email,
-                "phone": customer.phone
-            }
-
-        result.append(booking_dict)
-
-    return result
+        query = query.where(Booking.status == booking_status)
+
+    page = await fetch_listing(db, query, BOOKING_PAGE_KEYS, cursor, skip, limit, rows=selection is not None)
+
+    return booking_json_response(listing_response(_booking_items(page.items, selection), page, cursor))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_bookings(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    booking_status: Optional[BookingStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
+):
+    """Stream every booking with customer, service and technician as CSV or NDJSON (Admin only, filter by creation date)"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to"
+        )
+
+    filename = f"bookings-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(export_query(booking_status, date_from, date_to), export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
-def get_booking(
+async def get_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_active_principal)
 ):
     """Get a specific booking by ID"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await get_booking_with_details(db, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -298,13 +389,13 @@ def get_booking(
         )
 
     # Check authorization
-    is_customer = booking.customer_id == current_user.id
-    is_admin = current_user.role == UserRole.ADMIN
+    is_customer = booking.customer_id == principal.user_id
+    is_admin = principal.role == UserRole.ADMIN
 
     is_technician = False
-    if current_user.role == UserRole.TECHNICIAN:
-        technician = db.query(Technician).filter(Technician.user_id == current_user.id).first()
-        is_technician = technician and booking.technician_id == technician.id
+    if principal.role == UserRole.TECHNICIAN:
+        technician = booking.technician
+        is_technician = technician is not None and technician.user_id == principal.user_id
 
     if not (is_customer or is_admin or is_technician):
         raise HTTPException(
@@ -312,63 +403,18 @@ def get_booking(
             detail="Not authorized to view this booking"
         )
 
-    # Build response with customer and technician details
-    booking_dict = {
-        "id": booking.id,
-        "customer_id": booking.customer_id,
-        "service_id": booking.service_id,
-        "technician_id": booking.technician_id,
-        "problem_description": booking.problem_description,
-        "address": booking.address,
-        "preferred_date": booking.preferred_date,
-        "preferred_time": booking.preferred_time,
-        "status": booking.status,
-        "final_price": booking.final_price,
-        "created_at": booking.created_at,
-        "updated_at": booking.updated_at,
-        "completed_at": booking.completed_at,
-    }
-
-    # Add customer details
-    customer = db.query(User).filter(User.id == booking.customer_id).first()
-    if customer:
-        booking_dict["customer"] = {
-            "id": customer.id,
-            "name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone
-        }
-
-    # Add technician details if assigned
-    if booking.technician_id:
-        technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-        if technician:
-            user = db.query(User).filter(User.id == technician.user_id).first()
-            if user:
-                booking_dict["technician"] = {
-                    "id": technician.id,
-                    "user_id": technician.user_id,
-                    "name": user.full_name,
-                    "email": user.email,
-                    "phone": user.phone,
-                    "specialization": technician.specialization,
-                    "experience_years": technician.experience_years,
-                    "rating": technician.rating,
-                    "total_jobs": technician.total_jobs
-                }
-
-    return booking_dict
+    return booking_json_response(serialize_booking(booking))
 
 
 @router.put("/{booking_id}", response_model=BookingResponse)
-def update_booking(
+async def update_booking(
     booking_id: int,
     booking_data: BookingUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_active_principal)
 ):
     """Update booking details (Customer own bookings or Admin)"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await db.get(Booking, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -377,7 +423,7 @@ def update_booking(
         )
 
     # Check authorization
-    if current_user.role != UserRole.ADMIN and booking.customer_id != current_user.id:
+    if principal.role != UserRole.ADMIN and booking.customer_id != principal.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this booking"
@@ -388,66 +434,22 @@ def update_booking(
     for field, value in update_data.items():
         setattr(booking, field, value)
 
-    db.commit()
-    db.refresh(booking)
-
-    # Build response with customer and technician details
-    booking_dict = {
-        "id": booking.id,
-        "customer_id": booking.customer_id,
-        "service_id": booking.service_id,
-        "technician_id": booking.technician_id,
-        "problem_description": booking.problem_description,
-        "address": booking.address,
-        "preferred_date": booking.preferred_date,
-        "preferred_time": booking.preferred_time,
-        "status": booking.status,
-        "final_price": booking.final_price,
-        "created_at": booking.created_at,
-        "updated_at": booking.updated_at,
-        "completed_at": booking.completed_at,
-    }
-
-    # Add customer details
-    customer = db.query(User).filter(User.id == booking.customer_id).first()
-    if customer:
-        booking_dict["customer"] = {
-            "id": customer.id,
-            "name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone
-        }
-
-    # Add technician details if assigned
-    if booking.technician_id:
-        technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-        if technician:
-            user = db.query(User).filter(User.id == technician.user_id).first()
-            if user:
-                booking_dict["technician"] = {
-                    "id": technician.id,
-                    "user_id": technician.user_id,
-                    "name": user.full_name,
-                    "email": user.email,
-                    "phone": user.phone,
-                    "specialization": technician.specialization,
-                    "experience_years": technician.experience_years,
-                    "rating": technician.rating,
-                    "total_jobs": technician.total_jobs
-                }
-
-    return booking_dict
+    await db.commit()
+
+    booking = await get_booking_with_details(db, booking_id)
+
+    return booking_json_response(serialize_booking(booking))
 
 
 @router.patch("/{booking_id}/status", response_model=BookingResponse)
-def update_booking_status(
+async def update_booking_status(
     booking_id: int,
     status_data: BookingStatusUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_active_principal)
 ):
     """Update booking status (Technician or Admin)"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await get_booking_with_details(db, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -456,12 +458,12 @@ def update_booking_status(
         )
 
     # Check authorization based on role
-    is_admin = current_user.role == UserRole.ADMIN
+    is_admin = principal.role == UserRole.ADMIN
 
     is_assigned_technician = False
-    if current_user.role == UserRole.TECHNICIAN:
-        technician = db.query(Technician).filter(Technician.user_id == current_user.id).first()
-        is_assigned_technician = technician and booking.technician_id == technician.id
+    if principal.role == UserRole.TECHNICIAN:
+        technician = booking.technician
+        is_assigned_technician = technician is not None and technician.user_id == principal.user_id
 
     if not (is_admin or is_assigned_technician):
         raise HTTPException(
@@ -477,97 +479,45 @@ def update_booking_status(
         booking.completed_at = datetime.utcnow()
 
         # Update technician stats
-        if booking.technician_id:
-            technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-            if technician:
-                technician.total_jobs += 1
+        if booking.technician:
+            booking.technician.total_jobs += 1
 
-    db.commit()
-    db.refresh(booking)
+    # Queue status update email to customer, committed together with the change
+    customer = booking.customer
+    if customer:
+        technician_name = None
+        technician_phone = None
+
+        if booking.technician and booking.technician.user:
+            technician_name = booking.technician.user.full_name
+            technician_phone = booking.technician.user.phone
+
+        send_booking_status_update_email(
+            customer_email=customer.email,
+            customer_name=customer.full_name,
+            booking_id=booking.id,
+            new_status=booking.status.value,
+            technician_name=technician_name,
+            technician_phone=technician_phone,
+            db=db
+        )
 
-    # Send status update email to customer
-    try:
-        customer = db.query(User).filter(User.id == booking.customer_id).first()
-        if customer:
-            technician_name = None
-            technician_phone = None
+    await db.commit()
 
-            if booking.technician_id:
-                technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-                if technician:
-                    tech_user = db.query(User).filter(User.id == technician.user_id).first()
-                    if tech_user:
-                        technician_name = tech_user.full_name
-                        technician_phone = tech_user.phone
+    booking = await get_booking_with_details(db, booking_id)
 
-            send_booking_status_update_email(
-                customer_email=customer.email,
-                customer_name=customer.full_name,
-                booking_id=booking.id,
-                new_status=booking.status.value,
-                technician_name=technician_name,
-                technician_phone=technician_phone
-            )
-    except Exception as e:
-        print(f"Failed to send status update email: {str(e)}")
-
-    # Build response with customer and technician details
-    booking_dict = {
-        "id": booking.id,
-        "customer_id": booking.customer_id,
-        "service_id": booking.service_id,
-        "technician_id": booking.technician_id,
-        "problem_description": booking.problem_description,
-        "address": booking.address,
-        "preferred_date": booking.preferred_date,
-        "preferred_time": booking.preferred_time,
-        "status": booking.status,
-        "final_price": booking.final_price,
-        "created_at": booking.created_at,
-        "updated_at": booking.updated_at,
-        "completed_at": booking.completed_at,
-    }
-
-    # Add customer details
-    customer = db.query(User).filter(User.id == booking.customer_id).first()
-    if customer:
-        booking_dict["customer"] = {
-            "id": customer.id,
-            "name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone
-        }
-
-    # Add technician details if assigned
-    if booking.technician_id:
-        technician = db.query(Technician).filter(Technician.id == booking.technician_id).first()
-        if technician:
-            user = db.query(User).filter(User.id == technician.user_id).first()
-            if user:
-                booking_dict["technician"] = {
-                    "id": technician.id,
-                    "user_id": technician.user_id,
-                    "name": user.full_name,
-                    "email": user.email,
-                    "phone": user.phone,
-                    "specialization": technician.specialization,
-                    "experience_years": technician.experience_years,
-                    "rating": technician.rating,
-                    "total_jobs": technician.total_jobs
-                }
-
-    return booking_dict
+    return booking_json_response(serialize_booking(booking))
 
 
 @router.patch("/{booking_id}/assign", response_model=BookingResponse)
-def assign_technician(
+async def assign_technician(
     booking_id: int,
     assignment_data: BookingAssignment,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Assign a technician to a booking (Admin only)"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await get_booking_with_details(db, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -576,7 +526,12 @@ def assign_technician(
         )
 
     # Verify technician exists
-    technician = db.query(Technician).filter(Technician.id == assignment_data.technician_id).first()
+    result = await db.execute(
+        select(Technician).options(
+            joinedload(Technician.user)
+        ).where(Technician.id == assignment_data.technician_id)
+    )
+    technician = result.scalars().first()
     if not technician:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -590,96 +545,40 @@ def assign_technician(
     if booking.status == BookingStatus.PENDING:
         booking.status = BookingStatus.ACCEPTED
 
-    db.commit()
-    db.refresh(booking)
+    # Queue email notifications, committed together with the assignment
+    notify_assignment(db, booking, booking.customer, technician.user)
 
-    # Send email notifications
-    try:
-        # Get customer details
-        customer = db.query(User).filter(User.id == booking.customer_id).first()
-        tech_user = db.query(User).filter(User.id == technician.user_id).first()
-        service = db.query(Service).filter(Service.id == booking.service_id).first()
+    await db.commit()
 
-        if customer and tech_user:
-            # Email to customer about technician assignment
-            send_booking_status_update_email(
-                customer_email=customer.email,
-                customer_name=customer.full_name,
-                booking_id=booking.id,
-                new_status=booking.status.value,
-                technician_name=tech_user.full_name,
-                technician_phone=tech_user.phone
-            )
+    # Reload booking, customer, technician and technician user in one query
+    booking = await get_booking_with_details(db, booking_id)
 
-            # Email to technician about new assignment
-            send_technician_assignment_email(
-                technician_email=tech_user.email,
-                technician_name=tech_user.full_name,
-                booking_id=booking.id,
-                customer_name=customer.full_name,
-                customer_phone=customer.phone,
-                service_name=f"Service #{service.id}" if service else "Service",
-                preferred_date=str(booking.preferred_date),
-                preferred_time=booking.preferred_time,
-                address=booking.address,
-                problem_description=booking.problem_description
-            )
-    except Exception as e:
-        print(f"Failed to send assignment emails: {str(e)}")
-
-    # Build response with customer and technician details
-    booking_dict = {
-        "id": booking.id,
-        "customer_id": booking.customer_id,
-        "service_id": booking.service_id,
-        "technician_id": booking.technician_id,
-        "problem_description": booking.problem_description,
-        "address": booking.address,
-        "preferred_date": booking.preferred_date,
-        "preferred_time": booking.preferred_time,
-        "status": booking.status,
-        "final_price": booking.final_price,
-        "created_at": booking.created_at,
-        "updated_at": booking.updated_at,
-        "completed_at": booking.completed_at,
-    }
-
-    # Add customer details
-    customer = db.query(User).filter(User.id == booking.customer_id).first()
-    if customer:
-        booking_dict["customer"] = {
-            "id": customer.id,
-            "name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone
-        }
-
-    # Add technician details
-    tech_user = db.query(User).filter(User.id == technician.user_id).first()
-    if tech_user:
-        booking_dict["technician"] = {
-            "id": technician.id,
-            "user_id": technician.user_id,
-            "name": tech_user.full_name,
-            "email": tech_user.email,
-            "phone": tech_user.phone,
-            "specialization": technician.specialization,
-            "experience_years": technician.experience_years,
-            "rating": technician.rating,
-            "total_jobs": technician.total_jobs
-        }
-
-    return booking_dict
+    return booking_json_response(serialize_booking(booking))
+
+
+@router.post("/dispatch", response_model=DispatchResult)
+async def dispatch_pending_bookings(
+    dry_run: bool = False,
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
+):
+    """Assign technicians to all pending bookings in one batch (Admin only, dry_run=true only returns the plan)"""
+    try:
+        return await run_in_threadpool(dispatch_engine.run_once, dry_run)
+    except DispatchBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A dispatch run is already in progress"
+        )
 
 
 @router.patch("/{booking_id}/accept", response_model=BookingResponse)
-def accept_booking(
+async def accept_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.TECHNICIAN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.TECHNICIAN]))
 ):
     """Accept a booking (Technician only)"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await db.get(Booking, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -687,16 +586,14 @@ def accept_booking(
             detail="Booking not found"
         )
 
-    # Get technician profile
-    technician = db.query(Technician).filter(Technician.user_id == current_user.id).first()
-    if not technician:
+    if principal.technician_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Technician profile not found"
         )
 
     # Check if booking is assigned to this technician
-    if booking.technician_id != technician.id:
+    if booking.technician_id != principal.technician_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Booking not assigned to you"
@@ -705,62 +602,21 @@ def accept_booking(
     # Update status
     booking.status = BookingStatus.ACCEPTED
 
-    db.commit()
-    db.refresh(booking)
-
-    # Build response with customer and technician details
-    booking_dict = {
-        "id": booking.id,
-        "customer_id": booking.customer_id,
-        "service_id": booking.service_id,
-        "technician_id": booking.technician_id,
-        "problem_description": booking.problem_description,
-        "address": booking.address,
-        "preferred_date": booking.preferred_date,
-        "preferred_time": booking.preferred_time,
-        "status": booking.status,
-        "final_price": booking.final_price,
-        "created_at": booking.created_at,
-        "updated_at": booking.updated_at,
-        "completed_at": booking.completed_at,
-    }
-
-    # Add customer details
-    customer = db.query(User).filter(User.id == booking.customer_id).first()
-    if customer:
-        booking_dict["customer"] = {
-            "id": customer.id,
-            "name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone
-        }
-
-    # Add technician details
-    tech_user = db.query(User).filter(User.id == technician.user_id).first()
-    if tech_user:
-        booking_dict["technician"] = {
-            "id": technician.id,
-            "user_id": technician.user_id,
-            "name": tech_user.full_name,
-            "email": tech_user.email,
-            "phone": tech_user.phone,
-            "specialization": technician.specialization,
-            "experience_years": technician.experience_years,
-            "rating": technician.rating,
-            "total_jobs": technician.total_jobs
-        }
-
-    return booking_dict
+    await db.commit()
+
+    booking = await get_booking_with_details(db, booking_id)
+
+    return booking_json_response(serialize_booking(booking))
 
 
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def cancel_booking(
+async def cancel_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_active_principal)
 ):
     """Cancel a booking (Customer own bookings or Admin)"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await db.get(Booking, booking_id)
 
     if not booking:
         raise HTTPException(
@@ -769,7 +625,7 @@ def cancel_booking(
         )
 
     # Check authorization
-    if current_user.role != UserRole.ADMIN and booking.customer_id != current_user.id:
+    if principal.role != UserRole.ADMIN and booking.customer_id != principal.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to cancel this booking"
@@ -778,6 +634,6 @@ def cancel_booking(
     # Update status to cancelled instead of deleting
     booking.status = BookingStatus.CANCELLED
 
-    db.commit()
+    await db.commit()
 
     return None
@@ -1,25 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
 from ..database import get_db
-from ..models.user import User, UserRole
+from ..models.user import UserRole
 from ..models.service import Service
 from ..schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
-from ..auth import require_role
+from ..schemas.pagination import Page
+from ..pagination import CURSOR_QUERY, fetch_listing, listing_response
+from ..auth import require_principal_role
+from ..principal_cache import Principal
+from ..catalog_cache import cached_json_response
 
 router = APIRouter()
 
 
 @router.post("/", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
-def create_service(
+async def create_service(
     service_data: ServiceCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Create a new service (Admin only)"""
     # Check if service with this name already exists
-    existing = db.query(Service).filter(Service.name == service_data.name).first()
+    result = await db.execute(select(Service).where(Service.name == service_data.name))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,56 +35,65 @@ def create_service(
     # Create new service
     new_service = Service(**service_data.model_dump())
     db.add(new_service)
-    db.commit()
-    db.refresh(new_service)
+    await db.commit()
+    await db.refresh(new_service)
 
     return new_service
 
 
-@router.get("/", response_model=List[ServiceResponse])
-def get_all_services(
+@router.get("/", response_model=Union[List[ServiceResponse], Page[ServiceResponse]])
+async def get_all_services(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = CURSOR_QUERY,
     category: Optional[str] = None,
     is_active: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all services (optionally filter by category and active status)"""
-    query = db.query(Service)
+    """Get all services (optionally filter by category and active status), cached with an ETag"""
+    async def build():
+        query = select(Service)
 
-    if category:
-        query = query.filter(Service.category == category)
+        if category:
+            query = query.where(Service.category == category)
 
-    if is_active is not None:
-        query = query.filter(Service.is_active == is_active)
+        if is_active is not None:
+            query = query.where(Service.is_active == is_active)
 
-    services = query.offset(skip).limit(limit).all()
-    return services
+        # Services have no created_at, the primary key alone gives the order
+        page = await fetch_listing(db, query, (Service.id,), cursor, skip, limit)
+        return listing_response([ServiceResponse.model_validate(service) for service in page.items], page, cursor)
+
+    return await cached_json_response(request, ("services", skip, limit, cursor, category, is_active), build)
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-def get_service(service_id: int, db: Session = Depends(get_db)):
-    """Get a specific service by ID"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+async def get_service(service_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get a specific service by ID, cached with an ETag"""
+    async def build():
+        service = await db.get(Service, service_id)
 
-    if not service:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Service not found"
-        )
+        if not service:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Service not found"
+            )
 
-    return service
+        return ServiceResponse.model_validate(service)
+
+    return await cached_json_response(request, ("service", service_id), build)
 
 
 @router.put("/{service_id}", response_model=ServiceResponse)
-def update_service(
+async def update_service(
     service_id: int,
     service_data: ServiceUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Update a service (Admin only)"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.get(Service, service_id)
 
     if not service:
         raise HTTPException(
@@ -91,20 +106,20 @@ def update_service(
     for field, value in update_data.items():
         setattr(service, field, value)
 
-    db.commit()
-    db.refresh(service)
+    await db.commit()
+    await db.refresh(service)
 
     return service
 
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service(
+async def delete_service(
     service_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Delete a service (Admin only)"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.get(Service, service_id)
 
     if not service:
         raise HTTPException(
@@ -112,14 +127,17 @@ def delete_service(
             detail="Service not found"
         )
 
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await db.commit()
 
     return None
 
 
 @router.get("/categories/list", response_model=List[str])
-def get_service_categories(db: Session = Depends(get_db)):
-    """Get list of unique service categories"""
-    categories = db.query(Service.category).distinct().all()
-    return [cat[0] for cat in categories]
+async def get_service_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    """Get list of unique service categories, cached with an ETag"""
+    async def build():
+        result = await db.execute(select(Service.category).distinct())
+        return result.scalars().all()
+
+    return await cached_json_response(request, ("categories",), build)
@@ -1,25 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Union
+from datetime import date
 
 from ..database import get_db
 from ..models.user import User, UserRole
 from ..models.technician import Technician
 from ..schemas.technician import TechnicianCreate, TechnicianUpdate, TechnicianResponse
-from ..auth import get_current_active_user, require_role
+from ..schemas.pagination import Page
+from ..pagination import CURSOR_QUERY, fetch_listing, listing_response
+from ..fieldsets import FIELDS_QUERY, VIEW_QUERY, ListView
+from ..serializers import TECHNICIAN_FIELDS
+from ..responses import ORJSONResponse
+from ..auth import get_current_active_principal, require_principal_role, require_role
+from ..principal_cache import Principal
+from ..availability import TimeSlot, availability_index, parse_time_window, skill_key, window_mask
 
 router = APIRouter()
 
 
 @router.post("/", response_model=TechnicianResponse, status_code=status.HTTP_201_CREATED)
-def create_technician(
+async def create_technician(
     technician_data: TechnicianCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Create a new technician profile (Admin only)"""
     # Check if user exists and has technician role
-    user = db.query(User).filter(User.id == technician_data.user_id).first()
+    user = await db.get(User, technician_data.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -33,7 +44,8 @@ def create_technician(
         )
 
     # Check if technician profile already exists
-    existing = db.query(Technician).filter(Technician.user_id == technician_data.user_id).first()
+    result = await db.execute(select(Technician).where(Technician.user_id == technician_data.user_id))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,30 +55,43 @@ def create_technician(
     # Create technician profile
     new_technician = Technician(**technician_data.model_dump())
     db.add(new_technician)
-    db.commit()
-    db.refresh(new_technician)
+    await db.commit()
+    await db.refresh(new_technician)
 
     return new_technician
 
 
-@router.get("/", response_model=List[TechnicianResponse])
-def get_all_technicians(
+@router.get("/", response_model=Union[List[TechnicianResponse], Page[TechnicianResponse]])
+async def get_all_technicians(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = CURSOR_QUERY,
     specialization: str = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = FIELDS_QUERY,
+    view: ListView = VIEW_QUERY,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all technicians (optionally filter by specialization)"""
-    query = db.query(Technician)
+    # Technicians have no created_at, the primary key alone gives the order
+    keys = (Technician.id,)
+    selection = TECHNICIAN_FIELDS.resolve(fields, view)
+    if selection is None:
+        query = select(Technician).options(joinedload(Technician.user))
+    else:
+        query = TECHNICIAN_FIELDS.select(selection, keys)
 
     if specialization:
-        query = query.filter(Technician.specialization == specialization)
+        query = query.where(Technician.specialization == specialization)
 
-    technicians = query.offset(skip).limit(limit).all()
+    page = await fetch_listing(db, query, keys, cursor, skip, limit, rows=selection is not None)
+
+    if selection is not None:
+        # Partial items would not validate against TechnicianResponse, so skip response_model
+        return ORJSONResponse(listing_response(TECHNICIAN_FIELDS.serialize(page.items, selection), page, cursor))
 
     # Populate user details for each technician
     result = []
-    for tech in technicians:
+    for tech in page.items:
         tech_dict = {
             "id": tech.id,
             "user_id": tech.user_id,
@@ -78,7 +103,7 @@ def get_all_technicians(
         }
 
         # Add user details
-        user = db.query(User).filter(User.id == tech.user_id).first()
+        user = tech.user
         if user:
             tech_dict["user_name"] = user.full_name
             tech_dict["user_email"] = user.email
@@ -86,13 +111,39 @@ def get_all_technicians(
 
         result.append(tech_dict)
 
-    return result
+    return listing_response(result, page, cursor)
+
+
+@router.get("/available", response_model=List[TechnicianResponse])
+async def get_available_technicians(
+    preferred_date: date,
+    preferred_time: str,
+    specialization: Optional[str] = None,
+    principal: Principal = Depends(get_current_active_principal)
+):
+    """Technicians with nothing booked overlapping the given date and time slot, best rated first"""
+    window = parse_time_window(preferred_time)
+    if window is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unrecognized time slot, use e.g. 14:00-16:00, 14:00 or afternoon"
+        )
+
+    # Answered from the in-memory schedule index, rebuilt here only when it is stale
+    if availability_index.needs_refresh():
+        await run_in_threadpool(availability_index.refresh)
+
+    slot = TimeSlot(preferred_date, window_mask(*window))
+    return availability_index.available(slot, skill_key(specialization) if specialization else None)
 
 
 @router.get("/{technician_id}", response_model=TechnicianResponse)
-def get_technician(technician_id: int, db: Session = Depends(get_db)):
+async def get_technician(technician_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific technician by ID"""
-    technician = db.query(Technician).filter(Technician.id == technician_id).first()
+    result = await db.execute(
+        select(Technician).options(joinedload(Technician.user)).where(Technician.id == technician_id)
+    )
+    technician = result.scalars().first()
 
     if not technician:
         raise HTTPException(
@@ -112,7 +163,7 @@ def get_technician(technician_id: int, db: Session = Depends(get_db)):
     }
 
     # Add user details
-    user = db.query(User).filter(User.id == technician.user_id).first()
+    user = technician.user
     if user:
         tech_dict["user_name"] = user.full_name
         tech_dict["user_email"] = user.email
@@ -122,14 +173,14 @@ def get_technician(technician_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{technician_id}", response_model=TechnicianResponse)
-def update_technician(
+async def update_technician(
     technician_id: int,
     technician_data: TechnicianUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(get_current_active_principal)
 ):
     """Update technician profile (Admin or own profile)"""
-    technician = db.query(Technician).filter(Technician.id == technician_id).first()
+    technician = await db.get(Technician, technician_id)
 
     if not technician:
         raise HTTPException(
@@ -138,7 +189,7 @@ def update_technician(
         )
 
     # Check authorization: admin or own profile
-    if current_user.role != UserRole.ADMIN and technician.user_id != current_user.id:
+    if principal.role != UserRole.ADMIN and technician.user_id != principal.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this technician profile"
@@ -149,20 +200,20 @@ def update_technician(
     for field, value in update_data.items():
         setattr(technician, field, value)
 
-    db.commit()
-    db.refresh(technician)
+    await db.commit()
+    await db.refresh(technician)
 
     return technician
 
 
 @router.delete("/{technician_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_technician(
+async def delete_technician(
     technician_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_principal_role([UserRole.ADMIN]))
 ):
     """Delete technician profile (Admin only)"""
-    technician = db.query(Technician).filter(Technician.id == technician_id).first()
+    technician = await db.get(Technician, technician_id)
 
     if not technician:
         raise HTTPException(
@@ -170,19 +221,20 @@ def delete_technician(
             detail="Technician not found"
         )
 
-    db.delete(technician)
-    db.commit()
+    await db.delete(technician)
+    await db.commit()
 
     return None
 
 
 @router.get("/me/profile", response_model=TechnicianResponse)
-def get_my_technician_profile(
-    db: Session = Depends(get_db),
+async def get_my_technician_profile(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.TECHNICIAN]))
 ):
     """Get current technician's profile"""
-    technician = db.query(Technician).filter(Technician.user_id == current_user.id).first()
+    result = await db.execute(select(Technician).where(Technician.user_id == current_user.id))
+    technician = result.scalars().first()
 
     if not technician:
         raise HTTPException(
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from ..models.booking import BookingStatus
+
+
+class TechnicianLoad(BaseModel):
+    technician_id: int
+    name: Optional[str] = None
+    specialization: Optional[str] = None
+    active_jobs: int
+    completed_jobs: int
+    total_jobs: int
+
+
+class BookingAnalytics(BaseModel):
+    """Admin dashboard counters; source is "summary" (booking_stats) or "bookings" (live GROUP BY)"""
+    source: str
+    total_bookings: int
+    bookings_by_status: Dict[BookingStatus, int]
+    pending_jobs: int
+    active_jobs: int
+    unassigned_jobs: int
+    completion_rate: float
+    technicians: List[TechnicianLoad]
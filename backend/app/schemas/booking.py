@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from ..models.booking import BookingStatus
 
@@ -28,13 +28,79 @@ class BookingAssignment(BaseModel):
     technician_id: int
 
 
+class BookingImportItem(BookingCreate):
+    """Bulk import item; admins must give the customer, customers import their own bookings"""
+    customer_id: Optional[int] = None
+
+
+class BookingBulkUpdateItem(BaseModel):
+    booking_id: int
+    status: Optional[BookingStatus] = None
+    technician_id: Optional[int] = None
+
+
+class BulkRequest(BaseModel):
+    """Items are validated one by one so a bad item is reported without failing the batch"""
+    items: List[Dict[str, Any]]
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    booking_id: int
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    succeeded: List[BulkItemResult]
+    errors: List[BulkItemError]
+
+
+class DispatchAssignment(BaseModel):
+    booking_id: int
+    technician_id: int
+
+
+class DispatchResult(BaseModel):
+    dry_run: bool
+    pending: int
+    assigned: int
+    unassigned: int
+    seconds: float
+    assignments: List[DispatchAssignment]
+
+
+class BookingCustomer(BaseModel):
+    """Customer nested in a booking response"""
+    id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+
+
+class BookingTechnician(BaseModel):
+    """Assigned technician nested in a booking response"""
+    id: int
+    user_id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+    specialization: str
+    experience_years: Optional[int] = None
+    rating: Optional[float] = None
+    total_jobs: Optional[int] = None
+
+
 class BookingResponse(BaseModel):
     id: int
     customer_id: int
-    customer: Optional[dict] = None
+    customer: Optional[BookingCustomer] = None
     service_id: int
     technician_id: Optional[int]
-    technician: Optional[dict] = None
+    technician: Optional[BookingTechnician] = None
     problem_description: str
     address: str
     preferred_date: datetime
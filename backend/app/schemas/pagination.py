@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Cursor paginated listing; pass next_cursor back as cursor to get the following page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,177 @@
+from typing import Any, Optional
+from fastapi import status
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+
+from .models.user import User
+from .models.booking import Booking
+from .models.technician import Technician
+from .responses import ORJSONResponse
+from .fieldsets import FieldSet, column_field, nested_field
+
+
+def booking_select() -> Select:
+    """Booking SELECT that loads customer, technician and technician user in the same query"""
+    return select(Booking).options(
+        joinedload(Booking.customer),
+        joinedload(Booking.technician).joinedload(Technician.user)
+    )
+
+
+async def get_booking_with_details(db: AsyncSession, booking_id: int) -> Optional[Booking]:
+    """Load (or reload after a commit) a booking and its related objects with a single query"""
+    result = await db.execute(
+        booking_select().where(Booking.id == booking_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+def serialize_customer(customer: User) -> dict:
+    """Build the nested customer payload of a booking response"""
+    return {
+        "id": customer.id,
+        "name": customer.full_name,
+        "email": customer.email,
+        "phone": customer.phone
+    }
+
+
+def serialize_technician(technician: Technician, user: Optional[User] = None) -> Optional[dict]:
+    """Build the nested technician payload of a booking response"""
+    user = user or technician.user
+    if not user:
+        return None
+
+    return {
+        "id": technician.id,
+        "user_id": technician.user_id,
+        "name": user.full_name,
+        "email": user.email,
+        "phone": user.phone,
+        "specialization": technician.specialization,
+        "experience_years": technician.experience_years,
+        "rating": technician.rating,
+        "total_jobs": technician.total_jobs
+    }
+
+
+def serialize_booking(
+    booking: Booking,
+    include_customer: bool = True,
+    include_technician: bool = True
+) -> dict:
+    """
+    Build a BookingResponse payload from an already loaded booking
+
+    Related objects are read through the Booking relationships, so they come
+    from the session identity map when the caller loaded them beforehand
+    (see booking_select) instead of being queried again. Keys follow the
+    BookingResponse field order, so booking_json_response can send the dict
+    as is.
+    """
+    customer = None
+    if include_customer and booking.customer:
+        customer = serialize_customer(booking.customer)
+
+    # Add technician details if assigned
+    technician = None
+    if include_technician and booking.technician_id and booking.technician:
+        technician = serialize_technician(booking.technician)
+
+    return {
+        "id": booking.id,
+        "customer_id": booking.customer_id,
+        "customer": customer,
+        "service_id": booking.service_id,
+        "technician_id": booking.technician_id,
+        "technician": technician,
+        "problem_description": booking.problem_description,
+        "address": booking.address,
+        "preferred_date": booking.preferred_date,
+        "preferred_time": booking.preferred_time,
+        "status": booking.status,
+        "final_price": booking.final_price,
+        "created_at": booking.created_at,
+        "updated_at": booking.updated_at,
+        "completed_at": booking.completed_at,
+    }
+
+
+def booking_json_response(payload: Any, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """
+    Send serialize_booking payloads (one, a list or a page of them) straight to orjson
+
+    The dicts are built from database rows in the BookingResponse shape, so
+    validating them against the response model and serializing them again
+    would only repeat the work; returning a Response skips both passes while
+    response_model still documents the schema.
+    """
+    return ORJSONResponse(payload, status_code=status_code)
+
+
+_Customer = aliased(User, name="customer")
+_TechnicianUser = aliased(User, name="technician_user")
+
+
+def _join_customer(query: Select) -> Select:
+    return query.join(_Customer, _Customer.id == Booking.customer_id)
+
+
+def _join_technician(query: Select) -> Select:
+    return query.outerjoin(Technician, Technician.id == Booking.technician_id).outerjoin(
+        _TechnicianUser, _TechnicianUser.id == Technician.user_id
+    )
+
+
+def _join_technician_user(query: Select) -> Select:
+    return query.outerjoin(User, User.id == Technician.user_id)
+
+
+# Booking listing fields for ?fields= and ?view=compact, in BookingResponse order
+BOOKING_FIELDS = FieldSet(Booking, {
+    "id": column_field(Booking.id),
+    "customer_id": column_field(Booking.customer_id),
+    "customer": nested_field("customer", {
+        "id": _Customer.id,
+        "name": _Customer.full_name,
+        "email": _Customer.email,
+        "phone": _Customer.phone
+    }, _join_customer),
+    "service_id": column_field(Booking.service_id),
+    "technician_id": column_field(Booking.technician_id),
+    "technician": nested_field("technician", {
+        "id": Technician.id,
+        "user_id": Technician.user_id,
+        "name": _TechnicianUser.full_name,
+        "email": _TechnicianUser.email,
+        "phone": _TechnicianUser.phone,
+        "specialization": Technician.specialization,
+        "experience_years": Technician.experience_years,
+        "rating": Technician.rating,
+        "total_jobs": Technician.total_jobs
+    }, _join_technician),
+    "problem_description": column_field(Booking.problem_description),
+    "address": column_field(Booking.address),
+    "preferred_date": column_field(Booking.preferred_date),
+    "preferred_time": column_field(Booking.preferred_time),
+    "status": column_field(Booking.status),
+    "final_price": column_field(Booking.final_price),
+    "created_at": column_field(Booking.created_at),
+    "updated_at": column_field(Booking.updated_at),
+    "completed_at": column_field(Booking.completed_at),
+}, compact=("id", "status", "preferred_date", "preferred_time", "address"))
+
+# Technician listing fields, in TechnicianResponse order
+TECHNICIAN_FIELDS = FieldSet(Technician, {
+    "id": column_field(Technician.id),
+    "user_id": column_field(Technician.user_id),
+    "user_name": column_field(User.full_name, "user_name", _join_technician_user),
+    "user_email": column_field(User.email, "user_email", _join_technician_user),
+    "user_phone": column_field(User.phone, "user_phone", _join_technician_user),
+    "specialization": column_field(Technician.specialization),
+    "experience_years": column_field(Technician.experience_years),
+    "bio": column_field(Technician.bio),
+    "rating": column_field(Technician.rating),
+    "total_jobs": column_field(Technician.total_jobs),
+}, compact=("id", "user_name", "specialization", "rating"))
@@ -0,0 +1,4 @@
+"""
+Load-test tooling: a bulk synthetic data generator (loadtest.generate) and
+scripted traffic scenarios with per-route latency reports (loadtest.scenarios)
+"""
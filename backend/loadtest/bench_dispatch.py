@@ -0,0 +1,216 @@
+"""
+Technician dispatch planning and run time
+
+    python -m loadtest.bench_dispatch --pending 10000 --technicians 1000
+
+Builds a temporary SQLite database with --technicians technicians over the
+load test trades, --pending unassigned bookings over the next two weeks and
+--active accepted jobs already on the technicians' schedules. It then times:
+
+    load    reading pending bookings, technician capacity and busy slots
+    plan    plan_dispatch alone for each --caps value (best of --repeat)
+    run     a dry run, then a full DispatchEngine run with --run-cap,
+            including the locking re-read and the queued emails
+
+and checks that the run never went past the cap, never double-booked a
+slot and only matched technicians of the booking's trade (or general ones),
+and that the analytics summary still equals a live recount.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+START = datetime(2026, 11, 2)
+
+
+def _seed(args) -> None:
+    from sqlalchemy import insert, select
+
+    from app.analytics import rebuild_booking_stats
+    from app.database import engine
+    from app.models.booking import Booking, BookingStatus
+    from app.models.service import Service
+    from app.models.technician import Technician
+    from app.models.user import User, UserRole
+    from .generate import CATALOG, PREFERRED_TIMES, SPECIALIZATIONS
+
+    rng = random.Random(args.seed)
+    specializations = rng.choices(
+        [name for name, _ in SPECIALIZATIONS], [weight for _, weight in SPECIALIZATIONS], k=args.technicians
+    )
+    times = [time for time, _ in PREFERRED_TIMES]
+    time_weights = [weight for _, weight in PREFERRED_TIMES]
+
+    with engine.begin() as connection:
+        connection.execute(insert(Service), [
+            {"name": name, "description": description, "category": category, "base_price": price}
+            for name, description, category, price in CATALOG
+        ])
+        service_ids = connection.execute(select(Service.id)).scalars().all()
+        connection.execute(insert(User), [
+            {"email": f"bench-{kind}-{i}@example.com", "hashed_password": "not-a-hash", "full_name": f"Bench {i}",
+             "role": role}
+            for kind, role, count in (
+                ("customer", UserRole.CUSTOMER, 1000), ("technician", UserRole.TECHNICIAN, args.technicians)
+            )
+            for i in range(count)
+        ])
+        customer_ids = connection.execute(select(User.id).where(User.role == UserRole.CUSTOMER)).scalars().all()
+        technician_user_ids = connection.execute(
+            select(User.id).where(User.role == UserRole.TECHNICIAN).order_by(User.id)
+        ).scalars().all()
+        connection.execute(insert(Technician), [
+            {"user_id": user_id, "specialization": specialization, "rating": round(rng.uniform(3.0, 5.0), 1)}
+            for user_id, specialization in zip(technician_user_ids, specializations)
+        ])
+        technician_ids = connection.execute(select(Technician.id)).scalars().all()
+
+        def booking(technician_id, status):
+            return {
+                "customer_id": rng.choice(customer_ids), "service_id": rng.choice(service_ids),
+                "technician_id": technician_id, "status": status,
+                "problem_description": "Needs inspection", "address": f"{rng.randint(1, 9999)} Main St",
+                "preferred_date": START + timedelta(days=rng.randrange(14)),
+                "preferred_time": rng.choices(times, time_weights)[0]
+            }
+
+        connection.execute(insert(Booking), [
+            booking(rng.choice(technician_ids), BookingStatus.ACCEPTED) for _ in range(args.active)
+        ] + [
+            booking(None, BookingStatus.PENDING) for _ in range(args.pending)
+        ])
+        rebuild_booking_stats(connection)
+
+
+def _best(repeat: int, run) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _check(engine_, assignments) -> list:
+    """Problems with an applied run: cap, double booking, trade and analytics drift"""
+    from sqlalchemy import select
+
+    from app.analytics import booking_counts_query, booking_stats_query
+    from app.availability import GENERAL_SKILL, booking_slot, skill_key
+    from app.models.booking import Booking
+    from app.models.service import Service
+    from app.models.technician import Technician
+
+    problems = []
+    assigned = dict(assignments)
+    db = engine_.session_factory()
+    try:
+        rows = db.execute(
+            select(Booking.id, Booking.technician_id, Booking.preferred_date, Booking.preferred_time,
+                   Service.category, Technician.specialization)
+            .join(Service, Booking.service_id == Service.id).join(Technician, Booking.technician_id == Technician.id)
+        ).all()
+        before = Counter(technician_id for booking_id, technician_id, *_ in rows if booking_id not in assigned)
+        new = Counter(assigned.values())
+        over = [t for t, count in new.items() if before[t] + count > engine_.max_open_jobs]
+        if over:
+            problems.append(f"{len(over)} technicians went past the cap")
+
+        busy = defaultdict(int)
+        double_booked = 0
+        # Existing jobs may overlap each other; only the slots of new assignments must be free
+        rows.sort(key=lambda row: row[0] in assigned)
+        for booking_id, technician_id, preferred_date, preferred_time, _, _ in rows:
+            slot = booking_slot(preferred_date, preferred_time)
+            if booking_id in assigned and busy[technician_id, slot.day] & slot.mask:
+                double_booked += 1
+            busy[technician_id, slot.day] |= slot.mask
+        if double_booked:
+            problems.append(f"{double_booked} assignments overlap a booked slot")
+
+        mismatched = sum(
+            1 for booking_id, _, _, _, category, specialization in rows
+            if booking_id in assigned and skill_key(specialization) not in (skill_key(category), GENERAL_SKILL)
+        )
+        if mismatched:
+            problems.append(f"{mismatched} assignments to another trade")
+
+        if set(db.execute(booking_stats_query()).all()) != set(db.execute(booking_counts_query()).all()):
+            problems.append("booking_stats differs from a live recount")
+    finally:
+        db.close()
+    return problems
+
+
+def run(args) -> None:
+    from sqlalchemy import func, select
+
+    from app.database import SessionLocal
+    from app.dispatch import DispatchEngine, plan_dispatch
+    from app.models.email_outbox import EmailOutbox
+
+    _seed(args)
+    engine_ = DispatchEngine(max_open_jobs=args.run_cap)
+    print(f"{args.pending} pending bookings, {args.technicians} technicians, {args.active} active jobs")
+
+    def load():
+        with SessionLocal() as db:
+            pending = engine_._load_pending(db)
+            return pending, *engine_._load_capacity(db, min(booking.slot.day for booking in pending))
+
+    seconds, (pending, technicians, busy_slots) = _best(args.repeat, load)
+    print(f"{'load':<24} {seconds * 1000:>9.1f} ms  ({len(busy_slots)} busy slots)")
+    for cap in args.caps:
+        seconds, plan = _best(args.repeat, lambda: plan_dispatch(pending, technicians, busy_slots, cap))
+        print(f"{f'plan, cap {cap}':<24} {seconds * 1000:>9.1f} ms  ({len(plan)} assigned)")
+
+    result = engine_.run_once(dry_run=True)
+    print(f"{'dry run':<24} {result['seconds'] * 1000:>9.1f} ms  ({result['assigned']} planned)")
+    result = engine_.run_once()
+    with SessionLocal() as db:
+        emails = db.scalar(select(func.count(EmailOutbox.id)))
+    print(f"{f'run, cap {args.run_cap}':<24} {result['seconds'] * 1000:>9.1f} ms  "
+          f"({result['assigned']} assigned, {emails} emails queued)")
+
+    assignments = [(item["booking_id"], item["technician_id"]) for item in result["assignments"]]
+    problems = _check(engine_, assignments)
+    print("checks: " + ("; ".join(problems) if problems else "ok"))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_dispatch", description="Dispatch benchmark")
+    parser.add_argument("--pending", type=int, default=10_000)
+    parser.add_argument("--technicians", type=int, default=1000)
+    parser.add_argument("--active", type=int, default=1500, help="accepted jobs already assigned")
+    parser.add_argument("--caps", default="5,20", help="comma separated DISPATCH_MAX_OPEN_JOBS values to plan with")
+    parser.add_argument("--run-cap", type=int, default=20, help="DISPATCH_MAX_OPEN_JOBS of the full run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    args.caps = [int(value) for value in args.caps.split(",")]
+
+    # Settings are read when app.config is imported; credentials make the run queue its emails (never sent)
+    directory = tempfile.mkdtemp(prefix="quickfix-bench-dispatch-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{directory}/bench.db", "DATABASE_ASYNC": "False", "LAZY_STARTUP": "True",
+        "OUTBOX_DISPATCHER_ENABLED": "False", "AUTO_DISPATCH_ENABLED": "False",
+        "MAIL_USERNAME": "bench", "MAIL_PASSWORD": "bench"
+    })
+    from app.cli import create_schema
+
+    try:
+        create_schema()
+        run(args)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Login throughput and event loop responsiveness during a login storm
+
+    python -m loadtest.bench_login --logins 40 --concurrency 40 --workers 0,2
+
+Runs the app in-process on a temporary SQLite database with --accounts users
+that share one bcrypt password, and fires --logins POST /api/auth/login calls,
+--concurrency at a time, through httpx's ASGI transport. Meanwhile a probe
+calls GET /health/live every 20ms. Each PASSWORD_HASH_WORKERS value in
+--workers is measured in turn (0 runs bcrypt on the threadpool), reporting:
+
+    logins/s and logins/s per core (successful logins over wall time)
+    429s answered by the hashing queue bound (PASSWORD_HASH_MAX_QUEUE)
+    login p50/p99 and /health/live p50/max while the storm runs
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List
+
+PASSWORD = "bench-password"
+
+
+def _percentile(samples: List[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(share * len(ordered) + 0.5) - 1)] * 1000 if ordered else 0.0
+
+
+async def _storm(client, args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, statuses = [], []
+    probes: List[float] = []
+    done = asyncio.Event()
+
+    async def login(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login", json={"email": f"bench{index % args.accounts}@example.com", "password": PASSWORD}
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    async def probe() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health/live")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(args.logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    ok = statuses.count(200)
+    return {
+        "elapsed": elapsed, "ok": ok, "rejected": statuses.count(429), "other": len(statuses) - ok - statuses.count(429),
+        "login_p50": _percentile(latencies, 0.5), "login_p99": _percentile(latencies, 0.99),
+        "probe_p50": _percentile(probes, 0.5), "probe_max": max(probes) * 1000 if probes else 0.0
+    }
+
+
+async def run(args) -> None:
+    import httpx
+    from app.main import app
+    from app.password_hashing import password_hasher
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{args.logins} logins, {args.concurrency} concurrent, queue bound {password_hasher.max_queue}, {cores} core(s)")
+    print(f"{'workers':>7} {'ok':>5} {'429':>5} {'logins/s':>9} {'per core':>9} {'login p50':>10} {'login p99':>10} "
+          f"{'live p50':>9} {'live max':>9}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for workers in args.workers:
+            password_hasher.shutdown()
+            password_hasher.workers = workers
+            await password_hasher.start()
+            result = await _storm(client, args)
+            rate = result["ok"] / result["elapsed"]
+            print(
+                f"{workers:>7} {result['ok']:>5} {result['rejected']:>5} {rate:>9.2f} {rate / cores:>9.2f} "
+                f"{result['login_p50']:>8.0f}ms {result['login_p99']:>8.0f}ms "
+                f"{result['probe_p50']:>7.1f}ms {result['probe_max']:>7.1f}ms"
+                + (f"  ({result['other']} other errors)" if result["other"] else "")
+            )
+    password_hasher.shutdown()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_login", description="Login storm benchmark")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--workers", default="0,2", help="comma separated PASSWORD_HASH_WORKERS values to compare")
+    parser.add_argument("--max-queue", type=int, default=32, help="PASSWORD_HASH_MAX_QUEUE")
+    args = parser.parse_args(argv)
+    args.workers = [int(value) for value in args.workers.split(",")]
+
+    # Settings are read when app.config is imported
+    directory = tempfile.mkdtemp(prefix="quickfix-bench-login-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{directory}/bench.db", "DATABASE_ASYNC": "False", "LAZY_STARTUP": "True",
+        "OUTBOX_DISPATCHER_ENABLED": "False", "AUTO_DISPATCH_ENABLED": "False", "METRICS_ENABLED": "False",
+        "PASSWORD_HASH_MAX_QUEUE": str(args.max_queue)
+    })
+    from app.cli import create_schema
+    from app.database import SessionLocal
+    from app.models.user import User, UserRole
+    from app.password_hashing import hash_password
+
+    create_schema()
+    hashed = hash_password(PASSWORD)
+    with SessionLocal() as db:
+        db.add_all(
+            User(email=f"bench{i}@example.com", hashed_password=hashed, full_name=f"Bench {i}", role=UserRole.CUSTOMER)
+            for i in range(args.accounts)
+        )
+        db.commit()
+
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
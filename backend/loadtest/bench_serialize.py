@@ -0,0 +1,153 @@
+"""
+Booking response building and encoding time for a large listing
+
+    python -m loadtest.bench_serialize --bookings 1000 --repeat 25
+
+Seeds a temporary SQLite database with --bookings bookings (every other one
+assigned), loads them with booking_select and reports the median of --repeat
+runs for each stage of a listing response:
+
+    dict build          serialize_booking for every booking
+    orjson encode       booking_json_response body from those dicts
+    response_model      what FastAPI did before: validate the dicts against
+                        List[BookingResponse], dump them in JSON mode and
+                        encode with the stdlib json module
+
+then times whole GET /api/bookings/ requests in-process, full and compact.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+
+def _median_ms(repeat: int, run: Callable[[], object]) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _seed(count: int) -> str:
+    """Bookings for one customer, half of them assigned; returns an admin token"""
+    from app.auth import build_token_claims, create_access_token
+    from app.database import SessionLocal
+    from app.models.booking import Booking, BookingStatus
+    from app.models.service import Service
+    from app.models.technician import Technician
+    from app.models.user import User, UserRole
+
+    with SessionLocal() as db:
+        admin = User(email="admin@example.com", hashed_password="not-a-hash", full_name="Admin", role=UserRole.ADMIN)
+        customer = User(email="sam@example.com", hashed_password="not-a-hash", full_name="Sam O'Neil",
+                        phone="+1 555 0199", role=UserRole.CUSTOMER)
+        tech_user = User(email="lee@example.com", hashed_password="not-a-hash", full_name="Lee Technician",
+                         phone="+1 555 0100", role=UserRole.TECHNICIAN)
+        service = Service(name="Electrical Repair", category="Electrical", base_price=75.0)
+        db.add_all([admin, customer, tech_user, service])
+        db.flush()
+        technician = Technician(user_id=tech_user.id, specialization="Electrician", experience_years=6, rating=4.7)
+        db.add(technician)
+        db.flush()
+        start = datetime(2026, 11, 2)
+        db.add_all(
+            Booking(
+                customer_id=customer.id, service_id=service.id, technician_id=technician.id if i % 2 else None,
+                status=BookingStatus.ACCEPTED if i % 2 else BookingStatus.PENDING,
+                problem_description="Outlet sparks when the heater and dryer run together",
+                address=f"{i} Elm St, Apt 4", preferred_date=start + timedelta(days=i % 30),
+                preferred_time="14:00-16:00"
+            )
+            for i in range(count)
+        )
+        db.commit()
+        return create_access_token(build_token_claims(admin))
+
+
+def _stages(args) -> None:
+    from pydantic import TypeAdapter
+    from starlette.responses import JSONResponse
+
+    from app.database import SessionLocal
+    from app.schemas.booking import BookingResponse
+    from app.serializers import booking_json_response, booking_select, serialize_booking
+
+    adapter = TypeAdapter(List[BookingResponse])
+    with SessionLocal() as db:
+        bookings = db.execute(booking_select().limit(args.bookings)).unique().scalars().all()
+        payloads = [serialize_booking(booking) for booking in bookings]
+        body = booking_json_response(payloads).body
+
+        def response_model() -> bytes:
+            return JSONResponse(adapter.dump_python(adapter.validate_python(payloads), mode="json")).body
+
+        print(f"{len(bookings)} bookings, {len(body) / 1024:.0f} KB response")
+        print(f"{'stage':<24} {'median':>10}")
+        for label, run in (
+            ("dict build", lambda: [serialize_booking(booking) for booking in bookings]),
+            ("orjson encode", lambda: booking_json_response(payloads).body),
+            ("response_model", response_model),
+        ):
+            print(f"{label:<24} {_median_ms(args.repeat, run):>7.1f} ms")
+
+
+async def _requests(args, token: str) -> None:
+    import httpx
+
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        print(f"\n{'GET /api/bookings/':<24} {'median':>10} {'size':>9}")
+        for label, params in (
+            ("full", {"limit": args.bookings}),
+            ("full, cursor page", {"limit": args.bookings, "cursor": ""}),
+            ("view=compact", {"limit": args.bookings, "view": "compact"}),
+        ):
+            response = await client.get("/api/bookings/", params=params)
+            response.raise_for_status()
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                await client.get("/api/bookings/", params=params)
+                samples.append(time.perf_counter() - start)
+            print(f"{label:<24} {statistics.median(samples) * 1000:>7.1f} ms {len(response.content) / 1024:>6.0f} KB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest.bench_serialize", description="Booking response benchmark"
+    )
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    # Settings are read when app.config is imported
+    directory = tempfile.mkdtemp(prefix="quickfix-bench-serialize-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{directory}/bench.db", "DATABASE_ASYNC": "False", "LAZY_STARTUP": "True",
+        "OUTBOX_DISPATCHER_ENABLED": "False", "AUTO_DISPATCH_ENABLED": "False", "METRICS_ENABLED": "False"
+    })
+    from app.cli import create_schema
+
+    try:
+        create_schema()
+        token = _seed(args.bookings)
+        _stages(args)
+        asyncio.run(_requests(args, token))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
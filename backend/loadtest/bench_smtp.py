@@ -0,0 +1,145 @@
+"""
+SMTP throughput: one session per message vs the pooled sessions of app.email
+
+    python -m loadtest.bench_smtp --messages 300
+    python -m loadtest.bench_smtp --host 127.0.0.1 --port 8025   # an external sink, e.g. aiosmtpd
+
+Without --host a local sink is started in-process. It accepts everything and
+answers every command after --rtt-ms, plus --handshake-ms on EHLO and AUTH
+as a stand-in for the TLS and login cost of a real relay. Three modes send
+the same prebuilt messages:
+
+    per-message   connect, log in, send and quit for every message (the old send_email)
+    pool          deliver_message per message over the pooled sessions
+    send_many     deliver_many in batches of --batch over one session
+"""
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, *lines: bytes, handshake: bool = False) -> None:
+        time.sleep(self.server.rtt + (self.server.handshake if handshake else 0.0))
+        self.wfile.write(b"".join(lines))
+
+    def handle(self) -> None:
+        self.reply(b"220 quickfix-sink ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            verb = line[:4].upper()
+            if not line or verb == b"QUIT":
+                if line:
+                    self.reply(b"221 bye\r\n")
+                return
+            if verb in (b"EHLO", b"HELO"):
+                self.reply(b"250-quickfix-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n", handshake=True)
+            elif verb == b"AUTH":
+                self.reply(b"235 authenticated\r\n", handshake=True)
+            elif verb == b"DATA":
+                self.reply(b"354 end with .\r\n")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with self.server.lock:
+                    self.server.received += 1
+                self.reply(b"250 queued\r\n")
+            else:
+                self.reply(b"250 ok\r\n")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, rtt_ms: float, handshake_ms: float):
+        super().__init__(("127.0.0.1", 0), _SinkHandler)
+        self.rtt = rtt_ms / 1000
+        self.handshake = handshake_ms / 1000
+        self.received = 0
+        self.lock = threading.Lock()
+
+
+def _timed(label: str, count: int, run: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    print(f"{label:<12} {count:>6} messages {seconds:>8.2f}s {count / seconds:>9.1f} msg/s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_smtp", description="SMTP pool benchmark")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=50, help="messages per send_many call")
+    parser.add_argument("--host", help="external SMTP sink; a local one is started when omitted")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="local sink delay before each reply")
+    parser.add_argument("--handshake-ms", type=float, default=40.0, help="local sink extra delay on EHLO and AUTH")
+    args = parser.parse_args(argv)
+
+    sink: Optional[SMTPSink] = None
+    host, port = args.host, args.port
+    if host is None:
+        sink = SMTPSink(args.rtt_ms, args.handshake_ms)
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+        host, port = sink.server_address
+
+    # Settings are read when app.config is imported
+    os.environ.update({
+        "MAIL_SERVER": host, "MAIL_PORT": str(port), "MAIL_STARTTLS": "False", "MAIL_SSL_TLS": "False",
+        "USE_CREDENTIALS": "True", "MAIL_USERNAME": "bench", "MAIL_PASSWORD": "bench",
+        "MAIL_FROM": "bench@quickfix.example", "METRICS_ENABLED": "False"
+    })
+    from app.email import _PooledConnection, build_message, deliver_many, deliver_message, smtp_pool
+    from app.email_templates import render_template
+
+    html = render_template(
+        "booking_confirmation", customer_name="Sam Customer", service_name="Electrical Repair", booking_id=1,
+        preferred_date="2026-11-03", preferred_time="14:00-16:00", address="1 Main St",
+        problem_description="Outlet sparks when the heater is on"
+    )
+    messages = [
+        build_message(f"customer{i}@quickfix.example", "Booking confirmed", html, "Sam Customer")
+        for i in range(args.messages)
+    ]
+
+    def one_session_per_message() -> None:
+        for message in messages:
+            conn = _PooledConnection()
+            conn.connect().sendmail("bench@quickfix.example", [message.to_email], message.data)
+            conn.close()
+
+    def pooled() -> None:
+        for message in messages:
+            deliver_message(message)
+
+    def batched() -> None:
+        for start in range(0, len(messages), args.batch):
+            errors: List[Optional[Exception]] = deliver_many(messages[start:start + args.batch])
+            failed = [error for error in errors if error is not None]
+            if failed:
+                raise failed[0]
+
+    print(f"sink {host}:{port}" + (f" (rtt {args.rtt_ms}ms, handshake {args.handshake_ms}ms)" if sink else ""))
+    _timed("per-message", len(messages), one_session_per_message)
+    _timed("pool", len(messages), pooled)
+    smtp_pool.close()
+    _timed("send_many", len(messages), batched)
+    smtp_pool.close()
+
+    if sink is not None:
+        sink.shutdown()
+        expected = 3 * len(messages)
+        if sink.received != expected:
+            print(f"sink received {sink.received} of {expected} messages")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
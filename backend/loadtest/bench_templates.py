@@ -0,0 +1,104 @@
+"""
+Email rendering and message building speed
+
+    python -m loadtest.bench_templates --seconds 2
+
+Renders each booking email through its send_* helper (with sending replaced
+by a no-op, so only template rendering is timed), then builds the SMTP bytes
+of a message with build_message and, for comparison, with the stdlib
+MIMEMultipart/MIMEText path the emails used before the prebuilt envelope.
+"""
+import argparse
+import os
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable
+
+PROBLEM = "Outlet <b>sparks</b> when the heater & dryer run together"
+
+
+def _rate(label: str, seconds: float, run: Callable[[], object]) -> None:
+    # Calibrate a batch that takes about 10ms, then repeat batches for the given time
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            run()
+        if time.perf_counter() - start >= 0.01:
+            break
+        batch *= 2
+
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(batch):
+            run()
+        count += batch
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {count / elapsed:>12,.0f}/s {elapsed / count * 1e6:>9.1f} us")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_templates", description="Email template benchmark")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("MAIL_FROM", "bench@quickfix.example")
+    from app import email
+    from app.email_templates import render_template
+
+    rendered = {}
+
+    def capture(to_email, subject, html_content, to_name=None, db=None) -> bool:
+        rendered["html"] = html_content
+        return True
+
+    email.send_email = capture
+
+    confirmation = dict(
+        customer_email="sam@example.com", customer_name="Sam O'Neil", booking_id=1042,
+        service_name="Electrical Repair", preferred_date="2026-11-03", preferred_time="14:00-16:00",
+        address="12 Elm St, Apt 4", problem_description=PROBLEM
+    )
+    status_update = dict(
+        customer_email="sam@example.com", customer_name="Sam O'Neil", booking_id=1042, new_status="in_progress",
+        technician_name="Lee Technician", technician_phone="+1 555 0100"
+    )
+    assignment = dict(
+        technician_email="lee@example.com", technician_name="Lee Technician", booking_id=1042,
+        customer_name="Sam O'Neil", customer_phone="+1 555 0199", service_name="Electrical Repair",
+        preferred_date="2026-11-03", preferred_time="14:00-16:00", address="12 Elm St, Apt 4",
+        problem_description=PROBLEM
+    )
+
+    print(f"{'renders':<34} {'rate':>14} {'per call':>12}")
+    _rate("booking confirmation", args.seconds, lambda: email.send_booking_confirmation_email(**confirmation))
+    _rate("status update (with technician)", args.seconds, lambda: email.send_booking_status_update_email(**status_update))
+    _rate("technician assignment", args.seconds, lambda: email.send_technician_assignment_email(**assignment))
+    _rate(
+        "single slot partial", args.seconds,
+        lambda: render_template("partials/technician_phone_row", technician_phone="+1 555 0100")
+    )
+
+    email.send_booking_confirmation_email(**confirmation)
+    html = rendered["html"]
+    assert "&lt;b&gt;sparks&lt;/b&gt;" in html, "problem_description must be escaped"
+
+    def stdlib_message() -> bytes:
+        message = MIMEMultipart("alternative")
+        message["From"] = f"QuickFix <{os.environ['MAIL_FROM']}>"
+        message["To"] = "sam@example.com"
+        message["Subject"] = "Booking Confirmation - QuickFix #1042"
+        message.attach(MIMEText(html, "html"))
+        return message.as_bytes()
+
+    print(f"\n{'message bytes':<34} {'rate':>14} {'per call':>12}  ({len(html)} byte body)")
+    _rate("build_message", args.seconds, lambda: email.build_message("sam@example.com", "Booking Confirmation", html))
+    _rate("MIMEMultipart + as_bytes", args.seconds, stdlib_message)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
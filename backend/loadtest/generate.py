@@ -0,0 +1,459 @@
+"""
+Synthetic QuickFix data for capacity planning, bulk loaded in one transaction
+
+    python -m loadtest.generate                         # 1M customers, 20k technicians, 5M bookings
+    python -m loadtest.generate --scale 0.01            # same shape at 1% of the volume
+    python -m loadtest.generate --bookings 200000 --seed 7 --prefix lt2
+
+Run from backend/ against a migrated database (DATABASE_URL as for the API).
+The same seed and --as-of date always produce the same rows. On PostgreSQL
+(psycopg2) rows are streamed with COPY, elsewhere with multi-row INSERTs.
+Every account gets LOADTEST_PASSWORD, hashed once, and an email derived
+from its index (see account_email), which is how loadtest.scenarios logs in.
+booking_stats and technician total_jobs are recomputed after the load.
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, Enum, Table, func, insert, select, text, update
+from sqlalchemy.engine import Connection
+
+from app.analytics import rebuild_booking_stats
+from app.auth import get_password_hash
+from app.availability import skill_key
+from app.database import engine
+from app.models.booking import Booking, BookingStatus
+from app.models.service import Service
+from app.models.technician import Technician
+from app.models.user import User, UserRole
+
+LOADTEST_PASSWORD = "loadtest123"
+EMAIL_DOMAIN = "loadtest.quickfix.com"
+
+DEFAULT_CUSTOMERS = 1_000_000
+DEFAULT_TECHNICIANS = 20_000
+DEFAULT_BOOKINGS = 5_000_000
+# Rows per COPY / INSERT round trip
+CHUNK_ROWS = 50_000
+# Bytes handed to libpq per read while a COPY chunk is sent
+COPY_READ_SIZE = 1 << 20
+
+# Used when the database has no services yet (same catalog as create_test_data.py)
+CATALOG = (
+    ("Electrical Repair", "General electrical repairs and installations", "Electrical", 75.0),
+    ("Wiring Installation", "New wiring installation and rewiring services", "Electrical", 150.0),
+    ("Circuit Breaker Repair", "Circuit breaker troubleshooting and replacement", "Electrical", 100.0),
+    ("Plumbing Repair", "Fix leaks, clogs, and other plumbing issues", "Plumbing", 80.0),
+    ("Pipe Installation", "New pipe installation and replacement", "Plumbing", 120.0),
+    ("Drain Cleaning", "Professional drain cleaning and unclogging", "Plumbing", 90.0),
+    ("Washing Machine Repair", "Repair for washing machines and dryers", "Appliance", 90.0),
+    ("Refrigerator Repair", "Refrigerator and freezer repair services", "Appliance", 100.0),
+    ("Dishwasher Repair", "Dishwasher troubleshooting and repair", "Appliance", 85.0),
+    ("AC Installation", "Air conditioning installation and setup", "HVAC", 200.0),
+    ("Heater Repair", "Heating system repair and maintenance", "HVAC", 110.0),
+)
+# Technician specializations, weighted by how common the trade is
+SPECIALIZATIONS = (("Electrician", 35), ("Plumber", 30), ("Appliance Technician", 20), ("HVAC Technician", 10), ("General", 5))
+
+FIRST_NAMES = (
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Aisha",
+    "Wei", "Priya", "Ahmed", "Olga", "Kenji", "Fatima", "Diego", "Chloe", "Ivan", "Amara"
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Patel", "Nguyen", "Kim", "Khan", "Singh", "Ivanova", "Sato", "Okafor", "Rossi", "Muller"
+)
+STREETS = ("Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Lake", "Hill", "Park", "Washington", "River", "Sunset")
+STREET_SUFFIXES = ("St", "Ave", "Rd", "Blvd", "Ln", "Dr", "Ct")
+CITIES = ("Springfield", "Riverside", "Fairview", "Franklin", "Greenville", "Bristol", "Clinton", "Madison")
+PROBLEMS = {
+    "Electrical": ("Power outlet not working", "Lights flicker in the kitchen", "Breaker keeps tripping", "Need new ceiling fan wired"),
+    "Plumbing": ("Leaking pipe under the sink", "Toilet keeps running", "Low water pressure", "Blocked shower drain"),
+    "Appliance": ("Washer does not spin", "Fridge is not cooling", "Dishwasher leaves water", "Dryer makes a loud noise"),
+    "HVAC": ("AC blows warm air", "Heater will not start", "Thermostat unresponsive", "Need yearly maintenance"),
+}
+GENERIC_PROBLEMS = ("Needs inspection", "Intermittent fault, please call first", "Follow-up on previous repair")
+# preferred_time as customers type it, weighted
+PREFERRED_TIMES = (
+    ("09:00-11:00", 18), ("11:00-13:00", 14), ("14:00-16:00", 16), ("16:00-18:00", 12),
+    ("morning", 12), ("afternoon", 10), ("evening", 6), ("10:00", 6), ("15:30", 4), ("anytime", 2)
+)
+
+# Share of the bookings made by the first FREQUENT_CUSTOMERS of the customers (landlords, offices)
+FREQUENT_CUSTOMERS = 0.01
+FREQUENT_CUSTOMER_BOOKINGS = 0.2
+
+# Status mix by when the job was wanted relative to --as-of: (status, weight)
+PAST_STATUSES = ((BookingStatus.COMPLETED, 85), (BookingStatus.CANCELLED, 12), (BookingStatus.ACCEPTED, 3))
+CURRENT_STATUSES = (
+    (BookingStatus.IN_PROGRESS, 40), (BookingStatus.ACCEPTED, 35), (BookingStatus.PENDING, 15), (BookingStatus.CANCELLED, 10)
+)
+FUTURE_STATUSES = ((BookingStatus.PENDING, 45), (BookingStatus.ACCEPTED, 45), (BookingStatus.CANCELLED, 10))
+
+USER_COLUMNS = ("id", "email", "hashed_password", "full_name", "phone", "role", "is_active", "token_version", "created_at")
+TECHNICIAN_COLUMNS = ("id", "user_id", "specialization", "experience_years", "bio", "rating", "total_jobs")
+BOOKING_COLUMNS = (
+    "id", "customer_id", "service_id", "technician_id", "problem_description", "address", "preferred_date",
+    "preferred_time", "status", "final_price", "created_at", "updated_at", "completed_at"
+)
+
+
+def account_email(prefix: str, kind: str, index: int) -> str:
+    """Login of a generated account; kind is "admin", "customer" or "technician", index starts at 0"""
+    return f"{prefix}-{kind}-{index}@{EMAIL_DOMAIN}"
+
+
+def _weighted(choices: Sequence[Tuple[object, int]]) -> Tuple[list, list]:
+    values = [value for value, _ in choices]
+    cumulative, total = [], 0
+    for _, weight in choices:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _copy_converters(table: Table, columns: Sequence[str]) -> List[Tuple[int, object]]:
+    """(position, converter) of the columns whose Python values COPY cannot take as is"""
+    converters = []
+    for position, name in enumerate(columns):
+        column_type = table.c[name].type
+        if isinstance(column_type, Enum):
+            # SQLAlchemy stores Enum columns by member name
+            converters.append((position, lambda value: value.name))
+        elif isinstance(column_type, DateTime):
+            converters.append((position, lambda value: value.isoformat()))
+    return converters
+
+
+def _encode_copy_chunk(chunk: Optional[List[tuple]], converters: List[Tuple[int, object]]) -> Optional[Tuple[io.StringIO, int]]:
+    if chunk is None:
+        return None
+
+    values = []
+    for row in chunk:
+        row = list(row)
+        for position, converter in converters:
+            if row[position] is not None:
+                row[position] = converter(row[position])
+        values.append(row)
+
+    buffer = io.StringIO()
+    # NULL is an unquoted empty field in COPY's csv format, which is how csv writes None
+    csv.writer(buffer).writerows(values)
+    buffer.seek(0)
+    return buffer, len(chunk)
+
+
+class BulkLoader:
+    """Writes row tuples into a table: COPY on PostgreSQL with psycopg2, multi-row INSERTs elsewhere"""
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+
+    def load(self, table: Table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        if self.use_copy:
+            return self._copy(table, columns, rows)
+
+        count = 0
+        for chunk in _chunks(rows, CHUNK_ROWS):
+            self.connection.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+            count += len(chunk)
+        return count
+
+    def _copy(self, table: Table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        """
+        COPY rows in CHUNK_ROWS batches
+
+        The next batch is generated and encoded on a thread while the server
+        ingests the current one (psycopg2 releases the GIL while it waits),
+        so the load runs at the pace of the slower side instead of both added.
+        """
+        converters = _copy_converters(table, columns)
+        statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        chunks = _chunks(rows, CHUNK_ROWS)
+        # The DBAPI cursor of the connection, so COPY runs inside the load transaction
+        cursor = self.connection.connection.cursor()
+        count = 0
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="copy-encoder") as encoder:
+                def encode_next():
+                    return _encode_copy_chunk(next(chunks, None), converters)
+
+                pending = encoder.submit(encode_next)
+                while True:
+                    encoded = pending.result()
+                    if encoded is None:
+                        break
+                    pending = encoder.submit(encode_next)
+                    buffer, size = encoded
+                    cursor.copy_expert(statement, buffer, size=COPY_READ_SIZE)
+                    count += size
+        finally:
+            cursor.close()
+        return count
+
+    def reset_sequence(self, table: Table) -> None:
+        """Move the id sequence past the explicit ids that were loaded"""
+        if self.connection.dialect.name == "postgresql":
+            self.connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+            ))
+
+
+class DataGenerator:
+    """
+    Deterministic rows for one load
+
+    A small set of frequent customers makes a fifth of the bookings, and
+    technicians are drawn with a skew, so some accounts carry long histories
+    as in production. Bookings are spread over the
+    `days` before as_of with more recent days busier, mostly lead times of
+    a few days, and statuses that depend on whether the job date has passed.
+    """
+
+    def __init__(self, seed: int, as_of: date, days: int, prefix: str, password_hash: str):
+        self.rng = random.Random(seed)
+        self.as_of = datetime.combine(as_of, datetime.min.time())
+        self.days = days
+        self.prefix = prefix
+        self.password_hash = password_hash
+
+    def _name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _phone(self) -> str:
+        return f"+1{self.rng.randrange(200, 1000)}{self.rng.randrange(10 ** 7):07d}"
+
+    def users(self, first_id: int, kind: str, role: UserRole, count: int) -> Iterator[tuple]:
+        rng = self.rng
+        for index in range(count):
+            created_at = self.as_of - timedelta(days=self.days + rng.uniform(0, 365), seconds=rng.randrange(86400))
+            yield (
+                first_id + index, account_email(self.prefix, kind, index), self.password_hash, self._name(),
+                self._phone() if rng.random() < 0.9 else None, role, 1, 0, created_at
+            )
+
+    def technicians(self, first_id: int, first_user_id: int, count: int) -> Iterator[tuple]:
+        rng = self.rng
+        specializations, cumulative = _weighted(SPECIALIZATIONS)
+        for index in range(count):
+            specialization = rng.choices(specializations, cum_weights=cumulative)[0]
+            experience = min(int(rng.expovariate(1 / 6)), 40)
+            rating = round(min(5.0, max(1.0, rng.gauss(4.3, 0.45))), 1)
+            bio = f"{specialization} with {experience} years of experience" if rng.random() < 0.7 else None
+            yield first_id + index, first_user_id + index, specialization, experience, bio, rating, 0
+
+    def bookings(
+        self,
+        first_id: int,
+        count: int,
+        customer_ids: range,
+        services: List[Tuple[int, str, float]],
+        technicians_by_skill: Dict[str, List[int]]
+    ) -> Iterator[tuple]:
+        rng = self.rng
+        random_ = rng.random
+        times, time_weights = _weighted(PREFERRED_TIMES)
+        past = _weighted(PAST_STATUSES)
+        current = _weighted(CURRENT_STATUSES)
+        future = _weighted(FUTURE_STATUSES)
+        all_technicians = [technician_id for pool in technicians_by_skill.values() for technician_id in pool]
+        pools = [technicians_by_skill.get(skill_key(category)) or all_technicians for _, category, _ in services]
+        frequent_customers = max(1, int(len(customer_ids) * FREQUENT_CUSTOMERS))
+        today = self.as_of
+
+        for index in range(count):
+            service_index = rng.randrange(len(services))
+            service_id, category, base_price = services[service_index]
+            if random_() < FREQUENT_CUSTOMER_BOOKINGS:
+                customer_id = customer_ids[int(frequent_customers * random_())]
+            else:
+                customer_id = customer_ids[int(len(customer_ids) * random_())]
+
+            # More bookings on recent days, half as many on Sundays, mostly during the day
+            while True:
+                created_at = today - timedelta(days=self.days * random_() ** 1.3)
+                if created_at.weekday() != 6 or random_() < 0.5:
+                    break
+            created_at = created_at.replace(hour=int(rng.triangular(7, 22, 11)), minute=rng.randrange(60), microsecond=0)
+
+            lead_days = min(int(rng.expovariate(1 / 3)), 30)
+            preferred_date = datetime.combine(created_at.date() + timedelta(days=lead_days), datetime.min.time())
+            if preferred_date < today - timedelta(days=1):
+                values, cumulative = past
+            elif preferred_date <= today + timedelta(days=1):
+                values, cumulative = current
+            else:
+                values, cumulative = future
+            booking_status = rng.choices(values, cum_weights=cumulative)[0]
+
+            technician_id = None
+            if booking_status != BookingStatus.PENDING and (booking_status != BookingStatus.CANCELLED or random_() < 0.5):
+                pool = pools[service_index]
+                technician_id = pool[int(len(pool) * random_() ** 1.2)] if pool else None
+
+            final_price = completed_at = updated_at = None
+            if booking_status != BookingStatus.PENDING:
+                updated_at = min(created_at + timedelta(hours=rng.uniform(0.1, 24 * max(lead_days, 1))), today)
+            if booking_status == BookingStatus.COMPLETED:
+                completed_at = preferred_date + timedelta(hours=rng.uniform(9, 19))
+                final_price = round(base_price * rng.uniform(0.8, 1.8), 2)
+                updated_at = completed_at
+
+            problem = rng.choice(PROBLEMS.get(category, GENERIC_PROBLEMS))
+            address = (
+                f"{rng.randrange(1, 10000)} {rng.choice(STREETS)} {rng.choice(STREET_SUFFIXES)}, {rng.choice(CITIES)}"
+            )
+            yield (
+                first_id + index, customer_id, service_id, technician_id, problem, address, preferred_date,
+                rng.choices(times, cum_weights=time_weights)[0], booking_status, final_price,
+                created_at, updated_at, completed_at
+            )
+
+
+def _next_id(connection: Connection, table: Table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _ensure_services(connection: Connection, loader: BulkLoader) -> List[Tuple[int, str, float]]:
+    services = connection.execute(
+        select(Service.id, Service.category, Service.base_price).where(Service.is_active.is_(True)).order_by(Service.id)
+    ).all()
+    if services:
+        return [tuple(row) for row in services]
+
+    first_id = _next_id(connection, Service.__table__)
+    loader.load(
+        Service.__table__, ("id", "name", "description", "category", "base_price", "is_active"),
+        ((first_id + index, *service, True) for index, service in enumerate(CATALOG))
+    )
+    loader.reset_sequence(Service.__table__)
+    return [(first_id + index, category, price) for index, (_, _, category, price) in enumerate(CATALOG)]
+
+
+def _timed(label: str, load) -> int:
+    start = time.perf_counter()
+    count = load()
+    seconds = time.perf_counter() - start
+    print(f"{label:<12} {count:>10,} rows in {seconds:7.1f}s ({count / seconds if seconds else 0:,.0f} rows/s)")
+    return count
+
+
+def generate(
+    customers: int,
+    technicians: int,
+    bookings: int,
+    seed: int = 42,
+    as_of: Optional[date] = None,
+    days: int = 365,
+    prefix: str = "lt"
+) -> None:
+    as_of = as_of or date.today()
+    start = time.perf_counter()
+    # One bcrypt hash for every account instead of one per row
+    generator = DataGenerator(seed, as_of, days, prefix, get_password_hash(LOADTEST_PASSWORD))
+
+    with engine.begin() as connection:
+        if connection.execute(select(User.id).where(User.email == account_email(prefix, "admin", 0))).first():
+            raise SystemExit(f"accounts with prefix {prefix!r} already exist, pick another --prefix")
+
+        loader = BulkLoader(connection)
+        print(f"loading with {'COPY' if loader.use_copy else 'INSERT'} into {engine.url.render_as_string(hide_password=True)}")
+        services = _ensure_services(connection, loader)
+        users, technician_table, booking_table = User.__table__, Technician.__table__, Booking.__table__
+
+        admin_id = _next_id(connection, users)
+        customer_ids = range(admin_id + 1, admin_id + 1 + customers)
+        technician_user_ids = range(customer_ids.stop, customer_ids.stop + technicians)
+        first_technician_id = _next_id(connection, technician_table)
+
+        _timed("users", lambda: (
+            loader.load(users, USER_COLUMNS, generator.users(admin_id, "admin", UserRole.ADMIN, 1))
+            + loader.load(users, USER_COLUMNS, generator.users(customer_ids.start, "customer", UserRole.CUSTOMER, customers))
+            + loader.load(users, USER_COLUMNS, generator.users(
+                technician_user_ids.start, "technician", UserRole.TECHNICIAN, technicians
+            ))
+        ))
+        loader.reset_sequence(users)
+
+        technician_rows = list(generator.technicians(first_technician_id, technician_user_ids.start, technicians))
+        _timed("technicians", lambda: loader.load(technician_table, TECHNICIAN_COLUMNS, technician_rows))
+        loader.reset_sequence(technician_table)
+
+        technicians_by_skill: Dict[str, List[int]] = {}
+        for row in technician_rows:
+            technicians_by_skill.setdefault(skill_key(row[2]), []).append(row[0])
+        del technician_rows
+
+        _timed("bookings", lambda: loader.load(booking_table, BOOKING_COLUMNS, generator.bookings(
+            _next_id(connection, booking_table), bookings, customer_ids, services, technicians_by_skill
+        )))
+        loader.reset_sequence(booking_table)
+
+        # Derived data the API maintains incrementally
+        step = time.perf_counter()
+        completed = select(func.count(Booking.id)).where(
+            Booking.technician_id == Technician.id,
+            Booking.status == BookingStatus.COMPLETED
+        ).scalar_subquery()
+        connection.execute(update(Technician).where(Technician.id >= first_technician_id).values(total_jobs=completed))
+        rebuild_booking_stats(connection)
+        print(f"{'derived':<12} booking_stats and total_jobs in {time.perf_counter() - step:.1f}s")
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE users, technicians, bookings, booking_stats"))
+
+    print(f"done in {time.perf_counter() - start:.1f}s; log in as {account_email(prefix, 'customer', 0)}, "
+          f"{account_email(prefix, 'technician', 0)} or {account_email(prefix, 'admin', 0)} "
+          f"with password {LOADTEST_PASSWORD!r}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.generate", description="Bulk load synthetic QuickFix data")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the default volumes")
+    parser.add_argument("--customers", type=int, help=f"default {DEFAULT_CUSTOMERS:,} x scale")
+    parser.add_argument("--technicians", type=int, help=f"default {DEFAULT_TECHNICIANS:,} x scale")
+    parser.add_argument("--bookings", type=int, help=f"default {DEFAULT_BOOKINGS:,} x scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="date the history ends at (default today)")
+    parser.add_argument("--days", type=int, default=365, help="days of booking history")
+    parser.add_argument("--prefix", default="lt", help="email prefix of the generated accounts")
+    args = parser.parse_args(argv)
+
+    def scaled(value, default):
+        return value if value is not None else max(1, int(default * args.scale))
+
+    generate(
+        customers=scaled(args.customers, DEFAULT_CUSTOMERS),
+        technicians=scaled(args.technicians, DEFAULT_TECHNICIANS),
+        bookings=scaled(args.bookings, DEFAULT_BOOKINGS),
+        seed=args.seed,
+        as_of=args.as_of,
+        days=args.days,
+        prefix=args.prefix
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
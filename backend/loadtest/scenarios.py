@@ -0,0 +1,310 @@
+"""
+Scripted traffic against a running API, reported per route
+
+    uvicorn app.main:app --port 8000 --workers 4          # in another shell
+    python -m loadtest.scenarios --users 50 --duration 60
+    python -m loadtest.scenarios --mix customer=1 --users 20 --json customer.json
+    python -m loadtest.scenarios --mix booker=1 --users 40 --duration 30
+
+Each virtual user logs in once as its own account made by loadtest.generate
+(same --prefix; customer N, technician N, admin 0) and then repeats its
+scenario until --duration is over:
+
+    customer    browse the catalog, check availability, book, list and open
+                its bookings, sometimes cancel
+    technician  profile, assigned bookings, move one job forward
+    admin       page through all bookings and pending ones, analytics,
+                technicians
+    booker      only create bookings, with customer accounts after those of
+                the customers; a burst of new bookings that all start in the
+                same unassigned pending analytics counter
+
+Users run closed loop (next request as soon as the previous one answers,
+plus --think seconds on average), so throughput is what the server sustains
+for that many concurrent users. The report gives requests, errors, req/s and
+p50/p95/p99/max latency per route; --json keeps it for comparing runs.
+Requires httpx (pip install -r loadtest/requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+from .generate import LOADTEST_PASSWORD, account_email
+
+ROLES = ("customer", "technician", "admin", "booker")
+# Generated account kind each role logs in with
+ACCOUNT_KINDS = {"customer": "customer", "technician": "technician", "admin": "admin", "booker": "customer"}
+DEFAULT_MIX = "customer=6,technician=3,admin=1"
+PREFERRED_TIMES = ("09:00-11:00", "11:00-13:00", "14:00-16:00", "16:00-18:00", "morning", "afternoon")
+
+
+class Recorder:
+    """Latencies and failures per route label ("GET /api/bookings/{booking_id}")"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, seconds: float, error: Optional[str] = None) -> None:
+        self.latencies[route].append(seconds)
+        if error:
+            self.errors[route][error] += 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        everything = []
+        for route in sorted(self.latencies):
+            samples = self.latencies[route]
+            everything.extend(samples)
+            routes[route] = self._summary(samples, sum(self.errors[route].values()), elapsed)
+            routes[route]["error_kinds"] = dict(self.errors[route])
+        total_errors = sum(sum(kinds.values()) for kinds in self.errors.values())
+        return {"elapsed_seconds": round(elapsed, 2), "total": self._summary(everything, total_errors, elapsed), "routes": routes}
+
+    @staticmethod
+    def _summary(samples: List[float], errors: int, elapsed: float) -> dict:
+        ordered = sorted(samples)
+
+        def percentile(share: float) -> float:
+            # Nearest rank
+            return round(ordered[max(0, int(share * len(ordered) + 0.5) - 1)] * 1000, 2) if ordered else 0.0
+
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0
+        }
+
+
+class VirtualUser:
+    """One logged in account running its scenario in a loop"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, role: str, index: int, args):
+        self.client = client
+        self.recorder = recorder
+        self.role = role
+        self.index = index
+        self.think = args.think
+        self.prefix = args.prefix
+        self.rng = random.Random(args.seed * 100_003 + ROLES.index(role) * 10_007 + index)
+        self.headers: Dict[str, str] = {}
+        self.services: List[dict] = []
+
+    async def request(self, method: str, route: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send one request, recorded under route; returns None on failure"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(f"{method} {route}", time.perf_counter() - start, type(e).__name__)
+            return None
+
+        elapsed = time.perf_counter() - start
+        failed = response.status_code >= 400
+        self.recorder.record(f"{method} {route}", elapsed, str(response.status_code) if failed else None)
+        if self.think:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think))
+        return None if failed else response
+
+    async def login(self) -> bool:
+        email = account_email(self.prefix, ACCOUNT_KINDS[self.role], self.index)
+        response = await self.request(
+            "POST", "/api/auth/login", "/api/auth/login", json={"email": email, "password": LOADTEST_PASSWORD}
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def run(self, deadline: float) -> None:
+        if not self.headers and not await self.login():
+            return
+
+        scenario = getattr(self, f"{self.role}_scenario")
+        while time.monotonic() < deadline:
+            await scenario()
+
+    async def customer_scenario(self) -> None:
+        rng = self.rng
+        services = await self.request("GET", "/api/services/", "/api/services/")
+        await self.request("GET", "/api/services/categories/list", "/api/services/categories/list")
+        if services is None or not services.json():
+            return
+
+        service = rng.choice(services.json())
+        preferred_date = date.today() + timedelta(days=rng.randint(1, 14))
+        preferred_time = rng.choice(PREFERRED_TIMES)
+        await self.request(
+            "GET", "/api/technicians/available", "/api/technicians/available",
+            params={"preferred_date": preferred_date.isoformat(), "preferred_time": preferred_time,
+                    "specialization": service["category"]}
+        )
+
+        booking = await self.request("POST", "/api/bookings/", "/api/bookings/", json={
+            "service_id": service["id"],
+            "problem_description": f"Load test booking by customer {self.index}",
+            "address": f"{rng.randint(1, 9999)} Main St",
+            "preferred_date": f"{preferred_date.isoformat()}T00:00:00",
+            "preferred_time": preferred_time
+        })
+
+        await self.request("GET", "/api/bookings/my-bookings", "/api/bookings/my-bookings", params={"cursor": "", "limit": 20})
+        if booking is None:
+            return
+
+        booking_id = booking.json()["id"]
+        await self.request("GET", "/api/bookings/{booking_id}", f"/api/bookings/{booking_id}")
+        if rng.random() < 0.2:
+            await self.request("DELETE", "/api/bookings/{booking_id}", f"/api/bookings/{booking_id}")
+
+    async def booker_scenario(self) -> None:
+        if not self.services:
+            services = await self.request("GET", "/api/services/", "/api/services/")
+            if services is None or not services.json():
+                return
+            self.services = services.json()
+
+        rng = self.rng
+        preferred_date = date.today() + timedelta(days=rng.randint(1, 14))
+        await self.request("POST", "/api/bookings/", "/api/bookings/", json={
+            "service_id": rng.choice(self.services)["id"],
+            "problem_description": f"Load test booking by customer {self.index}",
+            "address": f"{rng.randint(1, 9999)} Main St",
+            "preferred_date": f"{preferred_date.isoformat()}T00:00:00",
+            "preferred_time": rng.choice(PREFERRED_TIMES)
+        })
+
+    async def technician_scenario(self) -> None:
+        await self.request("GET", "/api/technicians/me/profile", "/api/technicians/me/profile")
+        await self.request(
+            "GET", "/api/bookings/technician/assigned", "/api/bookings/technician/assigned",
+            params={"cursor": "", "limit": 20}
+        )
+
+        # Move one open job forward, as a technician does during the day
+        accepted = await self.request(
+            "GET", "/api/bookings/technician/assigned?booking_status", "/api/bookings/technician/assigned",
+            params={"cursor": "", "limit": 20, "booking_status": "accepted"}
+        )
+        if accepted is not None and accepted.json()["items"] and self.rng.random() < 0.3:
+            booking_id = self.rng.choice(accepted.json()["items"])["id"]
+            await self.request(
+                "PATCH", "/api/bookings/{booking_id}/status", f"/api/bookings/{booking_id}/status",
+                json={"status": "in_progress"}
+            )
+
+    async def admin_scenario(self) -> None:
+        cursor = ""
+        for _ in range(3):
+            page = await self.request("GET", "/api/bookings/", "/api/bookings/", params={"cursor": cursor, "limit": 50})
+            if page is None or not page.json()["next_cursor"]:
+                break
+            cursor = page.json()["next_cursor"]
+
+        await self.request(
+            "GET", "/api/bookings/?booking_status", "/api/bookings/",
+            params={"cursor": "", "limit": 50, "booking_status": "pending"}
+        )
+        await self.request("GET", "/api/admin/analytics/", "/api/admin/analytics/")
+        await self.request("GET", "/api/technicians/", "/api/technicians/", params={"cursor": "", "limit": 50})
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        role, _, weight = part.partition("=")
+        if role.strip() not in ROLES:
+            raise argparse.ArgumentTypeError(f"unknown role {role!r}, use {', '.join(ROLES)}")
+        mix[role.strip()] = int(weight or 1)
+    return mix
+
+
+def assign_roles(users: int, mix: Dict[str, int]) -> List[str]:
+    """Roles for the virtual users, in proportion to the mix and interleaved"""
+    total = sum(mix.values())
+    roles, credit = [], {role: 0.0 for role in mix}
+    for _ in range(users):
+        for role, weight in mix.items():
+            credit[role] += weight / total
+        role = max(credit, key=credit.get)
+        credit[role] -= 1
+        roles.append(role)
+    return roles
+
+
+async def run_load(args) -> dict:
+    recorder = Recorder()
+    roles = assign_roles(args.users, args.mix)
+    counters = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = []
+        for role in roles:
+            # There is a single generated admin account, shared by the admin users
+            kind = ACCOUNT_KINDS[role]
+            users.append(VirtualUser(client, recorder, role, 0 if kind == "admin" else counters[kind], args))
+            counters[kind] += 1
+
+        if args.warmup:
+            # Logins and first requests of the warmup are not part of the report
+            await asyncio.gather(*(user.run(time.monotonic() + args.warmup) for user in users))
+            recorder = Recorder()
+            for user in users:
+                user.recorder = recorder
+
+        start = time.monotonic()
+        await asyncio.gather(*(user.run(start + args.duration) for user in users))
+        return recorder.report(time.monotonic() - start)
+
+
+def print_report(report: dict) -> None:
+    header = f"{'route':<52} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("total", report["total"])]
+    for route, stats in rows:
+        print(
+            f"{route:<52} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}"
+        )
+    for route, stats in report["routes"].items():
+        if stats["error_kinds"]:
+            print(f"errors on {route}: {stats['error_kinds']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.scenarios", description="Run load test scenarios")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured traffic")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of unmeasured traffic first")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"role weights, default {DEFAULT_MIX}")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between requests in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per request timeout in seconds")
+    parser.add_argument("--prefix", default="lt", help="account prefix given to loadtest.generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["total"]["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
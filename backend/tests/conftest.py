@@ -0,0 +1,142 @@
+"""
+Shared fixtures
+
+The suite runs against a throwaway SQLite database migrated with Alembic.
+Set TEST_DATABASE_URL to run it against a scratch PostgreSQL database
+instead (its tables are dropped and recreated), and DATABASE_ASYNC=True to
+serve requests through the AsyncEngine. Settings are read when app.config
+is imported, so the environment is prepared before anything from app is.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+TEST_DIR = tempfile.mkdtemp(prefix="quickfix-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{TEST_DIR}/test.db"
+os.environ.update({
+    # No pool warm-up, hashing processes or background threads behind the tests' back
+    "LAZY_STARTUP": "True",
+    "OUTBOX_DISPATCHER_ENABLED": "False",
+    "AUTO_DISPATCH_ENABLED": "False",
+    "PASSWORD_HASH_WORKERS": "0",
+    # Every request does the same auth lookups, so statement counts do not depend on test order
+    "AUTH_CACHE_TTL_SECONDS": "0",
+    "MAIL_USERNAME": "",
+    "MAIL_PASSWORD": "",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.auth import build_token_claims, create_access_token
+from app.availability import availability_index
+from app.catalog_cache import catalog_cache
+from app.cli import migrate
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.booking import Booking, BookingStatus
+from app.models.service import Service
+from app.models.technician import Technician
+from app.models.user import User, UserRole
+from app.principal_cache import principal_cache, token_state_cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Database at the migration head, once per run"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    migrate()
+    yield
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    """Session for seeding and checking rows; every table is emptied after the test"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        principal_cache.clear()
+        token_state_cache.clear()
+        catalog_cache.invalidate()
+        availability_index.invalidate()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@contextmanager
+def count_statements():
+    """Collects the SQL statements run by the engine serving requests inside the block"""
+    statements: List[str] = []
+    target = async_engine.sync_engine if async_engine is not None else engine
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def auth_headers(user: User, technician_id: Optional[int] = None) -> dict:
+    token = create_access_token(build_token_claims(user, technician_id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_user(db, role: UserRole = UserRole.CUSTOMER, name: str = "user", **columns) -> User:
+    user = User(
+        email=f"{name}@example.com", hashed_password="not-a-hash", full_name=name.title(),
+        phone="555-0100", role=role, **columns
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def make_technician(db, name: str = "technician", specialization: str = "Electrical", **columns) -> Technician:
+    user = make_user(db, UserRole.TECHNICIAN, name)
+    technician = Technician(user_id=user.id, specialization=specialization, experience_years=3, rating=4.5, **columns)
+    db.add(technician)
+    db.flush()
+    return technician
+
+
+def make_service(db, name: str = "Wiring", category: str = "Electrical") -> Service:
+    service = Service(name=name, category=category, base_price=80.0)
+    db.add(service)
+    db.flush()
+    return service
+
+
+def make_booking(
+    db, customer: User, service: Service, technician: Optional[Technician] = None,
+    status: BookingStatus = BookingStatus.PENDING, days_ahead: int = 1, **columns
+) -> Booking:
+    booking = Booking(
+        customer_id=customer.id, service_id=service.id, technician_id=technician.id if technician else None,
+        problem_description="Sparks from the outlet", address="1 Main St",
+        preferred_date=datetime.combine(date.today(), datetime.min.time()) + timedelta(days=days_ahead),
+        preferred_time="09:00-11:00",
+        status=status, **columns
+    )
+    db.add(booking)
+    db.flush()
+    return booking
@@ -0,0 +1,77 @@
+"""The availability index reloads technician profiles only when listed fields change, and keeps the schedule"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.booking import BookingStatus
+from conftest import auth_headers, make_booking, make_service, make_technician, make_user
+
+AVAILABLE = "/api/technicians/available"
+
+
+@contextmanager
+def index_queries():
+    """Statements the index runs inside the block (it always reads through SessionLocal)"""
+    statements: List[str] = []
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        if "FROM technicians" in statement or "FROM bookings" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _available(client, headers, days_ahead: int, **params) -> List[dict]:
+    day = (date.today() + timedelta(days=days_ahead)).isoformat()
+    params = {"preferred_date": day, "preferred_time": "09:00-11:00", **params}
+    response = client.get(AVAILABLE, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _seed(db):
+    customer = make_user(db, name="customer")
+    busy = make_technician(db, "busy")
+    free = make_technician(db, "free")
+    make_booking(db, customer, make_service(db), busy, BookingStatus.ACCEPTED, days_ahead=3)
+    db.commit()
+    return auth_headers(customer), busy, free
+
+
+def test_job_counters_and_logouts_keep_the_index(client, db):
+    headers, busy, free = _seed(db)
+    assert [technician["id"] for technician in _available(client, headers, 3)] == [free.id]
+
+    # What completing a job and logging out write
+    busy.total_jobs += 1
+    busy.user.token_version += 1
+    db.commit()
+    free_id = free.id
+
+    with index_queries() as statements:
+        assert [technician["id"] for technician in _available(client, headers, 3)] == [free_id]
+    assert statements == []
+
+
+def test_profile_edit_reloads_technicians_only(client, db):
+    headers, busy, free = _seed(db)
+    assert _available(client, headers, 3, specialization="Plumbing") == []
+
+    busy.specialization = "Plumbing"
+    busy.user.full_name = "Renamed"
+    db.commit()
+    busy_id = busy.id
+
+    with index_queries() as statements:
+        # Still booked at that time, and listed under its new trade and name when free
+        assert _available(client, headers, 3, specialization="Plumbing") == []
+        listed = _available(client, headers, 4, specialization="Plumbing")
+    assert [(technician["id"], technician["user_name"]) for technician in listed] == [(busy_id, "Renamed")]
+    assert len(statements) == 1 and "FROM technicians" in statements[0]
@@ -0,0 +1,58 @@
+"""Booking listings must load a page with a fixed number of statements, whatever its size"""
+import pytest
+
+from app.models.booking import BookingStatus
+from app.models.user import UserRole
+from conftest import auth_headers, count_statements, make_booking, make_service, make_technician, make_user
+
+PAGE_SIZES = (5, 50)
+
+
+@pytest.fixture
+def seeded(db):
+    """
+    60 bookings for each listing, every one with its own customer and technician
+
+    Distinct related rows per booking make a lazy load per row show up as
+    extra statements instead of being served from the identity map.
+    """
+    service = make_service(db)
+    admin = make_user(db, UserRole.ADMIN, "admin")
+    customers = [make_user(db, name=f"customer{i}") for i in range(60)]
+    technicians = [make_technician(db, f"technician{i}") for i in range(60)]
+    for i in range(60):
+        make_booking(db, customers[i], service, technicians[i], BookingStatus.ACCEPTED)
+        make_booking(db, customers[0], service, technicians[i], BookingStatus.ACCEPTED)
+        make_booking(db, customers[i], service, technicians[0], BookingStatus.ACCEPTED)
+    db.commit()
+    return {
+        "/api/bookings/": auth_headers(admin),
+        "/api/bookings/my-bookings": auth_headers(customers[0]),
+        "/api/bookings/technician/assigned": auth_headers(technicians[0].user, technicians[0].id),
+    }
+
+
+def _statements_for(client, url: str, headers: dict, params: dict) -> int:
+    with count_statements() as statements:
+        response = client.get(url, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+@pytest.mark.parametrize("url", ["/api/bookings/", "/api/bookings/my-bookings", "/api/bookings/technician/assigned"])
+@pytest.mark.parametrize("paging", [{}, {"cursor": ""}], ids=["skip-limit", "cursor"])
+def test_statement_count_does_not_grow_with_page_size(client, seeded, url, paging):
+    counts = [
+        _statements_for(client, url, seeded[url], {**paging, "limit": limit})
+        for limit in PAGE_SIZES
+    ]
+    assert counts[0] == counts[1], f"{url} ran {counts[0]} statements for {PAGE_SIZES[0]} rows, {counts[1]} for {PAGE_SIZES[1]}"
+
+
+@pytest.mark.parametrize("url", ["/api/bookings/", "/api/bookings/technician/assigned"])
+def test_filtered_listing_statement_count(client, seeded, url):
+    counts = [
+        _statements_for(client, url, seeded[url], {"booking_status": "accepted", "limit": limit})
+        for limit in PAGE_SIZES
+    ]
+    assert counts[0] == counts[1]
@@ -0,0 +1,62 @@
+"""
+Booking payloads built by hand match BookingResponse
+
+Booking endpoints send serialize_booking (and ?fields=) output straight to
+orjson, skipping response_model validation, so these check that the payloads
+still validate and encode exactly as the model would.
+"""
+import orjson
+import pytest
+
+from app.models.booking import Booking, BookingStatus
+from app.responses import ORJSONResponse
+from app.routers.bookings import BOOKING_PAGE_KEYS
+from app.schemas.booking import BookingResponse
+from app.serializers import BOOKING_FIELDS, booking_select, serialize_booking
+from conftest import make_booking, make_service, make_technician, make_user
+
+
+def _sent(payload) -> object:
+    """What the client receives for a payload sent with booking_json_response"""
+    return orjson.loads(ORJSONResponse(payload).body)
+
+
+def _validated(payload: dict) -> dict:
+    """What FastAPI would send for the payload through response_model"""
+    return BookingResponse.model_validate(payload).model_dump(mode="json")
+
+
+@pytest.fixture
+def bookings(db):
+    customer = make_user(db, name="customer")
+    technician = make_technician(db)
+    service = make_service(db)
+    assigned = make_booking(db, customer, service, technician, BookingStatus.COMPLETED, final_price=120.5)
+    unassigned = make_booking(db, customer, service)
+    db.commit()
+    return {"assigned": assigned.id, "unassigned": unassigned.id}
+
+
+@pytest.mark.parametrize("name", ["assigned", "unassigned"])
+@pytest.mark.parametrize("include_customer", [True, False], ids=["with_customer", "without_customer"])
+def test_serialize_booking_matches_response_model(db, bookings, name, include_customer):
+    booking = db.execute(booking_select().where(Booking.id == bookings[name])).unique().scalar_one()
+    payload = serialize_booking(booking, include_customer=include_customer)
+
+    assert list(payload) == list(BookingResponse.model_fields)
+    assert _sent(payload) == _validated(payload)
+    assert (payload["technician"] is None) == (name == "unassigned")
+    assert (payload["customer"] is None) != include_customer
+
+
+def test_all_fields_selection_matches_full_view(db, bookings):
+    names = tuple(BOOKING_FIELDS.fields)
+    rows = db.execute(BOOKING_FIELDS.select(names, BOOKING_PAGE_KEYS).order_by(Booking.id)).all()
+    selected = BOOKING_FIELDS.serialize(rows, names)
+    full = [
+        serialize_booking(booking)
+        for booking in db.execute(booking_select().order_by(Booking.id)).unique().scalars()
+    ]
+
+    assert [_validated(payload) for payload in selected] == [_validated(payload) for payload in full]
+    assert _sent(selected) == _sent(full)
@@ -0,0 +1,57 @@
+"""booking_stats counters split over slots add up to the live booking counts"""
+from sqlalchemy import func, select
+
+from app.analytics import rebuild_booking_stats
+from app.config import settings
+from app.database import engine
+from app.models.booking import BookingStatus
+from app.models.booking_stats import BookingStats, UNASSIGNED_TECHNICIAN_ID
+from app.models.user import UserRole
+from conftest import auth_headers, make_booking, make_service, make_technician, make_user
+
+ANALYTICS = "/api/admin/analytics/"
+
+
+def _analytics(client, headers, live: bool) -> dict:
+    response = client.get(ANALYTICS, headers=headers, params={"live": live})
+    assert response.status_code == 200, response.text
+    return {key: value for key, value in response.json().items() if key != "source"}
+
+
+def _unassigned_pending_slots(db) -> int:
+    return db.scalar(
+        select(func.count()).select_from(BookingStats).where(
+            BookingStats.technician_id == UNASSIGNED_TECHNICIAN_ID,
+            BookingStats.status == BookingStatus.PENDING
+        )
+    )
+
+
+def test_slotted_counters_match_live_counts(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_STATS_SLOTS", 4)
+    headers = auth_headers(make_user(db, UserRole.ADMIN, "admin"))
+    customer = make_user(db, name="customer")
+    technician = make_technician(db)
+    service = make_service(db)
+    bookings = [make_booking(db, customer, service, days_ahead=i) for i in range(40)]
+    db.commit()
+    assert _unassigned_pending_slots(db) > 1
+
+    # Move counts out of the unassigned rows, from whichever slot they were added to
+    for booking in bookings[:10]:
+        booking.technician_id = technician.id
+        booking.status = BookingStatus.ACCEPTED
+    for booking in bookings[10:15]:
+        booking.status = BookingStatus.CANCELLED
+    db.delete(bookings[15])
+    db.commit()
+
+    summary = _analytics(client, headers, live=False)
+    assert summary == _analytics(client, headers, live=True)
+    assert summary["bookings_by_status"]["pending"] == 24
+    assert summary["technicians"][0]["active_jobs"] == 10
+
+    with engine.begin() as connection:
+        rebuild_booking_stats(connection)
+    assert _unassigned_pending_slots(db) == 1
+    assert _analytics(client, headers, live=False) == summary
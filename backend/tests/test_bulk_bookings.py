@@ -0,0 +1,51 @@
+"""PATCH /api/bookings/bulk queues the same emails as the single-booking endpoints"""
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.email_outbox import EmailOutbox
+from app.models.user import UserRole
+from conftest import auth_headers, make_booking, make_service, make_technician, make_user
+
+
+@pytest.fixture(autouse=True)
+def email_configured(monkeypatch):
+    monkeypatch.setattr(settings, "MAIL_USERNAME", "quickfix")
+    monkeypatch.setattr(settings, "MAIL_PASSWORD", "secret")
+
+
+def test_bulk_update_emails(client, db):
+    headers = auth_headers(make_user(db, UserRole.ADMIN, "admin"))
+    customer = make_user(db, name="customer")
+    technician = make_technician(db)
+    service = make_service(db)
+    both, status_only, technician_only = (make_booking(db, customer, service, days_ahead=i) for i in range(3))
+    db.commit()
+    ids = {"both": both.id, "status_only": status_only.id, "technician_only": technician_only.id}
+
+    response = client.patch("/api/bookings/bulk", headers=headers, json={"items": [
+        {"booking_id": ids["both"], "technician_id": technician.id, "status": "in_progress"},
+        {"booking_id": ids["status_only"], "status": "cancelled"},
+        {"booking_id": ids["technician_only"], "technician_id": technician.id},
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["errors"] == []
+
+    # Subjects read "<kind> - QuickFix #<id>[ - <status title>]"
+    emails = [
+        (to_email, *subject.split(" - "))
+        for to_email, subject in db.execute(select(EmailOutbox.to_email, EmailOutbox.subject))
+    ]
+    by_booking = {
+        name: sorted((to_email, kind) for to_email, kind, number, *_ in emails if number == f"QuickFix #{booking_id}")
+        for name, booking_id in ids.items()
+    }
+    assignment = ("technician@example.com", "New Job Assignment")
+    update = ("customer@example.com", "Booking Update")
+    assert by_booking == {
+        "both": [update, assignment],
+        "status_only": [update],
+        "technician_only": [update, assignment],
+    }
+    # The customer hears the requested status, not the intermediate accepted one
+    assert ("customer@example.com", "Booking Update", f"QuickFix #{ids['both']}", "Work In Progress") in emails
@@ -0,0 +1,50 @@
+"""The statement timeout is a connection startup parameter, so no rollback or checkin can undo it"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import _engine_options, database_url, engine, get_async_database_url
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs TEST_DATABASE_URL on PostgreSQL")
+
+TIMEOUT_MS = 1234
+
+
+@pytest.fixture
+def statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", TIMEOUT_MS)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+
+
+def test_statement_timeout_survives_checkin(statement_timeout):
+    timeout_engine = create_engine(database_url, **_engine_options(database_url))
+    try:
+        for _ in range(2):
+            # The pool rolls back on checkin; the second checkout reuses the same connection
+            with timeout_engine.connect() as connection:
+                assert connection.execute(text("SHOW statement_timeout")).scalar_one() == f"{TIMEOUT_MS}ms"
+        assert timeout_engine.pool.checkedin() == 1
+    finally:
+        timeout_engine.dispose()
+
+
+def test_async_statement_timeout_survives_checkin(statement_timeout):
+    pytest.importorskip("asyncpg")
+    url = get_async_database_url()
+
+    async def timeouts():
+        timeout_engine = create_async_engine(url, **_engine_options(url, async_mode=True))
+        try:
+            seen = []
+            for _ in range(2):
+                async with timeout_engine.connect() as connection:
+                    seen.append((await connection.execute(text("SHOW statement_timeout"))).scalar_one())
+            return seen
+        finally:
+            await timeout_engine.dispose()
+
+    assert asyncio.run(timeouts()) == [f"{TIMEOUT_MS}ms"] * 2
@@ -0,0 +1,131 @@
+"""Outbox delivery, retry backoff and giving up, with deliver_many replaced by a stub SMTP server"""
+from datetime import datetime, timedelta
+from smtplib import SMTPRecipientsRefused
+
+import pytest
+
+from app import outbox
+from app.config import settings
+from app.database import SessionLocal
+from app.email import send_email
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.outbox import OutboxDispatcher
+
+
+class StubSMTP:
+    """Records each batch handed to deliver_many and fails the recipients listed in reject"""
+
+    def __init__(self):
+        self.batches = []
+        self.reject = set()
+        self.during_send = None
+
+    def __call__(self, messages):
+        self.batches.append([message.to_email for message in messages])
+        if self.during_send is not None:
+            self.during_send()
+        return [
+            SMTPRecipientsRefused({message.to_email: (550, b"mailbox unavailable")})
+            if message.to_email in self.reject else None
+            for message in messages
+        ]
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr(settings, "MAIL_USERNAME", "quickfix")
+    monkeypatch.setattr(settings, "MAIL_PASSWORD", "secret")
+    stub = StubSMTP()
+    monkeypatch.setattr(outbox, "deliver_many", stub)
+    return stub
+
+
+@pytest.fixture
+def dispatcher():
+    return OutboxDispatcher(session_factory=SessionLocal, batch_size=10, max_attempts=3, retry_backoff=30)
+
+
+def _queue(db, *recipients):
+    for to_email in recipients:
+        send_email(to_email, "Booking confirmed", "<p>See you soon</p>", db=db)
+    db.commit()
+
+
+def _entries(db):
+    db.expire_all()
+    return {entry.to_email: entry for entry in db.query(EmailOutbox)}
+
+
+def _make_due(db):
+    db.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+
+def test_due_emails_are_sent_in_one_batch(db, smtp, dispatcher):
+    _queue(db, "a@example.com", "b@example.com")
+
+    assert dispatcher.dispatch_pending() == 2
+    assert smtp.batches == [["a@example.com", "b@example.com"]]
+    for entry in _entries(db).values():
+        assert entry.status == OutboxStatus.SENT
+        assert entry.attempts == 1
+        assert entry.sent_at is not None
+
+    assert dispatcher.dispatch_pending() == 0
+
+
+def test_failed_sends_back_off_then_give_up(db, smtp, dispatcher):
+    _queue(db, "ok@example.com", "bounce@example.com")
+    smtp.reject.add("bounce@example.com")
+
+    before = datetime.utcnow()
+    assert dispatcher.dispatch_pending() == 2
+    entry = _entries(db)["bounce@example.com"]
+    assert (entry.status, entry.attempts) == (OutboxStatus.PENDING, 1)
+    assert "mailbox unavailable" in entry.last_error
+    assert entry.next_attempt_at >= before + timedelta(seconds=30)
+    # Not due until the backoff is over
+    assert dispatcher.dispatch_pending() == 0
+
+    _make_due(db)
+    before = datetime.utcnow()
+    assert dispatcher.dispatch_pending() == 1
+    entry = _entries(db)["bounce@example.com"]
+    assert entry.attempts == 2
+    assert entry.next_attempt_at >= before + timedelta(seconds=60)
+
+    _make_due(db)
+    assert dispatcher.dispatch_pending() == 1
+    entry = _entries(db)["bounce@example.com"]
+    assert (entry.status, entry.attempts) == (OutboxStatus.FAILED, 3)
+
+    _make_due(db)
+    assert dispatcher.dispatch_pending() == 0
+    assert smtp.batches == [["ok@example.com", "bounce@example.com"], ["bounce@example.com"], ["bounce@example.com"]]
+
+
+def test_claim_is_committed_before_sending(db, smtp, dispatcher):
+    _queue(db, "a@example.com")
+    seen = {}
+
+    def while_sending():
+        # Another dispatcher sees the lease and finds nothing to claim
+        other = OutboxDispatcher(session_factory=SessionLocal)
+        seen["claimed_by_other"] = other._claim_batch()
+        seen["entry"] = _entries(db)["a@example.com"]
+
+    smtp.during_send = while_sending
+    assert dispatcher.dispatch_pending() == 1
+
+    assert seen["claimed_by_other"] == []
+    assert seen["entry"].status == OutboxStatus.PENDING
+    assert seen["entry"].next_attempt_at > datetime.utcnow() + timedelta(seconds=dispatcher.lease_seconds - 60)
+    assert _entries(db)["a@example.com"].status == OutboxStatus.SENT
+
+
+def test_nothing_is_queued_without_smtp_credentials(db, monkeypatch):
+    monkeypatch.setattr(settings, "MAIL_USERNAME", "")
+
+    assert send_email("a@example.com", "Booking confirmed", "<p>See you soon</p>", db=db) is False
+    db.commit()
+    assert db.query(EmailOutbox).count() == 0
@@ -0,0 +1,75 @@
+"""Handlers that take the users row see the same user, role and revocations with the principal cache on and off"""
+import pytest
+
+from app.models.user import UserRole
+from app.principal_cache import principal_cache, token_state_cache
+from conftest import auth_headers, make_technician, make_user
+
+ME = "/api/auth/me"
+PROFILE = "/api/technicians/me/profile"
+
+
+@pytest.fixture(params=[0, 60], ids=["uncached", "cached"])
+def auth_cache(request, monkeypatch):
+    """Run each test with the auth caches off and on; with them on, requests get the merged cached User"""
+    monkeypatch.setattr(principal_cache, "ttl_seconds", request.param)
+    monkeypatch.setattr(token_state_cache, "ttl_seconds", request.param)
+    return request.param
+
+
+def test_me_from_cached_principal(client, db, auth_cache):
+    user = make_user(db, name="customer")
+    db.commit()
+    headers = auth_headers(user)
+    expected = {
+        "id": user.id, "email": "customer@example.com", "full_name": "Customer",
+        "phone": "555-0100", "role": "customer", "is_active": True
+    }
+
+    hits = principal_cache.hits
+    for _ in range(2):
+        response = client.get(ME, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json() == expected
+    assert principal_cache.hits - hits == (1 if auth_cache else 0)
+
+
+def test_role_change_applies_to_cached_principal(client, db, auth_cache):
+    technician = make_technician(db)
+    db.commit()
+    headers = auth_headers(technician.user, technician.id)
+    assert client.get(PROFILE, headers=headers).status_code == 200
+
+    technician.user.role = UserRole.CUSTOMER
+    db.commit()
+
+    assert client.get(PROFILE, headers=headers).status_code == 403
+    assert client.get(ME, headers=headers).json()["role"] == "customer"
+
+
+def test_logout_all_revokes_cached_principal(client, db, auth_cache):
+    user = make_user(db, name="customer")
+    db.commit()
+    headers = auth_headers(user)
+    assert client.get(ME, headers=headers).status_code == 200
+
+    assert client.post("/api/auth/logout-all", headers=headers).status_code == 204
+
+    assert client.get(ME, headers=headers).status_code == 401
+    db.refresh(user)
+    assert user.token_version == 1
+    assert client.get(ME, headers=auth_headers(user)).status_code == 200
+
+
+def test_deactivated_user_rejected_while_cached(client, db, auth_cache):
+    user = make_user(db, name="customer")
+    db.commit()
+    headers = auth_headers(user)
+    assert client.get(ME, headers=headers).status_code == 200
+
+    user.is_active = 0
+    db.commit()
+
+    response = client.get(ME, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
@@ -0,0 +1,68 @@
+"""
+Importing and starting the app touches no database, and readiness follows the migrations
+
+The suite's own conftest has already imported app.main and migrated its
+database, so this runs in a fresh interpreter against a new SQLite file, with
+a pool "connect" listener registered before anything from app is imported.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+SCRIPT = """
+import json
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+connects = []
+event.listen(Pool, "connect", lambda dbapi_connection, connection_record: connects.append(1))
+report = {}
+
+from app.main import app
+report["import"] = len(connects)
+report["alembic_imported"] = "alembic" in sys.modules
+
+from fastapi.testclient import TestClient
+from app.cli import migrate
+
+with TestClient(app) as client:
+    report["startup"] = len(connects)
+    report["live"] = client.get("/health/live").status_code
+    report["after_live"] = len(connects)
+    report["ready_before_migrations"] = client.get("/health/ready").status_code
+    migrate()
+    report["ready_after_migrations"] = client.get("/health/ready").status_code
+
+print(json.dumps(report))
+"""
+
+
+def test_lazy_startup_and_readiness(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/startup.db",
+        "DATABASE_ASYNC": "False",
+        "LAZY_STARTUP": "True",
+        "HEALTH_CHECK_CACHE_SECONDS": "0",
+        "OUTBOX_DISPATCHER_ENABLED": "False",
+        "AUTO_DISPATCH_ENABLED": "False",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["import"] == 0
+    assert not report["alembic_imported"]
+    assert report["startup"] == 0
+    assert report["live"] == 200
+    assert report["after_live"] == 0
+    assert report["ready_before_migrations"] == 503
+    assert report["ready_after_migrations"] == 200
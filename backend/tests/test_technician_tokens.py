@@ -0,0 +1,50 @@
+"""Technician profiles created or deleted after login take effect for tokens already issued"""
+import pytest
+
+from app.models.user import UserRole
+from app.principal_cache import token_state_cache
+from conftest import auth_headers, make_technician, make_user
+
+ASSIGNED = "/api/bookings/technician/assigned"
+
+
+@pytest.fixture(params=[0, 60], ids=["uncached", "cached"])
+def token_cache(request, monkeypatch):
+    """Run each test with the token state cache off and on, since deletes must also evict it"""
+    monkeypatch.setattr(token_state_cache, "ttl_seconds", request.param)
+    return request.param
+
+
+def test_deleted_profile_stops_authorizing(client, db, token_cache):
+    admin = make_user(db, UserRole.ADMIN, "admin")
+    technician = make_technician(db)
+    db.commit()
+    headers = auth_headers(technician.user, technician.id)
+
+    assert client.get(ASSIGNED, headers=headers).status_code == 200
+
+    response = client.delete(f"/api/technicians/{technician.id}", headers=auth_headers(admin))
+    assert response.status_code == 204
+
+    response = client.get(ASSIGNED, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Technician profile not found"
+
+
+def test_new_profile_works_without_logging_in_again(client, db, token_cache):
+    admin = make_user(db, UserRole.ADMIN, "admin")
+    user = make_user(db, UserRole.TECHNICIAN, "newtech")
+    db.commit()
+    headers = auth_headers(user)
+
+    assert client.get(ASSIGNED, headers=headers).status_code == 404
+
+    response = client.post(
+        "/api/technicians/", headers=auth_headers(admin),
+        json={"user_id": user.id, "specialization": "Plumbing", "experience_years": 2}
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.get(ASSIGNED, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
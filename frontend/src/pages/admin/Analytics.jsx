@@ -1,8 +1,8 @@
 import React, { useState, useEffect } from 'react'
-import { bookingsAPI, techniciansAPI } from '../../services/api'
+import { analyticsAPI, techniciansAPI } from '../../services/api'
 
 function Analytics() {
-  const [bookings, setBookings] = useState([])
+  const [analytics, setAnalytics] = useState(null)
   const [technicians, setTechnicians] = useState([])
   const [loading, setLoading] = useState(true)
 
@@ -13,11 +13,11 @@ function Analytics() {
   const loadData = async () => {
     try {
       setLoading(true)
-      const [bookingsData, techniciansData] = await Promise.all([
-        bookingsAPI.getAllBookings(),
+      const [analyticsData, techniciansData] = await Promise.all([
+        analyticsAPI.getAnalytics(),
         techniciansAPI.getAllTechnicians(),
       ])
-      setBookings(bookingsData)
+      setAnalytics(analyticsData)
       setTechnicians(techniciansData)
     } catch (err) {
       console.error('Error loading analytics data:', err)
@@ -26,28 +26,28 @@ function Analytics() {
     }
   }
 
-  // Calculate statistics
-  const totalBookings = bookings.length
-  const pendingBookings = bookings.filter(b => b.status === 'pending').length
-  const inProgressBookings = bookings.filter(b => b.status === 'in_progress').length
-  const completedBookings = bookings.filter(b => b.status === 'completed').length
-  const cancelledBookings = bookings.filter(b => b.status === 'cancelled').length
+  // Statistics are counted by the server
+  const byStatus = analytics?.bookings_by_status || {}
+  const totalBookings = analytics?.total_bookings || 0
+  const pendingBookings = byStatus.pending || 0
+  const acceptedBookings = byStatus.accepted || 0
+  const inProgressBookings = byStatus.in_progress || 0
+  const completedBookings = byStatus.completed || 0
+  const cancelledBookings = byStatus.cancelled || 0
 
-  const completionRate = totalBookings > 0
-    ? ((completedBookings / totalBookings) * 100).toFixed(1)
-    : 0
+  const completionRate = ((analytics?.completion_rate || 0) * 100).toFixed(1)
 
   // Technician workload
+  const loadByTechnician = Object.fromEntries(
+    (analytics?.technicians || []).map(load => [load.technician_id, load])
+  )
   const technicianWorkload = technicians.map(tech => {
-    const assignedBookings = bookings.filter(b => b.technician_id === tech.id)
-    const activeBookings = assignedBookings.filter(
-      b => b.status !== 'completed' && b.status !== 'cancelled'
-    )
+    const load = loadByTechnician[tech.id]
 
     return {
       ...tech,
-      totalAssigned: assignedBookings.length,
-      activeJobs: activeBookings.length,
+      totalAssigned: load ? load.total_jobs : 0,
+      activeJobs: load ? load.active_jobs : 0,
       completedJobs: tech.total_jobs || 0,
     }
   }).sort((a, b) => b.activeJobs - a.activeJobs)
@@ -163,7 +163,7 @@ function Analytics() {
           <div className="bar-chart">
             {[
               { label: 'Pending', count: pendingBookings, color: '#ffc107' },
-              { label: 'Accepted', count: bookings.filter(b => b.status === 'accepted').length, color: '#17a2b8' },
+              { label: 'Accepted', count: acceptedBookings, color: '#17a2b8' },
               { label: 'In Progress', count: inProgressBookings, color: '#007bff' },
               { label: 'Completed', count: completedBookings, color: '#28a745' },
               { label: 'Cancelled', count: cancelledBookings, color: '#dc3545' },
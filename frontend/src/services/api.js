@@ -134,4 +134,12 @@ export const techniciansAPI = {
   },
 }
 
+// Admin Analytics API
+export const analyticsAPI = {
+  getAnalytics: async () => {
+    const response = await api.get('/api/admin/analytics/')
+    return response.data
+  },
+}
+
 export default api